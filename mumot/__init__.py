@@ -13,15 +13,23 @@ Windows Compatibility:
 Renato Pagliara Vasquez
 """
 
+import builtins
+import collections
+import concurrent.futures
 import copy
 import datetime
+import functools
+import hashlib
+import itertools
 import math
 import numbers
+import operator
 import os
+import pickle
 import sys
 import tempfile
+import time
 import warnings
-from bisect import bisect_left
 from enum import Enum
 from math import floor, log10
 
@@ -40,9 +48,18 @@ from matplotlib.cbook import MatplotlibDeprecationWarning
 from mpl_toolkits.mplot3d import axes3d  # @UnresolvedImport
 from pyexpat import model  # @UnresolvedImport
 from scipy.integrate import odeint
+try:
+    from scipy.linalg import solve_continuous_lyapunov
+except ImportError:  # SciPy < 1.0
+    from scipy.linalg import solve_lyapunov as solve_continuous_lyapunov
+from scipy.optimize import root
+from scipy.sparse import csc_matrix, diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import expm_multiply, factorized, gmres, spsolve
 from sympy import (Derivative, Matrix, Symbol, collect, default_sort_key,
                    expand, factorial, lambdify, latex, linsolve,
                    numbered_symbols, preview, simplify, solve, symbols)
+from sympy.utilities.lambdify import lambdastr
 
 from mumot.process_latex.process_latex import process_sympy
 from ._version import __version__
@@ -87,6 +104,12 @@ RATE_BOUND = 10.0
 RATE_STEP = 0.1
 MULTIPLOT_COLUMNS = 2
 EMPTYSET_SYMBOL = process_sympy('1')
+## simulation algorithms of the SSA views (values of the engine keyword) with their labels in the engine dropdown, in its order (see :meth:`MuMoTSSAView._engineClass`)
+SSA_ENGINES = collections.OrderedDict([('direct', 'Direct method'), ('nextReaction', 'Next reaction method'), ('compositionRejection', 'Composition-rejection'),
+                                       ('tauLeaping', 'Tau-leaping'), ('hybrid', 'Hybrid SSA/ODE'), ('slowScale', 'Slow-scale SSA'),
+                                       ('batch', 'Direct method, batched runs'), ('langevin', 'Chemical Langevin equation'),
+                                       ('langevinMilstein', 'Chemical Langevin equation (Milstein)')])
+COMPARISON_OPERATORS = {'>=': operator.ge, '>': operator.gt, '<=': operator.le, '<': operator.lt}
 
 INITIAL_COND_INIT_VAL = 0.0
 INITIAL_COND_INIT_BOUND = 1.0
@@ -211,6 +234,8 @@ class MuMoTmodel:
     _tmpdirpath = '__mumot_files__'
     ## temporary storage for image files, etc. used in visualising model
     _tmpdir = None 
+    ## last stationary distribution computed (tuple of reactant names, dictionary of probabilities keyed by state), warm start of the next one
+    _stationaryWarmStart = None
     ## list of temporary files created
     _tmpfiles = None 
 
@@ -819,6 +844,9 @@ class MuMoTmodel:
         """Construct interactive time evolution plot for noise correlations
         around fixed points.
 
+        Correlations are computed numerically with the linear noise
+        approximation, for any number of time-dependent reactants.
+
         Parameters
         ----------
         initWidgets : dict, optional
@@ -896,12 +924,10 @@ class MuMoTmodel:
         #NCParams['plotProportions'] = _format_advanced_option(optionName='plotProportions', inputValue=kwargs.get('plotProportions'), initValues=initWidgets.get('plotProportions'))
         NCParams['conserved'] = [kwargs.get('conserved', False), True]
         
-        EQsys1stOrdMom, EOM_1stOrderMom, NoiseSubs1stOrder, EQsys2ndOrdMom, EOM_2ndOrderMom, NoiseSubs2ndOrder = _getNoiseEOM(_getFokkerPlanckEquation, _get_orderedLists_vKE, self._stoichiometry)
-        
         # construct controller
         viewController = MuMoTtimeEvolutionController(paramValuesDict=paramValuesDict, paramLabelDict=self._ratesLaTeX, continuousReplot=False, advancedOpts=NCParams, showSystemSize=True, **kwargs)
         
-        modelView = MuMoTnoiseCorrelationsView(self, viewController, NCParams, EOM_1stOrderMom, EOM_2ndOrderMom, **kwargs)
+        modelView = MuMoTnoiseCorrelationsView(self, viewController, NCParams, **kwargs)
         
         viewController.setView(modelView)
         
@@ -910,33 +936,11 @@ class MuMoTmodel:
         return viewController
 
     
-    def _check2ndOrderMom(self, showNoise=False):
-        """Check if 2nd Order moments of noise-noise correlations can be calculated via Master equation and Fokker-Planck equation"""
-        
+    def _linearNoiseApproximation(self, showNoise=True):
+        """Return the linear noise approximation of the model, on its time-dependent reactants (None if ``showNoise`` is False)."""
         if showNoise == True:
-            substitutions = False
-            for reaction in self._stoichiometry:
-                for key in self._stoichiometry[reaction]:
-                    if key != 'rate':
-                        if self._stoichiometry[reaction][key] != 'const':
-                            if len(self._stoichiometry[reaction][key]) > 2:
-                                substitutions = True
-            
-            if substitutions == False:
-                SOL_1stOrderMomDict, NoiseSubs1stOrder, SOL_2ndOrdMomDict, NoiseSubs2ndOrder = _getNoiseStationarySol(_getNoiseEOM, _getFokkerPlanckEquation, _get_orderedLists_vKE, self._stoichiometry)
-                # SOL_2ndOrdMomDict is second order solution and will be used by MuMoTnoiseView
-            else:
-                SOL_2ndOrdMomDict = None
-            
-#                 if SOL_2ndOrdMomDict is None:
-#                     if substitutions == True:
-#                         print('Noise in stream plots is only available for systems with exactly two time dependent reactants. Stream plot only works WITHOUT noise in case of reducing number of state variables from 3 to 2 via substitute() - method.')
-#                     print('Warning: Noise in the system could not be calculated: \'showNoise\' automatically disabled.')
-#                     kwargs['showNoise'] = False
-        else:
-            SOL_2ndOrdMomDict = None
-            
-        return SOL_2ndOrdMomDict
+            return _LinearNoiseApproximation(self._stoichiometry, [reactant for reactant in self._reactants if reactant not in self._constantReactants])
+        return None
 
     # construct interactive stream plot with the option to show noise around
     # fixed points
@@ -968,7 +972,8 @@ class MuMoTmodel:
         showFixedPoints : bool, optional
              Plot fixed points.  Defaults to False.
         showNoise : bool, optional
-             Plot noise around fixed points.  Defaults to False.
+             Plot noise around fixed points (stationary covariances of the
+             linear noise approximation).  Defaults to False.
         fontsize : int, optional
              Font size for axis-labels.
         xlab : str, optional
@@ -1006,10 +1011,10 @@ class MuMoTmodel:
 
         if self._check_state_variables(stateVariable1, stateVariable2, stateVariable3):
             if stateVariable3 is None:
-                SOL_2ndOrdMomDict = self._check2ndOrderMom(showNoise=kwargs.get('showNoise', False))
+                linearNoise = self._linearNoiseApproximation(showNoise=kwargs.get('showNoise', False))
             else:
                 print('3D stream plot not yet implemented.')
-                #SOL_2ndOrdMomDict = None
+                #linearNoise = None
                 return None
                     
             continuous_update = not (kwargs.get('showNoise', False) or kwargs.get('showFixedPoints', False))
@@ -1017,7 +1022,7 @@ class MuMoTmodel:
             viewController = self._controller(continuous_update, plotLimitsSlider=not(self._constantSystemSize), params=params, initWidgets=initWidgets, **kwargs)
 
             # construct view
-            modelView = MuMoTstreamView(self, viewController, SOL_2ndOrdMomDict, stateVariable1, stateVariable2, stateVariable3, params=params, **kwargs)
+            modelView = MuMoTstreamView(self, viewController, linearNoise, stateVariable1, stateVariable2, stateVariable3, params=params, **kwargs)
 
             viewController.setView(modelView)
             viewController._setReplotFunction(modelView._plot_field)
@@ -1055,7 +1060,8 @@ class MuMoTmodel:
         showFixedPoints : bool, optional
              Plot fixed points.  Defaults to False.
         showNoise : bool, optional
-             Plot noise around fixed points.  Defaults to False.
+             Plot noise around fixed points (stationary covariances of the
+             linear noise approximation).  Defaults to False.
         fontsize : int, optional
              Font size for axis-labels.
         xlab : str, optional
@@ -1095,16 +1101,16 @@ class MuMoTmodel:
 
         if self._check_state_variables(stateVariable1, stateVariable2, stateVariable3):
             if stateVariable3 is None:
-                SOL_2ndOrdMomDict = self._check2ndOrderMom(showNoise=kwargs.get('showNoise', False))
+                linearNoise = self._linearNoiseApproximation(showNoise=kwargs.get('showNoise', False))
             else:
-                SOL_2ndOrdMomDict = None
+                linearNoise = None
                     
             continuous_update = not (kwargs.get('showNoise', False) or kwargs.get('showFixedPoints', False))
             # construct controller
             viewController = self._controller(continuous_update, plotLimitsSlider=not(self._constantSystemSize), params=params, initWidgets=initWidgets, **kwargs)
             
             # construct view
-            modelView = MuMoTvectorView(self, viewController, SOL_2ndOrdMomDict, stateVariable1, stateVariable2, stateVariable3, params=params, **kwargs)
+            modelView = MuMoTvectorView(self, viewController, linearNoise, stateVariable1, stateVariable2, stateVariable3, params=params, **kwargs)
                     
             viewController.setView(modelView)
             viewController._setReplotFunction(modelView._plot_field)         
@@ -1270,6 +1276,25 @@ class MuMoTmodel:
            Number of simulation runs to be executed.
         aggregateResults : bool
            Flag to aggregate or not the results from several runs.
+        workers : int
+           Number of processes running the simulation runs in parallel
+           (default 1, no parallelism).  Results do not depend on it.
+        recording : str
+           Which states of each run are stored (``'event'``, ``'grid'`` or ``'final'``; see :meth:`SSA`).
+        recordingTimes : int or list of float
+           (active only for recording='grid') the times at which the state is stored, or their number.
+        aggregation : str
+           How multiple runs are aggregated (``'stored'`` or ``'streaming'``; see :meth:`SSA`).
+        aggregationTimes : int or list of float
+           (active only for aggregation='streaming') the times at which the running statistics are computed, or their number.
+        steadyStateTolerance : float
+           If set, each run stops on reaching a steady state (see :meth:`SSA`).
+        steadyStateWindow : float
+           (active only if steadyStateTolerance is set) length of the windows compared to detect the steady state.
+        checkpointFile : str
+           File where the state of the runs is saved, to resume or extend them (see :meth:`SSA`).
+        checkpointInterval : float
+           (active only if checkpointFile is set) seconds between two checkpoints of a running simulation.
         netType : str
            Type of network (``'full'``, ``'erdos-renyi'``, ``'barabasi-albert'`` or ``'dynamic'``.
         netParam : float
@@ -1314,6 +1339,7 @@ class MuMoTmodel:
         MAParams['final_y'] = _format_advanced_option(optionName='final_y', inputValue=kwargs.get('final_y'), initValues=initWidgets.get('final_y'), extraParam=self._getAllReactants()[0])
         MAParams['runs'] = _format_advanced_option(optionName='runs', inputValue=kwargs.get('runs'), initValues=initWidgets.get('runs'))
         MAParams['aggregateResults'] = _format_advanced_option(optionName='aggregateResults', inputValue=kwargs.get('aggregateResults'), initValues=initWidgets.get('aggregateResults'))
+        MAParams['recording'] = _format_advanced_option(optionName='recording', inputValue=kwargs.get('recording'), initValues=initWidgets.get('recording'))
         
         # if the netType is a fixed-param and its value is not 'DYNAMIC', all useless parameter become fixed (and widgets are never displayed)
         if MAParams['netType'][-1]:
@@ -1376,6 +1402,95 @@ class MuMoTmodel:
             Number of simulation runs to be executed.
         aggregateResults: bool
             Flag to aggregate or not the results from several runs.
+        workers : int
+            Number of processes running the simulation runs in parallel
+            (default 1, no parallelism).  Results do not depend on it.
+        recording : str
+            Which states of each run are stored.  Must be one of: ``'event'``
+            (the state after every event, default), ``'grid'`` (the state at
+            the times given by ``recordingTimes``) or ``'final'`` (only the
+            final state, enough for the ``'final'`` and ``'barplot'``
+            visualisations; the runtime plot is disabled).
+        recordingTimes : int or list of float
+            (active only for recording='grid') the times at which the state
+            is stored, or the number of equally spaced times in
+            [0, ``maxTime``] (default 101).
+        aggregation : str
+            How multiple runs are aggregated.  Must be one of: ``'stored'``
+            (every run is kept, default) or ``'streaming'`` (each completed
+            run updates running means, variances and quartile estimates and
+            is then dropped, so memory does not grow with ``runs``; only the
+            last run is kept for the non-aggregated plots, and with
+            ``realtimePlot`` the aggregated plot is refreshed after each run).
+        aggregationTimes : int or list of float
+            (active only for aggregation='streaming') the times at which the
+            running statistics are computed, or the number of equally spaced
+            times in [0, ``maxTime``] (default 11).
+        steadyStateTolerance : float
+            If set, each run stops before ``maxTime`` once it is stationary:
+            the time-weighted means and standard deviations of each species
+            (only ``final_x`` and ``final_y`` with visualisationType='final')
+            over two consecutive windows differ by at most this proportion of
+            the system size.  The stopping time is stored in the
+            ``stoppingTime`` of the run results.  Not available with
+            engine='batch' (default None, runs are never stopped early).
+        steadyStateWindow : float
+            (active only if steadyStateTolerance is set) length of the windows
+            compared by the steady-state monitor (default ``maxTime``/20).
+        checkpointFile : str
+            If set, the full state of each run (populations, time, random
+            stream, recorded trajectory and engine) is saved to this file
+            while it runs and when it ends.  Runs saved with the same
+            parameters (apart from ``maxTime`` and ``runs``) are resumed from
+            the file instead of being simulated from the start, so a
+            simulation interrupted by a kernel restart continues where it
+            stopped, and increasing ``maxTime`` (e.g., with the
+            controller's ``extend()``) simulates only the extra time.  Not
+            available with engine='batch' or aggregation='streaming'
+            (default None, no checkpoints).
+        checkpointInterval : float
+            (active only if checkpointFile is set) minimum number of seconds
+            between two checkpoints of a running simulation (default 60).
+        engine : str
+            Simulation algorithm.  Must be one of:
+
+            - ``'direct'``: Gillespie's direct method (default);
+            - ``'nextReaction'``: Gibson-Bruck Next Reaction Method, faster
+              for models with many rules;
+            - ``'compositionRejection'``: composition-rejection SSA, for
+              models with many rules whose rates span several orders of
+              magnitude;
+            - ``'tauLeaping'``: adaptive explicit tau-leaping, approximate but
+              much faster for large system sizes;
+            - ``'hybrid'``: reactions among abundant species integrated as
+              ODEs, the others simulated exactly;
+            - ``'slowScale'``: slow-scale SSA, where pairs of opposite
+              reactions much faster than the others are replaced by their
+              quasi-equilibrium and only the slow reactions are simulated
+              (the fast reactions are reported in the log, and stored in the
+              ``_fastPairs`` attribute of the view);
+            - ``'batch'``: direct method advancing all the runs together,
+              efficient for many runs (the runtime plot is disabled);
+            - ``'langevin'``: chemical Langevin equation, the diffusion
+              approximation of the master equation, integrated for all the
+              runs together with the Euler-Maruyama scheme; populations are
+              continuous and much larger system sizes can be simulated (the
+              runtime plot is disabled);
+            - or ``'langevinMilstein'``: as ``'langevin'``, with the Milstein
+              scheme.
+        tauEpsilon : float
+            Error tolerance of the ``'tauLeaping'`` engine: bound on the
+            relative change of the reaction rates in a leap.  Must be in the
+            range (0, 1).
+        langevinStep : float
+            Integration step of the ``'langevin'`` and ``'langevinMilstein'``
+            engines (default 0.01).  Must be strictly positive.
+        showStationary : bool
+            If True, the exact stationary distribution of the master equation
+            (see :meth:`stationaryDistribution`) is drawn over the
+            ``'final'`` (contours of the joint distribution of ``final_x``
+            and ``final_y``) and ``'barplot'`` (mean and standard deviation
+            of each reactant) visualisations (default False).
 
         """
         if initWidgets is None:
@@ -1399,6 +1514,10 @@ class MuMoTmodel:
         ssaParams['final_y'] = _format_advanced_option(optionName='final_y', inputValue=kwargs.get('final_y'), initValues=initWidgets.get('final_y'), extraParam=self._getAllReactants()[0])
         ssaParams['runs'] = _format_advanced_option(optionName='runs', inputValue=kwargs.get('runs'), initValues=initWidgets.get('runs'))
         ssaParams['aggregateResults'] = _format_advanced_option(optionName='aggregateResults', inputValue=kwargs.get('aggregateResults'), initValues=initWidgets.get('aggregateResults'))
+        ssaParams['recording'] = _format_advanced_option(optionName='recording', inputValue=kwargs.get('recording'), initValues=initWidgets.get('recording'))
+        ssaParams['engine'] = _format_advanced_option(optionName='engine', inputValue=kwargs.get('engine'), initValues=initWidgets.get('engine'))
+        ssaParams['tauEpsilon'] = _format_advanced_option(optionName='tauEpsilon', inputValue=kwargs.get('tauEpsilon'), initValues=initWidgets.get('tauEpsilon'))
+        ssaParams['langevinStep'] = _format_advanced_option(optionName='langevinStep', inputValue=kwargs.get('langevinStep'), initValues=initWidgets.get('langevinStep'))
         
         # construct controller
         viewController = MuMoTstochasticSimulationController(paramValuesDict=paramValuesDict, paramLabelDict=self._ratesLaTeX, continuousReplot=False, advancedOpts=ssaParams, showSystemSize=True, **kwargs)
@@ -1410,6 +1529,475 @@ class MuMoTmodel:
         
         return viewController
 
+    def firstPassage(self, conditions, initWidgets=None, **kwargs):
+        """Compute the distribution of the first-passage times of SSA runs
+        to threshold conditions on the reactants.
+
+        Each run stops as soon as one of the ``conditions`` holds, and no
+        trajectory is recorded.
+
+        Parameters
+        ----------
+        conditions : dict
+            Absorbing conditions, keyed by label.  Each condition is a tuple
+            ``(reactant, comparison, proportion)``, where ``comparison`` is
+            one of ``'>='``, ``'>'``, ``'<='``, ``'<'`` and ``proportion`` is
+            a proportion of the system size, or a list of such tuples that
+            must all hold (e.g., ``{'A': ('A', '>=', 0.8), 'B': ('B', '>=',
+            0.8)}``).  If several conditions hold at the same time, the first
+            one is reported.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState, maxTime, randomSeed, runs, workers, engine, tauEpsilon
+            As for :meth:`SSA` (the ``'batch'`` engine is not available).
+            Results depend on ``randomSeed`` but not on ``workers``.
+
+        Returns
+        -------
+        dict
+            ``'times'``: array with the first-passage time of each run
+            (``inf`` if no condition holds before ``maxTime``);
+            ``'conditions'``: list with the label of the condition hit by each
+            run (None if none).
+
+        """
+        labels, parsedConditions = _parse_passage_conditions(conditions, self._getAllReactants()[0])
+
+        kwargs['silent'] = True
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        times, hits = modelView._firstPassageTimes(parsedConditions)
+        return {'times': times, 'conditions': [labels[hit] if hit >= 0 else None for hit in hits]}
+
+    def meanFirstPassage(self, conditions, tolerance=1e-6, maxStates=100000, initWidgets=None, **kwargs):
+        """Compute the exact mean and variance of the first-passage times to threshold conditions on the reactants.
+
+        The states reachable from the initial state before any of the
+        ``conditions`` holds are enumerated from the stoichiometry, and the
+        backward equations of the master equation (the same process
+        simulated by :meth:`SSA`) are solved with a sparse LU factorisation.
+        This gives the first-passage times from every enumerated state at
+        once, without the sampling error of :meth:`firstPassage`.  If the
+        enumeration is unbounded (e.g., for open systems), it is extended
+        until the mean time from the initial state changes by less than
+        ``tolerance`` (relative).
+
+        Parameters
+        ----------
+        conditions : dict
+            Absorbing conditions, keyed by label, as for :meth:`firstPassage`.
+        tolerance : float, optional
+            Relative tolerance on the mean time from the initial state
+            (default 1e-6).
+        maxStates : int, optional
+            Maximum number of states (default 100000); an error is raised if
+            more are needed.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState
+            As for :meth:`SSA`.
+
+        Returns
+        -------
+        dict
+            ``'mean'``, ``'variance'``: mean and variance of the
+            first-passage time from the initial state; ``'reactants'``:
+            names of the reactants; ``'states'``: array with the populations
+            of the reactants (columns) in each enumerated state (rows, the
+            initial state first); ``'means'``, ``'variances'``: arrays with
+            the mean and variance of the first-passage time from each state
+            (0 if a condition holds in the state, ``inf`` if none might ever
+            hold from it).
+
+        """
+        _, parsedConditions = _parse_passage_conditions(conditions, self._getAllReactants()[0])
+        _check_projection_settings(tolerance, maxStates)
+        kwargs['silent'] = True
+        kwargs['runs'] = 1
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        states, means, variances = modelView._firstPassageMoments(parsedConditions, tolerance, maxStates)
+        plotted = [idx for idx, state in enumerate(modelView._network.species) if state not in self._constantReactants]
+        return {'mean': means[0], 'variance': variances[0],
+                'reactants': [str(modelView._network.species[idx]) for idx in plotted], 'states': states[:, plotted],
+                'means': means, 'variances': variances}
+
+    def sweepSSA(self, paramGrid, observables=None, statistics=None, cacheFile=None, initWidgets=None, **kwargs):
+        """Collect statistics of SSA runs over a grid of parameter values.
+
+        The model is compiled once, and only the rates change between the
+        points of the grid; runs of all the points are distributed over
+        ``workers`` processes.  Run ``r`` draws the same random numbers at
+        every point (common random numbers), so differences between points
+        are not due to different samples.
+
+        Parameters
+        ----------
+        paramGrid : dict
+            Values of the swept parameters, keyed by parameter name (e.g.,
+            ``{'r_1': [0.5, 1, 2], 's': np.linspace(0, 1, 11)}``); the grid
+            is the Cartesian product of the values.  The other parameters are
+            set with ``params`` as for :meth:`SSA`.
+        observables : list of str, optional
+            Reactants whose final proportion of the system size is
+            collected (all the non-constant reactants by default).
+        statistics : list of str, optional
+            Summary statistics of the runs at each point, among ``'mean'``,
+            ``'std'``, ``'median'``, ``'min'`` and ``'max'`` (default
+            ``['mean', 'std']``).
+        cacheFile : str, optional
+            File where the results of each completed point are saved; a
+            sweep interrupted (or repeated, also on a changed grid) with the
+            same settings resumes from the points saved.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState, maxTime, randomSeed, runs, workers, engine, tauEpsilon, steadyStateTolerance, steadyStateWindow
+            As for :meth:`SSA` (the ``'batch'`` engine is not available).
+            Results depend on ``randomSeed`` but not on ``workers``.
+
+        Returns
+        -------
+        dict
+            ``'parameters'``: names of the swept parameters; ``'values'``:
+            list with the array of values of each parameter;
+            ``'observables'``: names of the observables; ``'statistics'``:
+            names of the statistics; ``'data'``: array with shape (values
+            of each parameter..., observables, statistics);
+            ``'samples'``: array with shape (values of each parameter...,
+            runs, observables) with the final proportions of each run.
+
+        """
+        summaryStatistics = {'mean': np.mean, 'std': np.std, 'median': np.median, 'min': np.min, 'max': np.max}
+        if statistics is None:
+            statistics = ['mean', 'std']
+        for statistic in statistics:
+            if statistic not in summaryStatistics:
+                errorMsg = "The specified statistic " + str(statistic) + " is not valid. \n" \
+                            "Valid statistics are: " + str(list(summaryStatistics.keys())) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+        if len(paramGrid) == 0:
+            errorMsg = "The parameter grid is empty. Please specify the values of at least one parameter and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        paramNames = list(paramGrid.keys())
+        paramValues = [np.atleast_1d(np.asarray(paramGrid[name], dtype=float)) for name in paramNames]
+        paramSymbols = _process_params([(name, 0) for name in paramNames])[0]
+        for name, symbol in zip(paramNames, paramSymbols):
+            if symbol not in self._rates:
+                errorMsg = "The swept parameter " + str(name) + " is not a rate of the model. \n" \
+                            "Valid parameters are: " + str(sorted(self._rates, key=str)) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+        reactants = sorted([reactant for reactant in self._getAllReactants()[0] if reactant not in self._constantReactants], key=str)
+        if observables is None:
+            observables = reactants
+        else:
+            observables = [process_sympy(state) if isinstance(state, str) else state for state in observables]
+            for state in observables:
+                if state not in reactants:
+                    errorMsg = "The specified observable " + str(state) + " is not valid. \n" \
+                                "Valid observables are: " + str(reactants) + ". Please correct it and retry."
+                    print(errorMsg)
+                    raise MuMoTValueError(errorMsg)
+
+        # the swept parameters are fixed in the view, so that no widget is created for them
+        params = [param for param in kwargs.get('params', []) if param[0] not in paramNames]
+        kwargs['params'] = params + [(name, values[0]) for name, values in zip(paramNames, paramValues)]
+        kwargs['silent'] = True
+        kwargs['recording'] = 'final'
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        samples = modelView._sweep(list(zip(paramSymbols, paramValues)), observables, cacheFile)
+        data = np.stack([summaryStatistics[statistic](samples, axis=-2) for statistic in statistics], axis=-1)
+        return {'parameters': paramNames, 'values': paramValues, 'observables': [str(state) for state in observables],
+                'statistics': list(statistics), 'data': data, 'samples': samples}
+
+    def weightedEnsemble(self, progress, target, bins, walkersPerBin=10, resamplingTime=0.1, iterations=1000, initWidgets=None, **kwargs):
+        """Estimate the rate of rare transitions with a weighted ensemble of SSA trajectories.
+
+        Weighted trajectories (walkers) start from the initial state and are
+        simulated for ``resamplingTime``; the walkers are then grouped in
+        bins of a progress coordinate, and split or merged so that each
+        occupied bin keeps ``walkersPerBin`` walkers, without changing the
+        total weight.  Walkers reaching the ``target`` value of the progress
+        coordinate are recycled to the initial state: the weight arriving
+        per unit time estimates the switching rate, at a fraction of the
+        cost of observing the switch in plain :meth:`SSA` runs.
+        ``resamplingTime`` should be shorter than the time taken to relax
+        to the stable state.
+
+        Parameters
+        ----------
+        progress : str or dict
+            Progress coordinate: a reactant (its proportion of the system
+            size) or a dictionary of coefficients of the reactant
+            proportions (e.g., ``{'A': 1, 'B': -1}``).
+        target : float
+            Value of the progress coordinate defining the switch (reached
+            from below).
+        bins : list of float
+            Increasing edges of the bins of the progress coordinate, below
+            ``target``.
+        walkersPerBin : int, optional
+            Number of walkers in each occupied bin (default 10).
+        resamplingTime : float, optional
+            Simulation time between two resamplings (default 0.1).
+        iterations : int, optional
+            Number of resamplings (default 1000); the first quarter is not
+            used for the rate estimate.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState, randomSeed, engine, tauEpsilon
+            As for :meth:`SSA` (the ``'batch'`` engine is not available).
+
+        Returns
+        -------
+        dict
+            ``'rate'``: estimated switching rate; ``'meanSwitchingTime'``:
+            its inverse (the mean first-passage time); ``'fluxes'``: weight
+            reaching the target per unit time in each iteration;
+            ``'bins'``: the edges of the bins; ``'binProbabilities'``:
+            average weight in each bin (one more than the edges);
+            ``'paths'``: list of the reactive paths, each a dictionary with
+            its ``'weight'`` and the ``'times'`` and ``'progress'`` at the
+            ends of the iterations up to the switch.
+
+        """
+        reactants = self._getAllReactants()[0]
+        if not isinstance(progress, dict):
+            progress = {progress: 1}
+        parsedProgress = {}
+        for reactant, coefficient in progress.items():
+            reactant = process_sympy(reactant) if isinstance(reactant, str) else reactant
+            if reactant not in reactants or reactant in self._constantReactants or not isinstance(coefficient, numbers.Real):
+                errorMsg = "The specified progress coordinate term " + str(reactant) + ": " + str(coefficient) + " is not valid. \n" \
+                            "Terms must be non-constant reactants with numerical coefficients. Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            parsedProgress[reactant] = coefficient
+        edges = np.asarray(bins, dtype=float)
+        if edges.ndim != 1 or len(edges) == 0 or np.any(np.diff(edges) <= 0) or edges[-1] >= target:
+            errorMsg = "The specified bins " + str(bins) + " are not valid. \n" \
+                        "They must be increasing edges below target = " + str(target) + ". Please correct them and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        if not isinstance(walkersPerBin, numbers.Integral) or walkersPerBin < 1 or not isinstance(iterations, numbers.Integral) or iterations < 4 or resamplingTime <= 0:
+            errorMsg = "The specified values of walkersPerBin = " + str(walkersPerBin) + ", iterations = " + str(iterations) + " or resamplingTime = " + str(resamplingTime) + " are not valid. \n" \
+                        "walkersPerBin must be a positive integer, iterations an integer of at least 4 and resamplingTime positive. Please correct them and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+
+        kwargs['silent'] = True
+        kwargs['runs'] = 1
+        kwargs.setdefault('maxTime', resamplingTime * iterations)
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        coefficients = np.array([parsedProgress.get(state, 0) for state in modelView._network.species], dtype=float)
+        fluxes, binProbabilities, paths = modelView._weightedEnsemble(coefficients, edges, target, walkersPerBin, resamplingTime, iterations)
+        rate = fluxes[iterations//4:].mean()
+        return {'rate': rate, 'meanSwitchingTime': 1/rate if rate > 0 else np.inf, 'fluxes': fluxes, 'bins': edges,
+                'binProbabilities': binProbabilities, 'paths': paths}
+
+    def multilevelSSA(self, rmse, tauLevels=3, coarsestSteps=8, refinement=2, pilotSamples=100, initWidgets=None, **kwargs):
+        """Estimate the expected reactant populations at ``maxTime`` with multilevel Monte Carlo.
+
+        Tau-leaping levels with steps of decreasing length are coupled to
+        each other, and the finest one to the exact SSA, by sharing the
+        Poisson processes of the reactions (Anderson and Higham, 2012): the
+        estimate is as accurate as the mean of exact :meth:`SSA` runs, but
+        most samples are cheap tau-leaping ones.  The number of samples of
+        each level is chosen automatically to reach the requested error at
+        minimum cost.
+
+        Parameters
+        ----------
+        rmse : float
+            Target root-mean-square error of the estimate of each reactant
+            population.
+        tauLevels : int, optional
+            Number of tau-leaping levels (default 3).
+        coarsestSteps : int, optional
+            Number of steps of the coarsest tau-leaping level (default 8).
+        refinement : int, optional
+            Ratio between the number of steps of consecutive levels
+            (default 2).
+        pilotSamples : int, optional
+            Number of samples of each level used to estimate the variances
+            and costs (default 100).
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState, maxTime, randomSeed
+            As for :meth:`SSA`.
+
+        Returns
+        -------
+        dict
+            ``'reactants'``: names of the reactants; ``'mean'``: estimated
+            expected populations; ``'variance'``: variance of the estimates;
+            ``'levels'``: list with the diagnostics of each level
+            (``'steps'``, the number of tau-leaping steps, None for the
+            exact level; ``'samples'``; ``'mean'`` and ``'variance'`` of the
+            coupled differences; ``'cost'``, the mean number of tau-leaping
+            steps and SSA events of a sample); ``'cost'``: total cost;
+            ``'ssaCost'``: estimated cost of plain SSA runs with the same
+            error.
+
+        """
+        for name, value, minimum in [('rmse', rmse, 0), ('tauLevels', tauLevels, 1), ('coarsestSteps', coarsestSteps, 1), ('refinement', refinement, 2), ('pilotSamples', pilotSamples, 2)]:
+            if not isinstance(value, numbers.Real) or value < minimum or (name == 'rmse' and value <= 0) or (name != 'rmse' and not isinstance(value, numbers.Integral)):
+                errorMsg = "The specified value for " + name + " = " + str(value) + " is not valid. \n" \
+                            "It must be " + ("positive" if name == 'rmse' else "an integer of at least " + str(minimum)) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+        kwargs['silent'] = True
+        kwargs['runs'] = 1
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        reactants, mean, variance, levels, ssaCost = modelView._multilevelEstimate(rmse, tauLevels, coarsestSteps, refinement, pilotSamples)
+        return {'reactants': [str(reactant) for reactant in reactants], 'mean': mean, 'variance': variance, 'levels': levels,
+                'cost': sum(level['samples'] * level['cost'] for level in levels), 'ssaCost': ssaCost}
+
+    def solveMasterEquation(self, times=11, tolerance=1e-4, maxStates=100000, initWidgets=None, **kwargs):
+        """Solve the master equation numerically with the finite state projection.
+
+        The states reachable from the initial state are enumerated from the
+        stoichiometry, and the probability distribution over them is
+        propagated with the exponential of the sparse generator of the
+        master equation (the same process simulated by :meth:`SSA`).  The
+        projection is extended until the probability lost to the states not
+        enumerated is below ``tolerance``, so the result is accurate to
+        ``tolerance`` without sampling error; this replaces large ensembles
+        of SSA runs for small to moderate system sizes.
+
+        Parameters
+        ----------
+        times : int or list of float, optional
+            Output times: a number of equally spaced times from 0 to
+            ``maxTime``, or a list of times (default 11).
+        tolerance : float, optional
+            Maximum probability lost by the projection at ``maxTime`` (default 1e-4).
+        maxStates : int, optional
+            Maximum number of states of the projection (default 100000);
+            an error is raised if the tolerance cannot be reached with them.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState, maxTime
+            As for :meth:`SSA`.
+
+        Returns
+        -------
+        dict
+            ``'times'``: output times; ``'marginals'``: for each reactant
+            (keyed by name), an array with the probability of each
+            population (columns) at each time (rows); ``'means'``: for each
+            reactant, the mean population at each time; ``'leaks'``:
+            probability lost by the projection at each time;
+            ``'numStates'``: number of states of the projection.
+
+        """
+        times = _parse_time_grid('times', times)
+        _check_projection_settings(tolerance, maxStates)
+        kwargs['silent'] = True
+        kwargs['runs'] = 1
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        times = _time_grid(_parse_time_grid('times', times, modelView._maxTime), modelView._maxTime)
+        marginals, leaks, numStates = modelView._finiteStateProjection(times, tolerance, maxStates)
+        return {'times': times, 'marginals': {str(state): marginal for state, marginal in marginals.items()},
+                'means': {str(state): marginal.dot(np.arange(marginal.shape[1])) for state, marginal in marginals.items()},
+                'leaks': leaks, 'numStates': numStates}
+
+    def stationaryDistribution(self, tolerance=1e-6, maxStates=100000, initWidgets=None, **kwargs):
+        """Compute the stationary distribution of the master equation.
+
+        The states reachable from the initial state are enumerated from the
+        stoichiometry and the null vector of the sparse generator of the
+        master equation on them (the same process simulated by :meth:`SSA`)
+        is found with GMRES.  The solution is warm started from the last
+        stationary distribution computed for the model, so that scanning a
+        parameter is cheaper than solving each parameter set from scratch.
+        For open systems the enumeration is extended until the stationary
+        probability of its boundary is below ``tolerance``.  For closed
+        systems the distribution depends on the conserved totals of the
+        initial state.
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            Maximum stationary probability of the boundary of the enumerated
+            states (default 1e-6).
+        maxStates : int, optional
+            Maximum number of states (default 100000); an error is raised if
+            the tolerance cannot be reached with them.
+        initWidgets : dict, optional
+             As for :meth:`SSA`.
+
+        Other Parameters
+        ----------------
+        params, initialState
+            As for :meth:`SSA`.
+
+        Returns
+        -------
+        dict
+            ``'reactants'``: names of the reactants; ``'states'``: array
+            with the populations of the reactants (columns) in each
+            enumerated state (rows); ``'probabilities'``: stationary
+            probability of each state (together with ``'states'``, the
+            joint distribution); ``'marginals'``: for each reactant (keyed by
+            name), the stationary probability of each population;
+            ``'means'``: for each reactant, the stationary mean population;
+            ``'leak'``: stationary probability of the boundary of the
+            enumerated states.
+
+        """
+        _check_projection_settings(tolerance, maxStates)
+        kwargs['silent'] = True
+        kwargs['runs'] = 1
+        kwargs.setdefault('visualisationType', 'final')
+        viewController = self.SSA(initWidgets=initWidgets, **kwargs)
+        modelView = viewController._view
+        modelView._update_params()
+        states, probabilities, leak = modelView._stationaryDistribution(tolerance, maxStates)
+        plotted = [idx for idx, state in enumerate(modelView._network.species) if state not in self._constantReactants]
+        reactants = [str(modelView._network.species[idx]) for idx in plotted]
+        states = states[:, plotted]
+        return {'reactants': reactants, 'states': states, 'probabilities': probabilities,
+                'marginals': {reactant: np.bincount(states[:, column], weights=probabilities) for column, reactant in enumerate(reactants)},
+                'means': {reactant: probabilities.dot(states[:, column]) for column, reactant in enumerate(reactants)},
+                'leak': leak}
+
 #         if stateVariable2 is None:
 #             # 2-d bifurcation diagram
 #             # create widgets
@@ -1714,10 +2302,7 @@ class MuMoTmodel:
             if self._systemSize is not None:
                 argList.append(self._systemSize)
             self._args = tuple(argList)
-            self._funcs = {}
-            for equation in self._equations:
-                f = lambdify(self._args, self._equations[equation], "math")
-                self._funcs[equation] = f
+            self._funcs = _lambdified_functions(self._args, self._equations)
             
         return self._funcs
     
@@ -1836,6 +2421,18 @@ class MuMoTmodel:
         self._tmpdir = tempfile.TemporaryDirectory(dir=self._tmpdirpath)
         self._tmpfiles = []
         
+    def __getstate__(self):
+        # temporary files, graphviz objects and compiled functions are not pickled (e.g., when sent to worker processes)
+        state = self.__dict__.copy()
+        for attribute in ['_tmpdir', '_tmpfiles', '_funcs', '_dot', '_pyDSmodel']:
+            state.pop(attribute, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tmpdir = None
+        self._tmpfiles = []
+
     def __del__(self):
         ## @todo: check when this is invoked
         for tmpfile in self._tmpfiles:
@@ -2201,6 +2798,24 @@ class MuMoTtimeEvolutionController(MuMoTcontroller):
 class MuMoTstochasticSimulationController(MuMoTcontroller):
     """Controller for stochastic simulations (base class of MuMoTmultiagentController)."""
     
+    def resume(self):
+        """Run the simulations, resuming the runs saved in the ``checkpointFile`` of the view."""
+        self._view._computeAndPlotSimulation()
+    
+    def extend(self, maxTime):
+        """Extend the simulations to ``maxTime``; the runs saved in the ``checkpointFile`` of the view are continued, simulating only the extra time."""
+        if self._view._checkpointFile is None:
+            errorMsg = "Simulations can be extended only if a checkpointFile is specified."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        if 'maxTime' in self._widgetsExtraParams:
+            widget = self._widgetsExtraParams['maxTime']
+            widget.max = max(widget.max, maxTime)
+            widget.value = maxTime
+        else:
+            self._view._fixedParams['maxTime'] = maxTime
+        self._view._computeAndPlotSimulation()
+    
     def _createAdvancedWidgets(self, SSParams, continuousReplot=False):
         initialState = SSParams['initialState'][0]
         if not SSParams['initialState'][-1]:
@@ -2338,12 +2953,54 @@ class MuMoTstochasticSimulationController(MuMoTcontroller):
             )
             self._widgetsPlotOnly['aggregateResults'] = widget
         
+        ## Dropdown for the recording policy
+        if 'recording' in SSParams and not SSParams['recording'][-1]:
+            dropdown = widgets.Dropdown( 
+                options=[('Every event', 'event'), ('Fixed time grid', 'grid'), ('Final state only', 'final')],
+                description='Recorded states:',
+                value=SSParams['recording'][0], 
+                style={'description_width': 'initial'}
+            )
+            self._widgetsExtraParams['recording'] = dropdown
+        
         self._addSpecificWidgets(SSParams, continuousReplot)
     
         return initialState
             
     def _addSpecificWidgets(self, SSParams, continuousReplot):
-        pass
+        ## Dropdown for the simulation algorithm
+        if 'engine' in SSParams and not SSParams['engine'][-1]:
+            dropdown = widgets.Dropdown( 
+                options=[(label, engine) for engine, label in SSA_ENGINES.items()],
+                description='Simulation algorithm:',
+                value=SSParams['engine'][0], 
+                style={'description_width': 'initial'}
+            )
+            self._widgetsExtraParams['engine'] = dropdown
+        
+        # Tau-leaping error tolerance slider
+        if 'tauEpsilon' in SSParams and not SSParams['tauEpsilon'][-1]:
+            tauEpsilon = SSParams['tauEpsilon']
+            widget = widgets.FloatSlider(value=tauEpsilon[0], min=tauEpsilon[1], 
+                                             max=tauEpsilon[2], step=tauEpsilon[3],
+                                             readout_format='.' + str(_count_sig_decimals(str(tauEpsilon[3]))) + 'f',
+                                             description='Tau-leaping error tolerance:',
+                                             style={'description_width': 'initial'},
+                                             disabled=False,
+                                             continuous_update=continuousReplot) 
+            self._widgetsExtraParams['tauEpsilon'] = widget
+        
+        # Langevin integration step slider
+        if 'langevinStep' in SSParams and not SSParams['langevinStep'][-1]:
+            langevinStep = SSParams['langevinStep']
+            widget = widgets.FloatSlider(value=langevinStep[0], min=langevinStep[1], 
+                                             max=langevinStep[2], step=langevinStep[3],
+                                             readout_format='.' + str(_count_sig_decimals(str(langevinStep[3]))) + 'f',
+                                             description='Langevin time step:',
+                                             style={'description_width': 'initial'},
+                                             disabled=False,
+                                             continuous_update=continuousReplot) 
+            self._widgetsExtraParams['langevinStep'] = widget
     
     def _orderAdvancedWidgets(self, initialState):
         # define the widget order
@@ -2351,6 +3008,9 @@ class MuMoTstochasticSimulationController(MuMoTcontroller):
             self._extraWidgetsOrder.append('init'+str(state))
         self._extraWidgetsOrder.append('maxTime')
         self._extraWidgetsOrder.append('randomSeed')
+        self._extraWidgetsOrder.append('engine')
+        self._extraWidgetsOrder.append('tauEpsilon')
+        self._extraWidgetsOrder.append('langevinStep')
         self._extraWidgetsOrder.append('visualisationType')
         self._extraWidgetsOrder.append('final_x')
         self._extraWidgetsOrder.append('final_y')
@@ -2358,6 +3018,7 @@ class MuMoTstochasticSimulationController(MuMoTcontroller):
         self._extraWidgetsOrder.append('realtimePlot')
         self._extraWidgetsOrder.append('runs')
         self._extraWidgetsOrder.append('aggregateResults')
+        self._extraWidgetsOrder.append('recording')
         
 
 class MuMoTmultiagentController(MuMoTstochasticSimulationController):
@@ -2492,6 +3153,7 @@ class MuMoTmultiagentController(MuMoTstochasticSimulationController):
         self._extraWidgetsOrder.append('realtimePlot')
         self._extraWidgetsOrder.append('runs')
         self._extraWidgetsOrder.append('aggregateResults')
+        self._extraWidgetsOrder.append('recording')
         
     def _update_net_params(self, _=None):
         """Update the widgets related to the ``netType`` 
@@ -2502,7 +3164,7 @@ class MuMoTmultiagentController(MuMoTstochasticSimulationController):
         if self._view: self._view._update_net_params(True)
     
     def downloadTimeEvolution(self):
-        return self._downloadFile(self._view._latestResults[0])
+        return self._downloadFile(self._view._latestResults[0].toCSV(lineSeparator='\\n'))
     
 
 class MuMoTview:
@@ -3711,10 +4373,8 @@ class MuMoTintegrateView(MuMoTtimeEvolutionView):
 class MuMoTnoiseCorrelationsView(MuMoTtimeEvolutionView):
     """Noise correlations around fixed points plot view on model."""
     
-    ## equations of motion for first order moments of noise variables
-    _EOM_1stOrdMomDict = None
-    ## equations of motion for second order moments of noise variables
-    _EOM_2ndOrdMomDict = None
+    ## linear noise approximation of the model (see :class:`_LinearNoiseApproximation`)
+    _linearNoise = None
     ## upper bound of simulation time for dynamical system to reach equilibrium (can be set via keyword)
     _maxTimeDS = None
     ## time step of simulation for dynamical system to reach equilibrium (can be set via keyword)
@@ -3726,19 +4386,14 @@ class MuMoTnoiseCorrelationsView(MuMoTtimeEvolutionView):
         if self._controller is not None:
             self._generatingCommand = "noiseCorrelations"
     
-    def __init__(self, model, controller, NCParams, EOM_1stOrdMom, EOM_2ndOrdMom, figure=None, params=None, **kwargs):
-        self._EOM_1stOrdMomDict = EOM_1stOrdMom
-        self._EOM_2ndOrdMomDict = EOM_2ndOrdMom
+    def __init__(self, model, controller, NCParams, figure=None, params=None, **kwargs):
+        self._linearNoise = model._linearNoiseApproximation()
         self._maxTimeDS = kwargs.get('maxTimeDS', 50)
         self._tstepDS = kwargs.get('tstepDS', 0.01)
         self._ylab = kwargs.get('ylab', 'noise correlations')
         self._silent = kwargs.get('silent', False)
         super().__init__(model=model, controller=controller, tEParams=NCParams, showStateVars=None, figure=figure, params=params, **kwargs)
         #super().__init__(model, controller, None, figure, params, **kwargs)
-        
-        if len(self._stateVarList) < 1 or len(self._stateVarList) > 3:
-            self._showErrorMessage("Not implemented: This feature is available only for systems with 1, 2 or 3 time-dependent reactants!")
-            return None
     
     def _plot_NumSolODE(self, _=None):
         self._show_computation_start()
@@ -3756,224 +4411,51 @@ class MuMoTnoiseCorrelationsView(MuMoTtimeEvolutionView):
                 return None
 
         eps = 5e-3
-        systemSize = Symbol('systemSize')
-        
+        argDict = self._get_argDict()
+        self._linearNoise.setParameters(argDict)
+        reactants = self._linearNoise.reactants
         
         NrDP = int(self._maxTimeDS/self._tstepDS) + 1
         time = np.linspace(0, self._maxTimeDS, NrDP)
-        #NrDP = int(self._tend/self._tstep) + 1
-        #time = np.linspace(0, self._tend, NrDP)
-        
-        initDict = self._initialState
-          
-        SV1_0 = initDict[Symbol(str(self._stateVariable1))]
-        y0 = [SV1_0]
-        if self._stateVariable2:
-            SV2_0 = initDict[Symbol(str(self._stateVariable2))]
-            y0.append(SV2_0)
-        if self._stateVariable3:
-            SV3_0 = initDict[Symbol(str(self._stateVariable3))]
-            y0.append(SV3_0)
-            
-        sol_ODE = odeint(self._get_eqsODE, y0, time)
-        
-        if self._stateVariable3:
-            realEQsol, eigList = self._get_fixedPoints3d()
-        elif self._stateVariable2:
-            realEQsol, eigList = self._get_fixedPoints2d()
-        else:
-            realEQsol, eigList = self._get_fixedPoints1d()
-   
-        y_stationary = [sol_ODE[-1, kk] for kk in range(len(y0))]
+        y0 = [self._initialState[Symbol(str(reactant))] for reactant in reactants]
+        sol_ODE = odeint(lambda y, _: self._linearNoise.drift(y), y0, time)
         
+        # refine the end state of the integration to a zero of the drift: the steady state is reached if it is close to the refined one
+        refinement = root(self._linearNoise.drift, sol_ODE[-1], jac=self._linearNoise.jacobian)
+        steadyStateReached = refinement.success and np.abs(refinement.x - sol_ODE[-1]).max() <= eps*max(1, np.abs(sol_ODE[-1]).max())
+        y_stationary = refinement.x if steadyStateReached else sol_ODE[-1]
         
-        if realEQsol != [] and realEQsol is not None:
-            steadyStateReached = False
-            for kk in range(len(realEQsol)):
-                if self._stateVariable3:
-                    if abs(realEQsol[kk][self._stateVariable1] - y_stationary[0]) <= eps and abs(realEQsol[kk][self._stateVariable2] - y_stationary[1]) <= eps and abs(realEQsol[kk][self._stateVariable3] - y_stationary[2]) <= eps:
-                        if all(sympy.sign(sympy.re(lam)) < 0 for lam in eigList[kk]) == True:
-                            steadyStateReached = True
-                            steadyStateDict = {self._stateVariable1: realEQsol[kk][self._stateVariable1], self._stateVariable2: realEQsol[kk][self._stateVariable2], self._stateVariable3: realEQsol[kk][self._stateVariable3]}
-    
-                elif self._stateVariable2:
-                    if abs(realEQsol[kk][self._stateVariable1] - y_stationary[0]) <= eps and abs(realEQsol[kk][self._stateVariable2] - y_stationary[1]) <= eps:
-                        if all(sympy.sign(sympy.re(lam)) < 0 for lam in eigList[kk]) == True:
-                            steadyStateReached = True
-                            steadyStateDict = {self._stateVariable1: realEQsol[kk][self._stateVariable1], self._stateVariable2: realEQsol[kk][self._stateVariable2]}
-                
-                else:
-                    if abs(realEQsol[kk][self._stateVariable1] - y_stationary[0]) <= eps:
-                        if all(sympy.sign(sympy.re(lam)) < 0 for lam in eigList[kk]) == True:
-                            steadyStateReached = True
-                            steadyStateDict = {self._stateVariable1: realEQsol[kk][self._stateVariable1]}
-            
-                
-            if steadyStateReached == False:
-                self._show_computation_stop()
-                self._showErrorMessage('Stable steady state has not been reached: Try changing the initial conditions or model parameters using the sliders provided, increase simulation time, or decrease timestep tstep.') 
-                return None
-        else:
-            steadyStateReached = 'uncertain'
+        if np.any(np.linalg.eigvals(self._linearNoise.jacobian(y_stationary)).real >= 0):
+            self._show_computation_stop()
+            self._showErrorMessage('Stable steady state has not been reached: Try changing the initial conditions or model parameters using the sliders provided, increase simulation time, or decrease timestep tstep.') 
+            return None
+        if not steadyStateReached:
             self._showErrorMessage('Warning: steady state may have not been reached. Substituted values of state variables at t=maxTimeDS (maxTimeDS can be set via keyword \'maxTimeDS = <number>\').')
-            if self._stateVariable3:
-                steadyStateDict = {self._stateVariable1: y_stationary[0], self._stateVariable2: y_stationary[1], self._stateVariable3: y_stationary[2]}
-            elif self._stateVariable2:
-                steadyStateDict = {self._stateVariable1: y_stationary[0], self._stateVariable2: y_stationary[1]}
-            else:
-                steadyStateDict = {self._stateVariable1: y_stationary[0]}    
          
         with io.capture_output() as log:
-            if steadyStateReached == 'uncertain':
+            if not steadyStateReached:
                 print('This plot depicts the noise-noise auto-correlation and cross-correlation functions around the following state (this might NOT be a steady state).')  
             else:  
                 print('This plot depicts the noise-noise auto-correlation and cross-correlation functions around the following stable steady state:')
-            for reactant in steadyStateDict:
-                out = 'Phi^s_{' + latex(str(reactant)) + '} = ' + latex(_roundNumLogsOut(steadyStateDict[reactant]))
+            for reactant, value in zip(reactants, y_stationary):
+                out = 'Phi^s_{' + latex(str(reactant)) + '} = ' + latex(_roundNumLogsOut(value))
                 out = _doubleUnderscorify(_greekPrependify(out))
                 display(Math(out))
         self._logs.append(log)
-         
-        argDict = self._get_argDict()
-        for key in argDict:
-            if key in self._mumotModel._constantReactants:
-                argDict[Symbol('Phi_'+str(key))] = argDict.pop(key)
-        for key in steadyStateDict:
-            if key in self._mumotModel._reactants:
-                steadyStateDict[Symbol('Phi_'+str(key))] = steadyStateDict.pop(key)
-        
-        EOM_1stOrdMomDict = copy.deepcopy(self._EOM_1stOrdMomDict)
-        for sol in EOM_1stOrdMomDict:
-            EOM_1stOrdMomDict[sol] = EOM_1stOrdMomDict[sol].subs(steadyStateDict)
-            EOM_1stOrdMomDict[sol] = EOM_1stOrdMomDict[sol].subs(argDict)
-        
-        EOM_2ndOrdMomDict = copy.deepcopy(self._EOM_2ndOrdMomDict)
-        
-        SOL_2ndOrdMomDict = self._numericSol2ndOrdMoment(EOM_2ndOrdMomDict, steadyStateDict, argDict)
-        
-        time_depend_noise = []
-        for reactant in self._mumotModel._reactants:
-            if reactant not in self._mumotModel._constantReactants:
-                time_depend_noise.append(Symbol('eta_'+str(reactant)))
-        
-        noiseCorrEOM = []
-        noiseCorrEOMdict = {}
-        for sym in time_depend_noise:
-            for key in EOM_1stOrdMomDict:
-                noiseCorrEOMdict[sym*key] = expand(sym*EOM_1stOrdMomDict[key])
-        
-        M_1, M_2 = symbols('M_1 M_2')
-        eta_SV1 = Symbol('eta_'+str(self._stateVariable1))
-        cVar1 = symbols('cVar1')
-        if self._stateVariable2:
-            eta_SV2 = Symbol('eta_'+str(self._stateVariable2))
-            cVar2, cVar3, cVar4 = symbols('cVar2 cVar3 cVar4')
-        if self._stateVariable3:
-            eta_SV3 = Symbol('eta_'+str(self._stateVariable3))
-            cVar5, cVar6, cVar7, cVar8, cVar9 = symbols('cVar5 cVar6 cVar7 cVar8 cVar9')
-        
-        cVarSubdict = {}    
-        if len(time_depend_noise) == 1:
-            cVarSubdict[eta_SV1*M_1(eta_SV1)] = cVar1
-            #auto-correlation
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV1)])
-        elif len(time_depend_noise) == 2:
-            cVarSubdict[eta_SV1*M_1(eta_SV1)] = cVar1
-            cVarSubdict[eta_SV2*M_1(eta_SV2)] = cVar2
-            cVarSubdict[eta_SV1*M_1(eta_SV2)] = cVar3
-            cVarSubdict[eta_SV2*M_1(eta_SV1)] = cVar4
-            #auto-correlation
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV1)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV2*M_1(eta_SV2)])
-            # cross-correlation
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV2)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV2*M_1(eta_SV1)])
-        elif len(time_depend_noise) == 3:
-            cVarSubdict[eta_SV1*M_1(eta_SV1)] = cVar1
-            cVarSubdict[eta_SV2*M_1(eta_SV2)] = cVar2
-            cVarSubdict[eta_SV3*M_1(eta_SV3)] = cVar3
-            cVarSubdict[eta_SV1*M_1(eta_SV2)] = cVar4
-            cVarSubdict[eta_SV2*M_1(eta_SV1)] = cVar5
-            cVarSubdict[eta_SV1*M_1(eta_SV3)] = cVar6
-            cVarSubdict[eta_SV3*M_1(eta_SV1)] = cVar7
-            cVarSubdict[eta_SV2*M_1(eta_SV3)] = cVar8
-            cVarSubdict[eta_SV3*M_1(eta_SV2)] = cVar9
-            #auto-correlation
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV1)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV2*M_1(eta_SV2)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV3*M_1(eta_SV3)])
-            # cross-correlation
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV2)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV2*M_1(eta_SV1)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV1*M_1(eta_SV3)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV3*M_1(eta_SV1)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV2*M_1(eta_SV3)])
-            noiseCorrEOM.append(noiseCorrEOMdict[eta_SV3*M_1(eta_SV2)])
-        else:
-            self._showErrorMessage('Only implemented for 2 or 3 time-dependent noise variables.')
-         
-        for kk in range(len(noiseCorrEOM)):
-            noiseCorrEOM[kk] = noiseCorrEOM[kk].subs(cVarSubdict)
-        
-        def noiseODEsys(yin, t):
-            dydt = copy.deepcopy(noiseCorrEOM)
-            for kk in range(len(dydt)):
-                if self._stateVariable3:
-                    dydt[kk] = dydt[kk].subs({cVar1: yin[0], cVar2: yin[1], cVar3: yin[2], cVar4: yin[3],
-                                              cVar5: yin[4], cVar6: yin[5], cVar7: yin[6], cVar8: yin[7], cVar9: yin[8]})
-                elif self._stateVariable2:
-                    dydt[kk] = dydt[kk].subs({cVar1: yin[0], cVar2: yin[1], cVar3: yin[2], cVar4: yin[3]})
-                else:
-                    dydt[kk] = dydt[kk].subs({cVar1: yin[0]})
-                dydt[kk] = dydt[kk].evalf()
-            return dydt
         
         NrDP = int(self._maxTime/self._tstep) + 1
         time = np.linspace(0, self._maxTime, NrDP)
-        if self._stateVariable3:
-            y0 = [SOL_2ndOrdMomDict[M_2(eta_SV1**2)], SOL_2ndOrdMomDict[M_2(eta_SV2**2)], SOL_2ndOrdMomDict[M_2(eta_SV3**2)], 
-                  SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)], SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)],
-                  SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV3)], SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV3)],
-                  SOL_2ndOrdMomDict[M_2(eta_SV2*eta_SV3)], SOL_2ndOrdMomDict[M_2(eta_SV2*eta_SV3)]]
-        elif self._stateVariable2:
-            y0 = [SOL_2ndOrdMomDict[M_2(eta_SV1**2)], SOL_2ndOrdMomDict[M_2(eta_SV2**2)], 
-                  SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)], SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)]]
-        else:
-            y0 = [SOL_2ndOrdMomDict[M_2(eta_SV1**2)]]
-        #print(time)
-        #print(y0)
-        #print(SOL_2ndOrdMomDict)
-        sol_ODE = odeint(noiseODEsys, y0, time)  # sol_ODE overwritten
-        
-        x_data = [time for kk in range(len(y0))]  
-        y_data = [sol_ODE[:, kk] for kk in range(len(y0))]
-        noiseNorm = systemSize.subs(argDict)
-        noiseNorm = sympy.N(noiseNorm)
-        for nn in range(len(y_data)):
-            y_temp = np.copy(y_data[nn])
-            for kk in range(len(y_temp)):
-                y_temp[kk] = y_temp[kk]/noiseNorm
-            y_data[nn] = y_temp
-            
-        if self._stateVariable3:
-            c_labels = [r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV1)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV2)+'(t)'+latex(eta_SV2)+'(0)' + '>$',
-                        r'$<'+latex(eta_SV3)+'(t)'+latex(eta_SV3)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV2)+'(t)'+latex(eta_SV1)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV2)+'(0)' + '>$',
-                        r'$<'+latex(eta_SV3)+'(t)'+latex(eta_SV1)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV3)+'(0)' + '>$',
-                        r'$<'+latex(eta_SV3)+'(t)'+latex(eta_SV2)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV2)+'(t)'+latex(eta_SV3)+'(0)' + '>$']
-            
-        elif self._stateVariable2:
-            c_labels = [r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV1)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV2)+'(t)'+latex(eta_SV2)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV2)+'(t)'+latex(eta_SV1)+'(0)' + '>$', 
-                        r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV2)+'(0)' + '>$']
-        else:
-            c_labels = [r'$<'+latex(eta_SV1)+'(t)'+latex(eta_SV1)+'(0)' + '>$']
-        
+        correlations = self._linearNoise.correlations(y_stationary, time)
+        noiseNorm = float(Symbol('systemSize').subs(argDict))
+        
+        # auto-correlations first, then cross-correlations of each pair of reactants displayed
+        displayed = [reactants.index(reactant) for reactant in self._stateVarListDisplay]
+        pairs = [(idx, idx) for idx in displayed]
+        for first, second in itertools.combinations(displayed, 2):
+            pairs.extend([(second, first), (first, second)])
+        x_data = [time for _ in pairs]
+        y_data = [correlations[:, ii, jj]/noiseNorm for ii, jj in pairs]
+        c_labels = [r'$<'+latex(Symbol('eta_'+str(reactants[ii])))+'(t)'+latex(Symbol('eta_'+str(reactants[jj])))+'(0)' + '>$' for ii, jj in pairs]
         c_labels = [_doubleUnderscorify(_greekPrependify(c_labels[jj])) for jj in range(len(c_labels))]
         
         if self._chooseXrange:
@@ -3985,69 +4467,6 @@ class MuMoTnoiseCorrelationsView(MuMoTtimeEvolutionView):
                            legend_fontsize=self._legend_fontsize)
         
         self._show_computation_stop()
-        
-        
-    def _numericSol2ndOrdMoment(self, EOM_2ndOrdMomDict, steadyStateDict, argDict):
-        for sol in EOM_2ndOrdMomDict:
-            EOM_2ndOrdMomDict[sol] = EOM_2ndOrdMomDict[sol].subs(steadyStateDict)
-            EOM_2ndOrdMomDict[sol] = EOM_2ndOrdMomDict[sol].subs(argDict)
-#         
-#         eta_SV1 = Symbol('eta_'+str(self._stateVarList[0]))
-#         eta_SV2 = Symbol('eta_'+str(self._stateVarList[1]))
-#         M_1, M_2 = symbols('M_1 M_2')
-#         if len(self._stateVarList) == 3:
-#             eta_SV3 = Symbol('eta_'+str(self._stateVarList[2]))
-#             
-        M_1, M_2 = symbols('M_1 M_2')     
-        eta_SV1 = Symbol('eta_'+str(self._stateVariable1))
-        if self._stateVariable2:
-            eta_SV2 = Symbol('eta_'+str(self._stateVariable2))
-        if self._stateVariable3:
-            eta_SV3 = Symbol('eta_'+str(self._stateVariable3))
-             
-
-        SOL_2ndOrdMomDict = {} 
-        EQsys2ndOrdMom = []
-        if self._stateVariable3:
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV2*eta_SV2)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV3*eta_SV3)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV3)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV2*eta_SV3)])
-            SOL_2ndOrderMom = list(linsolve(EQsys2ndOrdMom, [M_2(eta_SV1*eta_SV1), 
-                                                             M_2(eta_SV2*eta_SV2), 
-                                                             M_2(eta_SV3*eta_SV3), 
-                                                             M_2(eta_SV1*eta_SV2), 
-                                                             M_2(eta_SV1*eta_SV3), 
-                                                             M_2(eta_SV2*eta_SV3)]))[0]  # only one set of solutions (if any) in linear system of equations; hence index [0]
-            
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)] = SOL_2ndOrderMom[0]
-            SOL_2ndOrdMomDict[M_2(eta_SV2*eta_SV2)] = SOL_2ndOrderMom[1]
-            SOL_2ndOrdMomDict[M_2(eta_SV3*eta_SV3)] = SOL_2ndOrderMom[2]
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)] = SOL_2ndOrderMom[3]
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV3)] = SOL_2ndOrderMom[4]
-            SOL_2ndOrdMomDict[M_2(eta_SV2*eta_SV3)] = SOL_2ndOrderMom[5]
-        
-        elif self._stateVariable2:
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV2*eta_SV2)])
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)])
-            SOL_2ndOrderMom = list(linsolve(EQsys2ndOrdMom, [M_2(eta_SV1*eta_SV1), 
-                                                             M_2(eta_SV2*eta_SV2), 
-                                                             M_2(eta_SV1*eta_SV2)]))[0]  # only one set of solutions (if any) in linear system of equations
-            
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)] = SOL_2ndOrderMom[0]
-            SOL_2ndOrdMomDict[M_2(eta_SV2*eta_SV2)] = SOL_2ndOrderMom[1]
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV2)] = SOL_2ndOrderMom[2]
-            
-        else:
-            EQsys2ndOrdMom.append(EOM_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)])
-            SOL_2ndOrderMom = list(linsolve(EQsys2ndOrdMom, [M_2(eta_SV1*eta_SV1)]))[0]  # only one set of solutions (if any) in linear system of equations
-            SOL_2ndOrdMomDict[M_2(eta_SV1*eta_SV1)] = SOL_2ndOrderMom[0]
-            
-        return SOL_2ndOrdMomDict
-
     
     def _build_bookmark(self, includeParams=True):
         if not self._silent:
@@ -4092,8 +4511,8 @@ class MuMoTfieldView(MuMoTview):
     _stateVariable3 = None
     ## stores fixed points
     _FixedPoints = None
-    ## stores 2nd Order moments of noise-noise correlations
-    _SOL_2ndOrdMomDict = None
+    ## linear noise approximation used to plot noise around fixed points (see :class:`_LinearNoiseApproximation`)
+    _linearNoise = None
     ## X ordinates array
     _X = None
     ## Y ordinates array
@@ -4133,7 +4552,7 @@ class MuMoTfieldView(MuMoTview):
     ## eigenvectors for logs 
     _Evects = None
     
-    def __init__(self, model, controller, SOL_2ndOrd, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
+    def __init__(self, model, controller, linearNoise, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
         if model._systemSize is None and model._constantSystemSize == True:
             print("Cannot construct field-based plot until system size is set, using substitute()")
             return
@@ -4157,11 +4576,11 @@ class MuMoTfieldView(MuMoTview):
             self._stateVariable3 = process_sympy(stateVariable3)
         _mask = {}
         
-        self._SOL_2ndOrdMomDict = SOL_2ndOrd
+        self._linearNoise = linearNoise
         
         self._showNoise = kwargs.get('showNoise', False)
         
-        if self._showNoise == True and self._SOL_2ndOrdMomDict is None and self._stateVariable3 is None:
+        if self._showNoise == True and self._linearNoise is None and self._stateVariable3 is None:
             self._showSSANoise = True
         else:
             self._showSSANoise = False
@@ -4214,7 +4633,7 @@ class MuMoTfieldView(MuMoTview):
         Evects = None
         
         if self._stateVariable3 is None:
-            if self._showFixedPoints == True or self._SOL_2ndOrdMomDict is not None or self._showSSANoise:
+            if self._showFixedPoints == True or self._linearNoise is not None or self._showSSANoise:
                 Phi_stateVar1 = Symbol('Phi_'+str(self._stateVariable1)) 
                 Phi_stateVar2 = Symbol('Phi_'+str(self._stateVariable2))
                 eta_stateVar1 = Symbol('eta_'+str(self._stateVariable1)) 
@@ -4264,21 +4683,23 @@ class MuMoTfieldView(MuMoTview):
                 #self._EV = EV
                 #self._realEQsol = realEQsol
                 #self._Evects = Evects
-            if self._SOL_2ndOrdMomDict:
-                eta_cross = eta_stateVar1*eta_stateVar2
-                for key in self._SOL_2ndOrdMomDict:
-                    if key == self._SOL_2ndOrdMomDict[key] or key in self._SOL_2ndOrdMomDict[key].args:
-                        for key2 in self._SOL_2ndOrdMomDict:
-                            if key2 != key and key2 != M_2(eta_cross):
-                                self._SOL_2ndOrdMomDict[key] = self._SOL_2ndOrdMomDict[key].subs(key, self._SOL_2ndOrdMomDict[key2])
-                
-                SOL_2ndOrdMomDictList = []
-                for nn in range(len(PhiSubList)):
-                    SOL_2ndOrdMomDict = copy.deepcopy(self._SOL_2ndOrdMomDict)
-                    for sol in SOL_2ndOrdMomDict:
-                        SOL_2ndOrdMomDict[sol] = SOL_2ndOrdMomDict[sol].subs(PhiSubList[nn])
-                        SOL_2ndOrdMomDict[sol] = SOL_2ndOrdMomDict[sol].subs(argDict)
-                    SOL_2ndOrdMomDictList.append(SOL_2ndOrdMomDict)
+            if self._linearNoise:
+                # stationary second moments of the noise at the stable fixed points, from the linear noise approximation
+                self._linearNoise.setParameters(self._get_argDict())
+                SOL_2ndOrdMomDictList = [None] * len(realEQsol)
+                if set(self._linearNoise.reactants) != {self._stateVariable1, self._stateVariable2}:
+                    self._showErrorMessage('Noise around fixed points can only be shown if the plot covers all time-dependent reactants (' + ', '.join(str(reactant) for reactant in self._linearNoise.reactants) + ').<br>')
+                else:
+                    idx1 = self._linearNoise.reactants.index(self._stateVariable1)
+                    idx2 = self._linearNoise.reactants.index(self._stateVariable2)
+                    for nn in range(len(realEQsol)):
+                        state = np.array([float(realEQsol[nn][reactant]) for reactant in self._linearNoise.reactants])
+                        if np.any(np.linalg.eigvals(self._linearNoise.jacobian(state)).real >= 0):
+                            # no stationary fluctuations around unstable fixed points
+                            continue
+                        covariance = self._linearNoise.stationaryCovariance(state)
+                        SOL_2ndOrdMomDictList[nn] = {M_2(eta_stateVar1**2): covariance[idx1, idx1], M_2(eta_stateVar2**2): covariance[idx2, idx2], 
+                                                     M_2(eta_stateVar1*eta_stateVar2): covariance[idx1, idx2]}
             
                 angle_ell_list = []
                 projection_angle_list = []
@@ -4300,25 +4721,26 @@ class MuMoTfieldView(MuMoTview):
                     angle_ell_list.append(round(angle_ell_deg, 5))
                 projection_angle_list = [abs(projection_angle_list[kk]) if abs(projection_angle_list[kk]) <= sympy.N(sympy.pi/2) else sympy.N(sympy.pi)-abs(projection_angle_list[kk]) for kk in range(len(projection_angle_list))]
             
-            if self._showFixedPoints == True or self._SOL_2ndOrdMomDict is not None or self._showSSANoise:
+            if self._showFixedPoints == True or self._linearNoise is not None or self._showSSANoise:
                 if self._mumotModel._constantSystemSize == True:
-                    FixedPoints = [[PhiSubList[kk][Phi_stateVar1] for kk in range(len(PhiSubList)) if (0 <= sympy.re(PhiSubList[kk][Phi_stateVar1]) <= 1 and 0 <= sympy.re(PhiSubList[kk][Phi_stateVar2]) <= 1)], 
-                                 [PhiSubList[kk][Phi_stateVar2] for kk in range(len(PhiSubList)) if (0 <= sympy.re(PhiSubList[kk][Phi_stateVar1]) <= 1 and 0 <= sympy.re(PhiSubList[kk][Phi_stateVar2]) <= 1)]]
-                    if self._SOL_2ndOrdMomDict:
-                        Ell_width = [2.0*sympy.re(sympy.cos(sympy.N(sympy.pi/2)-projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)]/systemSize.subs(argDict)) + sympy.sin(sympy.N(sympy.pi/2)-projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)]/systemSize.subs(argDict))) for kk in range(len(SOL_2ndOrdMomDictList)) if (0 <= sympy.re(PhiSubList[kk][Phi_stateVar1]) <= 1 and 0 <= sympy.re(PhiSubList[kk][Phi_stateVar2]) <= 1)]
-                        Ell_height = [2.0*sympy.re(sympy.cos(projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)]/systemSize.subs(argDict)) + sympy.sin(projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)]/systemSize.subs(argDict))) for kk in range(len(SOL_2ndOrdMomDictList)) if (0 <= sympy.re(PhiSubList[kk][Phi_stateVar1]) <= 1 and 0 <= sympy.re(PhiSubList[kk][Phi_stateVar2]) <= 1)]
-                    #FixedPoints=[[realEQsol[kk][self._stateVariable1] for kk in range(len(realEQsol)) if (0 <= sympy.re(realEQsol[kk][self._stateVariable1]) <= 1 and 0 <= sympy.re(realEQsol[kk][self._stateVariable2]) <= 1)], 
-                    #             [realEQsol[kk][self._stateVariable2] for kk in range(len(realEQsol)) if (0 <= sympy.re(realEQsol[kk][self._stateVariable1]) <= 1 and 0 <= sympy.re(realEQsol[kk][self._stateVariable2]) <= 1)]]
+                    plotted = [kk for kk in range(len(PhiSubList)) if (0 <= sympy.re(PhiSubList[kk][Phi_stateVar1]) <= 1 and 0 <= sympy.re(PhiSubList[kk][Phi_stateVar2]) <= 1)]
                 else:
-                    FixedPoints = [[PhiSubList[kk][Phi_stateVar1] for kk in range(len(PhiSubList))], 
-                                 [PhiSubList[kk][Phi_stateVar2] for kk in range(len(PhiSubList))]]
-                    if self._SOL_2ndOrdMomDict:
-                        Ell_width = [2.0*sympy.re(sympy.cos(sympy.N(sympy.pi/2)-projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)]/systemSize.subs(argDict)) + sympy.sin(sympy.N(sympy.pi/2)-projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)]/systemSize.subs(argDict))) for kk in range(len(SOL_2ndOrdMomDictList))]
-                        Ell_height = [2.0*sympy.re(sympy.cos(projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)]/systemSize.subs(argDict)) + sympy.sin(projection_angle_list[kk])*sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)]/systemSize.subs(argDict))) for kk in range(len(SOL_2ndOrdMomDictList))]
-                    #FixedPoints=[[realEQsol[kk][self._stateVariable1] for kk in range(len(realEQsol))], 
-                    #             [realEQsol[kk][self._stateVariable2] for kk in range(len(realEQsol))]]
-                    #Ell_width = [SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)] for kk in range(len(SOL_2ndOrdMomDictList))]
-                    #Ell_height = [SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)] for kk in range(len(SOL_2ndOrdMomDictList))] 
+                    plotted = list(range(len(PhiSubList)))
+                FixedPoints = [[PhiSubList[kk][Phi_stateVar1] for kk in plotted], 
+                               [PhiSubList[kk][Phi_stateVar2] for kk in plotted]]
+                if self._linearNoise:
+                    # ellipse axes from the second moments; None where no noise is shown (see above)
+                    Ell_width = []
+                    Ell_height = []
+                    for pp, kk in enumerate(plotted):
+                        if SOL_2ndOrdMomDictList[kk] is None:
+                            Ell_width.append(None)
+                            Ell_height.append(None)
+                            continue
+                        sigma1 = sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar1**2)]/systemSize.subs(argDict))
+                        sigma2 = sympy.sqrt(SOL_2ndOrdMomDictList[kk][M_2(eta_stateVar2**2)]/systemSize.subs(argDict))
+                        Ell_width.append(2.0*sympy.re(sympy.cos(sympy.N(sympy.pi/2)-projection_angle_list[pp])*sigma2 + sympy.sin(sympy.N(sympy.pi/2)-projection_angle_list[pp])*sigma1))
+                        Ell_height.append(2.0*sympy.re(sympy.cos(projection_angle_list[pp])*sigma2 + sympy.sin(projection_angle_list[pp])*sigma1))
                
                 FixedPoints.append(EVplot)
 #                 
@@ -4355,28 +4777,18 @@ class MuMoTfieldView(MuMoTview):
             
             self._FixedPoints = FixedPoints
             
-            if self._SOL_2ndOrdMomDict:
-                # swap width and height of ellipse if width > height
-                for kk in range(len(Ell_width)):
-                    ell_width_temp = Ell_width[kk]
-                    ell_height_temp = Ell_height[kk]
-                    if ell_width_temp > ell_height_temp:
-                        Ell_height[kk] = ell_width_temp
-                        Ell_width[kk] = ell_height_temp
-                        
-                ells = [mpatch.Ellipse(xy=[self._FixedPoints[0][nn], self._FixedPoints[1][nn]], width=Ell_width[nn]/systemSize.subs(argDict), height=Ell_height[nn]/systemSize.subs(argDict), angle=round(angle_ell_list[nn], 5)) for nn in range(len(self._FixedPoints[0]))]
+            if self._linearNoise:
                 ax = plt.gca()
-                for kk in range(len(ells)):
-                    ax.add_artist(ells[kk])
-                    ells[kk].set_alpha(0.5)
-                    if sympy.re(EVplot[kk][0]) < 0 and sympy.re(EVplot[kk][1]) < 0:
-                        Fcolor = LINE_COLOR_LIST[1]
-                    elif sympy.re(EVplot[kk][0]) > 0 and sympy.re(EVplot[kk][1]) > 0:
-                        Fcolor = LINE_COLOR_LIST[2]
-                    else:
-                        Fcolor = LINE_COLOR_LIST[0]
-                    ells[kk].set_facecolor(Fcolor)
-                #self._ells = ells
+                for nn in range(len(self._FixedPoints[0])):
+                    if Ell_width[nn] is None:
+                        continue
+                    # swap width and height of ellipse if width > height
+                    ell_width = min(Ell_width[nn], Ell_height[nn])
+                    ell_height = max(Ell_width[nn], Ell_height[nn])
+                    ell = mpatch.Ellipse(xy=[self._FixedPoints[0][nn], self._FixedPoints[1][nn]], width=ell_width/systemSize.subs(argDict), height=ell_height/systemSize.subs(argDict), angle=round(angle_ell_list[nn], 5))
+                    ax.add_artist(ell)
+                    ell.set_alpha(0.5)
+                    ell.set_facecolor(LINE_COLOR_LIST[1])  # colour of stable fixed points
             
             if self._showSSANoise:
     #             print(FixedPoints)
@@ -4593,21 +5005,19 @@ class MuMoTfieldView(MuMoTview):
 class MuMoTvectorView(MuMoTfieldView):
     """Vector plot view on model."""
 
-    ## dictionary containing the solutions of the second order noise moments in the stationary state
-    _SOL_2ndOrdMomDict = None
     ## set of all reactants
     _checkReactants = None
     ## set of all constant reactants to get intersection with _checkReactants
     _checkConstReactants = None
     
-    def __init__(self, model, controller, SOL_2ndOrd, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
+    def __init__(self, model, controller, linearNoise, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
         #if model._systemSize is None and model._constantSystemSize == True:
         #    self._showErrorMessage("Cannot construct field-based plot until system size is set, using substitute()")
         #    return
-        #if self._SOL_2ndOrdMomDict is None:
+        #if self._linearNoise is None:
         #    self._showErrorMessage('Noise in the system could not be calculated: \'showNoise\' automatically disabled.')
         silent = kwargs.get('silent', False)
-        super().__init__(model, controller, SOL_2ndOrd, stateVariable1, stateVariable2, stateVariable3, figure, params, **kwargs) 
+        super().__init__(model, controller, linearNoise, stateVariable1, stateVariable2, stateVariable3, figure, params, **kwargs) 
         self._generatingCommand = "vector"
 
     def _plot_field(self, _=None):
@@ -4686,18 +5096,16 @@ class MuMoTvectorView(MuMoTfieldView):
 class MuMoTstreamView(MuMoTfieldView):
     """Stream plot view on model."""
 
-    ## dictionary containing the solutions of the second order noise moments in the stationary state
-    _SOL_2ndOrdMomDict = None
     ## set of all reactants
     _checkReactants = None
     ## set of all constant reactants to get intersection with _checkReactants
     _checkConstReactants = None
     
-    def __init__(self, model, controller, SOL_2ndOrd, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
+    def __init__(self, model, controller, linearNoise, stateVariable1, stateVariable2, stateVariable3=None, figure=None, params=None, **kwargs):
         #if model._systemSize is None and model._constantSystemSize == True:
         #    self._showErrorMessage("Cannot construct field-based plot until system size is set, using substitute()")
         #    return
-        #if self._SOL_2ndOrdMomDict is None:
+        #if self._linearNoise is None:
         #    self._showErrorMessage('Noise in the system could not be calculated: \'showNoise\' automatically disabled.')
 
         self._checkReactants = model._reactants
@@ -4706,7 +5114,7 @@ class MuMoTstreamView(MuMoTfieldView):
         else:
             self._checkConstReactants = None
         silent = kwargs.get('silent', False)
-        super().__init__(model, controller, SOL_2ndOrd, stateVariable1, stateVariable2, stateVariable3, figure, params, **kwargs) 
+        super().__init__(model, controller, linearNoise, stateVariable1, stateVariable2, stateVariable3, figure, params, **kwargs) 
         self._generatingCommand = "stream"
 
     def _plot_field(self, _=None):
@@ -5478,6 +5886,40 @@ class MuMoTstochasticSimulationView(MuMoTview):
     _evo = None
     ## progress bar
     _progressBar = None
+    ## number of processes running the simulations in parallel
+    _workers = 1
+    ## recording policy ('event', 'grid' or 'final')
+    _recording = None
+    ## times at which the state is recorded with the 'grid' policy, or their number (equally spaced in [0, _maxTime])
+    _recordingTimes = None
+    ## aggregation of multiple runs ('stored' keeps every run, 'streaming' keeps running statistics and only the last run)
+    _aggregation = None
+    ## times at which the streaming statistics are computed, or their number (equally spaced in [0, _maxTime])
+    _aggregationTimes = None
+    ## running statistics of the completed runs (with the 'streaming' aggregation)
+    _runningStats = None
+    ## random stream of the current run
+    _rng = None
+    ## maximum change (as proportion of _systemSize) of the windowed means and standard deviations for a run to be stopped as stationary (None to never stop early)
+    _steadyStateTolerance = None
+    ## length of the windows compared by the steady-state monitor (None for _maxTime/20)
+    _steadyStateWindow = None
+    ## index of the next grid time to record in the current run ('grid' recording)
+    _nextRecording = None
+    ## steady-state monitor of the current run
+    _monitor = None
+    ## flag set when the current run has been stopped on reaching a steady state
+    _stationary = None
+    ## file where the state of the runs is saved (None for no checkpoints)
+    _checkpointFile = None
+    ## minimum wall-clock interval (in seconds) between two checkpoints of a running simulation
+    _checkpointInterval = None
+    ## saved state of the runs (written to _checkpointFile)
+    _checkpoint = None
+    ## wall-clock time of the next checkpoint of the running simulation
+    _nextCheckpoint = None
+    ## pickled state of the last run at the end of its simulation (before its results are finalised)
+    _endState = None
     
     def __init__(self, model, controller, SSParams, figure=None, params=None, **kwargs):
         # Loading bar (useful to give user progress status for long executions)
@@ -5493,6 +5935,34 @@ class MuMoTstochasticSimulationView(MuMoTview):
         self._silent = kwargs.get('silent', False)
         if not self._silent:
             display(self._progressBar)
+        self._workers = kwargs.get('workers', 1)
+        if not isinstance(self._workers, numbers.Integral) or self._workers < 1:
+            errorMsg = "The specified value for workers = " + str(self._workers) + " is not valid. \n" \
+                        "It must be a positive integer. Please correct it and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        self._recordingTimes = _parse_time_grid('recordingTimes', kwargs.get('recordingTimes', 101))
+        self._aggregation = kwargs.get('aggregation', 'stored')
+        if self._aggregation not in ['stored', 'streaming']:
+            errorMsg = "The specified value for aggregation = " + str(self._aggregation) + " is not valid. \n" \
+                        "Valid values are: ['stored', 'streaming']. Please correct it and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        self._aggregationTimes = _parse_time_grid('aggregationTimes', kwargs.get('aggregationTimes', 11))
+        self._steadyStateTolerance = kwargs.get('steadyStateTolerance')
+        self._steadyStateWindow = kwargs.get('steadyStateWindow')
+        self._checkpointFile = kwargs.get('checkpointFile')
+        self._checkpointInterval = kwargs.get('checkpointInterval', 60)
+        if self._checkpointFile is not None and self._aggregation == 'streaming':
+            errorMsg = "Checkpoints cannot be used with aggregation = 'streaming'. Please remove checkpointFile or aggregation and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        for optionName, value in [('steadyStateTolerance', self._steadyStateTolerance), ('steadyStateWindow', self._steadyStateWindow), ('checkpointInterval', self._checkpointInterval)]:
+            if value is not None and (not isinstance(value, numbers.Real) or value <= 0):
+                errorMsg = "The specified value for " + optionName + " = " + str(value) + " is not valid. \n" \
+                            "It must be a positive number. Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
             
         super().__init__(model=model, controller=controller, figure=figure, params=params, **kwargs)
 
@@ -5524,6 +5994,7 @@ class MuMoTstochasticSimulationView(MuMoTview):
                 self._realtimePlot = SSParams.get('realtimePlot', False)
                 self._runs = SSParams.get('runs', 1)
                 self._aggregateResults = SSParams.get('aggregateResults', True)
+                self._recording = SSParams.get('recording', 'event')
             
             else:
                 # storing the initial state
@@ -5559,6 +6030,17 @@ class MuMoTstochasticSimulationView(MuMoTview):
         if not self._silent:
             self._computeAndPlotSimulation()
     
+    def __getstate__(self):
+        # widgets, figures and logs are not pickled (e.g., when sent to worker processes)
+        state = self.__dict__.copy()
+        state['_controller'] = None
+        state['_progressBar'] = None
+        state['_figure'] = None
+        state['_logs'] = []
+        state['_latestResults'] = None
+        state['_checkpoint'] = None
+        return state
+    
     def _constructorSpecificParams(self, _):
         pass
     
@@ -5575,12 +6057,10 @@ class MuMoTstochasticSimulationView(MuMoTview):
             self._initFigure()
             
             self._latestResults = []
-            for r in range(self._runs):
-                runID = "[" + str(r+1) + "/" + str(self._runs) + "] " if self._runs > 1 else ''
-                self._latestResults.append(self._runSingleSimulation(self._randomSeed+r, runID=runID))
+            self._runSimulations()
             
             ## Final Plot
-            if not self._realtimePlot or self._aggregateResults:
+            if not self._runtimePlotEnabled() or self._aggregateResults:
 #                 for results in self._latestResults:
 #                     self._updateSimultationFigure(results, fullPlot=True)
                 self._updateSimultationFigure(self._latestResults, fullPlot=True)
@@ -5588,6 +6068,154 @@ class MuMoTstochasticSimulationView(MuMoTview):
             self._show_computation_stop()
         self._logs.append(log)
         
+    def _runSimulations(self):
+        """Run all the simulations, collecting their results with :meth:`_collectRun`."""
+        self._runningStats = None
+        self._loadCheckpoint()
+        if self._workers > 1 and self._runs > 1 and not self._runtimePlotEnabled():
+            self._runParallelSimulations()
+            return
+        for r in range(self._runs):
+            runID = "[" + str(r+1) + "/" + str(self._runs) + "] " if self._runs > 1 else ''
+            self._collectRun(self._runSingleSimulation(r, runID=runID, resumeState=self._resumeState(r)))
+    
+    def _checkpointKey(self):
+        """Return the parameters that a checkpoint must share with the view for its runs to be resumed.
+        
+        The simulation time and the number of runs are not included (unless
+        equally spaced recording times or the default steady-state windows
+        depend on the simulation time), so that runs can be extended.
+        """
+        key = {'view': type(self).__name__,
+               'rates': sorted((str(rate), value) for rate, value in self._ratesDict.items()),
+               'systemSize': self._systemSize,
+               'initialState': sorted((str(state), value) for state, value in self._initialState.items()),
+               'randomSeed': self._randomSeed,
+               'recording': self._recording,
+               'recordingTimes': self._recordingTimes,
+               'steadyStateTolerance': self._steadyStateTolerance,
+               'steadyStateWindow': self._steadyStateWindow}
+        if (self._recording == 'grid' and isinstance(self._recordingTimes, numbers.Integral)) or (self._steadyStateTolerance is not None and self._steadyStateWindow is None):
+            key['maxTime'] = self._maxTime
+        return key
+    
+    def _checkpointAttributes(self):
+        """Return the names of the attributes describing the state of a run."""
+        return ['_t', '_currentState', '_evo', '_rng', '_nextRecording', '_monitor', '_stationary'] + list(self._finalSimulationState().keys())
+    
+    def _runState(self):
+        """Return the state of the current run, as a dictionary of the attributes in :meth:`_checkpointAttributes`."""
+        return {attribute: getattr(self, attribute) for attribute in self._checkpointAttributes()}
+    
+    def _loadCheckpoint(self):
+        """Load the saved runs from ``_checkpointFile`` if they were computed with the same parameters (see :meth:`_checkpointKey`)."""
+        if self._checkpointFile is None:
+            self._checkpoint = None
+            return
+        self._nextCheckpoint = time.time() + self._checkpointInterval
+        key = self._checkpointKey()
+        if os.path.isfile(self._checkpointFile):
+            with open(self._checkpointFile, 'rb') as checkpointFile:
+                self._checkpoint = pickle.load(checkpointFile)
+            if self._checkpoint.get('key') == key:
+                return
+        self._checkpoint = {'key': key, 'runs': {}}
+    
+    def _resumeState(self, run):
+        """Return the saved state of run ``run``, or None if it must be simulated from the start."""
+        if self._checkpoint is None:
+            return None
+        saved = self._checkpoint['runs'].get(run)
+        if saved is None or saved['maxTime'] > self._maxTime:
+            return None
+        return pickle.loads(saved['state'])
+    
+    def _saveRunState(self, run, state):
+        """Store the pickled ``state`` of run ``run`` and write the checkpoint file."""
+        self._checkpoint['runs'][run] = {'maxTime': self._maxTime, 'state': state}
+        temporaryFile = self._checkpointFile + '.tmp'
+        with open(temporaryFile, 'wb') as checkpointFile:
+            pickle.dump(self._checkpoint, checkpointFile)
+        os.replace(temporaryFile, self._checkpointFile)
+        self._nextCheckpoint = time.time() + self._checkpointInterval
+    
+    def _collectRun(self, evo):
+        """Store the results of a completed run in ``_latestResults``.
+        
+        With the 'streaming' aggregation, the run is added to the running
+        statistics and replaces the previously stored run; if ``_realtimePlot``
+        is set, the aggregated plot is refreshed.
+        """
+        if self._aggregation != 'streaming':
+            self._latestResults.append(evo)
+            return
+        if self._runningStats is None:
+            self._runningStats = _RunningStatistics(evo.species, _time_grid(self._aggregationTimes, self._maxTime))
+        self._runningStats.update(evo)
+        self._latestResults[:] = [evo]
+        if self._realtimePlot:
+            self._updateSimultationFigure(self._latestResults, fullPlot=True)
+    
+    def _runParallelSimulations(self):
+        """Run the simulations on a pool of ``_workers`` processes.
+        
+        Each run uses the same random stream as in a sequential execution, and
+        the results are stored in run order.  The runs are split in one chunk
+        per worker (see :func:`_run_chunks`), so that the view is sent once
+        to each worker.
+        """
+        self._progressBar.max = self._runs
+        self._progressBar.value = 0
+        self._progressBar.description = "Loading [0/" + str(self._runs) + "]:"
+        # completed runs are collected in run order, holding only those finished ahead of their turn
+        pending = {}
+        nextRun = 0
+        completed = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers) as executor:
+            futures = {executor.submit(_runSimulationInWorker, self, chunk, [self._resumeState(r) for r in chunk]): chunk for chunk in _run_chunks(self._runs, self._workers)}
+            for future in concurrent.futures.as_completed(futures):
+                pending.update(zip(futures[future], future.result()))
+                while nextRun in pending:
+                    evo, finalState, endState = pending.pop(nextRun)
+                    if self._checkpoint is not None:
+                        self._saveRunState(nextRun, endState)
+                    self._collectRun(evo)
+                    nextRun += 1
+                completed += len(futures[future])
+                self._progressBar.value = completed
+                self._progressBar.description = "Loading [" + str(completed) + "/" + str(self._runs) + "]:"
+        # the view shows the final state of the last run
+        for attribute, value in finalState.items():
+            setattr(self, attribute, value)
+        self._progressBar.description = "Completed 100%:"
+    
+    def _numCollectedRuns(self, allResults):
+        """Return the number of runs summarised by ``allResults`` (or by the running statistics)."""
+        return self._runningStats.count if self._runningStats is not None else len(allResults)
+    
+    def _runtimePlotEnabled(self):
+        """Return True if the plot is updated while the simulations run (with the 'streaming' aggregation, it is updated after each run)."""
+        return self._realtimePlot and self._recording != 'final' and self._aggregation != 'streaming'
+    
+    def _getRecordingTimes(self):
+        """Return the sorted array of the times (up to ``_maxTime``) at which the state is recorded with the 'grid' policy."""
+        return _time_grid(self._recordingTimes, self._maxTime)
+    
+    def _steadyStateMonitor(self):
+        """Return the steady-state monitor of a run starting from ``_currentState``, or None if runs are never stopped early.
+        
+        With the 'final' visualisation only the species on the two axes are monitored.
+        """
+        if self._steadyStateTolerance is None:
+            return None
+        observables = [state for state in self._evo.species if self._visualisationType != 'final' or str(state) in self._finalViewAxes]
+        window = self._steadyStateWindow if self._steadyStateWindow is not None else self._maxTime/20
+        return _SteadyStateMonitor(observables, window, self._steadyStateTolerance*self._systemSize, self._currentState)
+    
+    def _finalSimulationState(self):
+        """Return the attributes describing the final state of a simulation (other than its time evolution)."""
+        return {}
+        
     def _update_view_specific_params(self, freeParamDict=None):
         """Getting other parameters specific to SSA."""
         if freeParamDict is None:
@@ -5608,69 +6236,126 @@ class MuMoTstochasticSimulationView(MuMoTview):
             self._realtimePlot = self._fixedParams['realtimePlot'] if self._fixedParams.get('realtimePlot') is not None else self._controller._widgetsExtraParams['realtimePlot'].value
             self._runs = self._fixedParams['runs'] if self._fixedParams.get('runs') is not None else self._controller._widgetsExtraParams['runs'].value
             self._aggregateResults = self._fixedParams['aggregateResults'] if self._fixedParams.get('aggregateResults') is not None else self._controller._widgetsPlotOnly['aggregateResults'].value
+            self._recording = self._fixedParams['recording'] if self._fixedParams.get('recording') is not None else self._controller._widgetsExtraParams['recording'].value
     
-    def _initSingleSimulation(self):
-        self._progressBar.max = self._maxTime 
-         
+    def _initialPopulations(self, rng):
+        """Return the initial population of each reactant, drawing the rounding of ``_initialState`` with the random stream ``rng``."""
         # initialise populations by multiplying proportion with _systemSize
-        #currentState = copy.deepcopy(self._initialState)
-        #currentState = {s:p*self._systemSize for s,p in self._initialState.items()}
-        self._currentState = {}
+        populations = {}
         leftOvers = {}
         for state, prop in self._initialState.items():
             pop = prop*self._systemSize
             if (not _almostEqual(pop, math.floor(pop))) and (state not in self._mumotModel._constantReactants):
                 leftOvers[state] = pop - math.floor(pop)
-            self._currentState[state] = math.floor(pop)
+            populations[state] = math.floor(pop)
         # if approximations resulted in one agent less, it is added randomly (with probability proportional to the rounding quantities)
-        sumReactants = sum([self._currentState[state] for state in self._currentState.keys() if state not in self._mumotModel._constantReactants])
+        sumReactants = sum([populations[state] for state in populations.keys() if state not in self._mumotModel._constantReactants])
         if sumReactants < self._systemSize:
-            rnd = np.random.rand() * sum(leftOvers.values())
+            rnd = rng.rand() * sum(leftOvers.values())
             bottom = 0.0
             for state, prob in leftOvers.items():
                 if rnd >= bottom and rnd < (bottom + prob):
-                    self._currentState[state] += 1
+                    populations[state] += 1
                     break
                 bottom += prob
+        return populations
+    
+    def _initSingleSimulation(self):
+        if self._progressBar is not None:
+            self._progressBar.max = self._maxTime 
+         
+        self._currentState = self._initialPopulations(self._rng)
                 
         # Create logging structs
-        self._evo = {}
-        self._evo['time'] = [0]
-        for state, pop in self._currentState.items():
-            self._evo[state] = []
-            self._evo[state].append(pop)
+        recordedStates = [state for state in self._currentState if state not in self._mumotModel._constantReactants]
+        constants = {state: pop for state, pop in self._currentState.items() if state in self._mumotModel._constantReactants}
+        self._evo = _Trajectory(recordedStates, constants)
+        self._evo.append(0, [self._currentState[state] for state in recordedStates])
             
         # initialise time
         self._t = 0
     
-    def _runSingleSimulation(self, randomSeed, runID=''):
-        # init the random seed
-        np.random.seed(randomSeed)
-        
-        self._initSingleSimulation()
-        
-        while self._t < self._maxTime:
-            # update progress bar
-            self._progressBar.value = self._t
-            self._progressBar.description = "Loading " + runID + str(round(self._t/self._maxTime*100)) + "%:"
-             
+    def _runSingleSimulation(self, run, runID='', resumeState=None):
+        """Simulate run ``run`` up to ``_maxTime``, starting from scratch or from the saved ``resumeState`` (see :meth:`_checkpointAttributes`)."""
+        if resumeState is None:
+            # init the random stream of the run
+            self._rng = _RandomStream(self._randomSeed, run)
+            
+            self._initSingleSimulation()
+            
+            self._nextRecording = 0
+            if self._recording == 'grid':
+                self._evo.clear()
+            self._monitor = self._steadyStateMonitor()
+            self._stationary = False
+        else:
+            for attribute, value in resumeState.items():
+                setattr(self, attribute, value)
+            if self._progressBar is not None:
+                self._progressBar.max = self._maxTime
+        
+        recordedStates = self._evo.species
+        if self._recording == 'grid':
+            # the state at each grid time is the one set by the last event before it
+            recordingTimes = self._getRecordingTimes()
+        
+        progress = None
+        while self._t < self._maxTime and not self._stationary:
+            # update progress bar (only when the displayed percentage changes, widget updates are expensive)
+            if round(self._t/self._maxTime*100) != progress and self._progressBar is not None:
+                progress = round(self._t/self._maxTime*100)
+                self._progressBar.value = self._t
+                self._progressBar.description = "Loading " + runID + str(progress) + "%:"
+            if self._checkpoint is not None and time.time() >= self._nextCheckpoint:
+                self._saveRunState(run, pickle.dumps(self._runState()))
+            
+            if self._recording == 'grid':
+                previousState = [self._currentState[state] for state in recordedStates]
+            
             timeInterval, self._currentState = self._simulationStep()
             # increment time
             self._t += timeInterval
-             
+            if self._monitor is not None:
+                self._stationary = self._monitor.update(self._t, self._currentState)
+            
             # log step
-            for state, pop in self._currentState.items():
-                if state in self._mumotModel._constantReactants: continue
-                self._evo[state].append(pop)
-            self._evo['time'].append(self._t)
+            if self._recording == 'event':
+                self._evo.append(self._t, [self._currentState[state] for state in recordedStates])
+            elif self._recording == 'grid':
+                if self._nextRecording == len(recordingTimes) or recordingTimes[self._nextRecording] >= self._t:
+                    continue
+                while self._nextRecording < len(recordingTimes) and recordingTimes[self._nextRecording] < self._t:
+                    self._evo.append(recordingTimes[self._nextRecording], previousState)
+                    self._nextRecording += 1
+            else:
+                continue
             
 #             print (self._evo)
-            # Plotting each timestep
-            if self._realtimePlot:
+            # Plotting each recorded timestep
+            if self._runtimePlotEnabled():
                 self._updateSimultationFigure(allResults=self._latestResults, fullPlot=False, currentEvo=self._evo)
-         
-        self._progressBar.value = self._progressBar.max
-        self._progressBar.description = "Completed 100%:"
+        
+        # the state is saved before the results are finalised, so that the run can be extended
+        self._endState = pickle.dumps(self._runState()) if self._checkpointFile is not None else None
+        if self._checkpoint is not None:
+            self._saveRunState(run, self._endState)
+        
+        finalState = [self._currentState[state] for state in recordedStates]
+        self._evo.stoppingTime = self._t if self._stationary else None
+        if self._recording == 'grid':
+            # grid times not preceding the end of the simulation take the final state (up to the stopping time of runs stopped early)
+            remainingTimes = recordingTimes[self._nextRecording:]
+            if self._stationary:
+                remainingTimes = remainingTimes[remainingTimes <= self._t]
+            self._evo.extend(remainingTimes, np.tile(finalState, (len(remainingTimes), 1)))
+        elif self._recording == 'final':
+            self._evo.clear()
+            self._evo.append(self._t, finalState)
+        self._evo.compact()
+        
+        if self._progressBar is not None:
+            self._progressBar.value = self._progressBar.max
+            self._progressBar.description = "Completed 100%:"
 #         print("Temporal evolution per state: " + str(self._evo))
         return self._evo
     
@@ -5682,37 +6367,45 @@ class MuMoTstochasticSimulationView(MuMoTview):
             # if fullPlot, plot all time-evolution
             if fullPlot or len(currentEvo['time']) <= 2:
                 y_max = 1.0 if self._plotProportions else self._systemSize
-                if self._aggregateResults and len(allResults) > 1:  # plot in aggregate mode only if there's enough data
+                if self._aggregateResults and self._numCollectedRuns(allResults) > 1:  # plot in aggregate mode only if there's enough data
                     self._initFigure()
-                    steps = 10
-                    timesteps = list(np.arange(0, self._maxTime, step=self._maxTime/steps))
+                    if self._runningStats is not None:
+                        timesteps = list(self._runningStats.times)
+                        steps = max(1, len(timesteps) - 1)
+                    else:
+                        steps = 10
+                        timesteps = list(np.arange(0, self._maxTime, step=self._maxTime/steps))
     #                 if timesteps[-1] - self._maxTime > self._maxTime/(steps*2):
     #                     timesteps.append(self._maxTime)
     #                 else:
     #                     timesteps[-1] = self._maxTime
-                    if not _almostEqual(timesteps[-1], self._maxTime):
-                        timesteps.append(self._maxTime)
+                        if not _almostEqual(timesteps[-1], self._maxTime):
+                            timesteps.append(self._maxTime)
                     
+                        # for each run, the index of the first sample at or after each timestep
+                        sampleIdxs = [np.minimum(np.searchsorted(results['time'], timesteps), len(results['time']) - 1) for results in allResults]
                     for state in sorted(self._initialState.keys(), key=str):
                         if state == 'time': continue
                         if state in self._mumotModel._constantReactants: continue
-                        boxesData = []
-                        avgs = []
-                        for timestep in timesteps:
-                            boxData = []
-                            for results in allResults:
-                                idx = max(0, bisect_left(results['time'], timestep))
-                                if self._plotProportions:
-                                    boxData.append(results[state][idx]/self._systemSize)
-                                else:
-                                    boxData.append(results[state][idx])
-                            y_max = max(y_max, max(boxData))
-                            boxesData.append(boxData)
-                            avgs.append(np.mean(boxData))
+                        if self._runningStats is not None:
+                            scale = self._systemSize if self._plotProportions else 1
+                            boxesStats = self._runningStats.boxplotStats(state, scale)
+                            y_max = max(y_max, max(boxStats['whishi'] for boxStats in boxesStats))
+                            avgs = self._runningStats.mean(state)/scale
+                            plt.plot(timesteps, avgs, color=self._colors[state])
+                            bplots = plt.gca().bxp(boxesStats, patch_artist=True, positions=timesteps, manage_xticks=False, widths=self._maxTime/(steps*3))
+                        else:
+                            # one row per run, one column per timestep
+                            samples = np.array([results[state][idxs] for results, idxs in zip(allResults, sampleIdxs)])
+                            if self._plotProportions:
+                                samples = samples/self._systemSize
+                            y_max = max(y_max, samples.max())
+                            boxesData = list(samples.T)
+                            avgs = samples.mean(axis=0)
                             #bplot = plt.boxplot(boxData, patch_artist=True, positions=[timestep], manage_xticks=False, widths=self._maxTime/(steps*3) )
     #                         print("Plotting bxplt at positions " + str(timestep) + " generated from idx = " + str(idx))
-                        plt.plot(timesteps, avgs, color=self._colors[state])
-                        bplots = plt.boxplot(boxesData, patch_artist=True, positions=timesteps, manage_xticks=False, widths=self._maxTime/(steps*3))
+                            plt.plot(timesteps, avgs, color=self._colors[state])
+                            bplots = plt.boxplot(boxesData, patch_artist=True, positions=timesteps, manage_xticks=False, widths=self._maxTime/(steps*3))
     #                     for patch, color in zip(bplots['boxes'], [self._colors[state]]*len(timesteps)):
     #                         patch.set_facecolor(color)
     #                     bplot['boxes'].set_facecolor(self._colors[state])
@@ -5746,12 +6439,11 @@ class MuMoTstochasticSimulationView(MuMoTview):
                         for results in allResults:
                             #ydata = []
                             if self._plotProportions:
-                                ydata = [y/self._systemSize for y in results[state]]
+                                ydata = results[state]/self._systemSize
                                 #ydata.append(ytmp)
-                                y_max = max(y_max, max(ydata))
                             else:
                                 ydata = results[state]
-                                y_max = max(y_max, max(results[state]))
+                            y_max = max(y_max, ydata.max())
                             #xdata=[list(np.arange(len(list(evo.values())[0])))]*len(evo.values()), ydata=list(evo.values()), curvelab=list(evo.keys())
                             plt.plot(results['time'], ydata, color=self._colors[state], lw=2)
                     #_fig_formatting_2D(xdata=xdata, ydata=ydata, curvelab=labels, curve_replot=False, choose_xrange=(0, self._maxTime), choose_yrange=(0, y_max) )
@@ -5804,12 +6496,17 @@ class MuMoTstochasticSimulationView(MuMoTview):
                 for state in self._mumotModel._getAllReactants()[0]:  # the current point added to the list of points
                     if str(state) == self._finalViewAxes[0]:
                         points_x.append(currentEvo[state][-1]/self._systemSize if self._plotProportions else currentEvo[state][-1])
-                        trajectory_x = [x/self._systemSize for x in currentEvo[state]] if self._plotProportions else currentEvo[state]
+                        trajectory_x = currentEvo[state]/self._systemSize if self._plotProportions else currentEvo[state]
                     if str(state) == self._finalViewAxes[1]:
                         points_y.append(currentEvo[state][-1]/self._systemSize if self._plotProportions else currentEvo[state][-1])
-                        trajectory_y = [y/self._systemSize for y in currentEvo[state]] if self._plotProportions else currentEvo[state]
+                        trajectory_y = currentEvo[state]/self._systemSize if self._plotProportions else currentEvo[state]
                  
-            if self._aggregateResults and len(allResults) > 2:  # plot in aggregate mode only if there's enough data
+            if self._aggregateResults and self._runningStats is not None and self._runningStats.count > 2:
+                self._initFigure()
+                axes = [state for axis in self._finalViewAxes for state in self._runningStats.species if str(state) == axis]
+                scale = self._systemSize if self._plotProportions else 1
+                _plot_cov_ellipse(self._runningStats.finalCovariance(axes)/scale**2, [self._runningStats.finalMean(state)/scale for state in axes], nstd=1, alpha=0.5, color='green')
+            elif self._aggregateResults and len(allResults) > 2:  # plot in aggregate mode only if there's enough data
                 self._initFigure()
                 samples_x = []
                 samples_y = []
@@ -5853,7 +6550,11 @@ class MuMoTstochasticSimulationView(MuMoTview):
                 for state in sorted(self._initialState.keys(), key=str):
                     if state == 'time': continue
                     if state in self._mumotModel._constantReactants: continue
-                    if self._aggregateResults and len(allResults) > 0:
+                    if self._aggregateResults and self._runningStats is not None:
+                        scale = self._systemSize if self._plotProportions else 1
+                        avg = self._runningStats.finalMean(state)/scale
+                        stdev.append(self._runningStats.finalStd(state)/scale)
+                    elif self._aggregateResults and len(allResults) > 0:
                         points = []
                         for results in allResults:
                             points.append(results[state][-1]/self._systemSize if self._plotProportions else results[state][-1])
@@ -5896,9 +6597,15 @@ class MuMoTstochasticSimulationView(MuMoTview):
             ax.set_xticklabels(stateNamesLabel)
             _fig_formatting_2D(figure=self._figure, xlab="reactants", ylab="population proportion" if self._plotProportions else "population size", aspectRatioEqual=False)
             plt.ylim((0, y_max+padding_y))  # @todo: to fix the choose_yrange of _fig_formatting_2D (issue #104) 
+        if fullPlot:
+            self._plotSimulationOverlay()
         # update the figure
         if not self._silent:
             self._figure.canvas.draw()
+
+    def _plotSimulationOverlay(self):
+        """Draw view-specific results over the completed simulation figure (nothing by default)."""
+        pass
             
     def _redrawOnly(self, _=None):
         self._update_params()
@@ -6054,6 +6761,18 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         logStr += ", realtimePlot = " + str(self._realtimePlot)
         logStr += ", runs = " + str(self._runs)
         logStr += ", aggregateResults = " + str(self._aggregateResults)
+        if self._workers > 1:
+            logStr += ", workers = " + str(self._workers)
+        if self._recording != 'event':
+            logStr += ", recording = '" + str(self._recording) + "'"
+        if self._recording == 'grid':
+            logStr += ", recordingTimes = " + str(self._recordingTimes)
+        if self._aggregation != 'stored':
+            logStr += ", aggregation = '" + str(self._aggregation) + "', aggregationTimes = " + str(self._aggregationTimes)
+        if self._steadyStateTolerance is not None:
+            logStr += ", steadyStateTolerance = " + str(self._steadyStateTolerance) + ", steadyStateWindow = " + str(self._steadyStateWindow)
+        if self._checkpointFile is not None:
+            logStr += ", checkpointFile = " + repr(self._checkpointFile) + ", checkpointInterval = " + str(self._checkpointInterval)
         logStr += ", silent = " + str(self._silent)
         logStr += ", bookmark = False"
 #         if len(self._generatingKwargs) > 0:
@@ -6090,11 +6809,12 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         MAParams["realtimePlot"] = self._realtimePlot
         MAParams["runs"] = self._runs
         MAParams["aggregateResults"] = self._aggregateResults
+        MAParams["recording"] = self._recording
 #         sortedDict = "{"
 #         for key,value in sorted(MAParams.items()):
 #             sortedDict += "'" + key + "': " + str(value) + ", "
 #         sortedDict += "}"
-        print("mumot.MuMoTmultiagentView(<modelName>, None, " + self._get_bookmarks_params().replace('\\', '\\\\') + ", SSParams = " + str(MAParams) + " )")
+        print("mumot.MuMoTmultiagentView(<modelName>, None, " + self._get_bookmarks_params().replace('\\', '\\\\') + ", SSParams = " + str(MAParams) + (", workers = " + str(self._workers) if self._workers > 1 else "") + (", recordingTimes = " + str(self._recordingTimes) if self._recording == 'grid' else "") + (", aggregation = '" + str(self._aggregation) + "', aggregationTimes = " + str(self._aggregationTimes) if self._aggregation != 'stored' else "") + (", steadyStateTolerance = " + str(self._steadyStateTolerance) + ", steadyStateWindow = " + str(self._steadyStateWindow) if self._steadyStateTolerance is not None else "") + (", checkpointFile = " + repr(self._checkpointFile) + ", checkpointInterval = " + str(self._checkpointInterval) if self._checkpointFile is not None else "") + " )")
     
     def _update_view_specific_params(self, freeParamDict=None):
         """read the new parameters (in case they changed in the controller) specific to multiagent(). This function should only update local parameters and not compute data"""
@@ -6118,6 +6838,18 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         
         self._computeScalingFactor()
     
+    def _finalSimulationState(self):
+        return {'_graph': self._graph, '_agents': self._agents, '_positions': self._positions, '_positionHistory': self._positionHistory}
+    
+    def _checkpointKey(self):
+        key = super()._checkpointKey()
+        key['netType'] = self._netType
+        key['netParam'] = self._netParam
+        key['timestepSize'] = self._timestepSize
+        key['particleSpeed'] = self._particleSpeed
+        key['motionCorrelatedness'] = self._motionCorrelatedness
+        return key
+    
     def _initSingleSimulation(self):
         super()._initSingleSimulation()    
         # init the network
@@ -6288,7 +7020,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         elif (self._netType == NetworkType.ERSOS_RENYI):
             #print("Generating Erdos-Renyi graph (connected)")
             if self._netParam is not None and self._netParam > 0 and self._netParam <= 1: 
-                self._graph = nx.erdos_renyi_graph(numNodes, self._netParam, np.random.randint(MAX_RANDOM_SEED))
+                self._graph = nx.erdos_renyi_graph(numNodes, self._netParam, self._rng.randint(MAX_RANDOM_SEED))
                 i = 0
                 while (not nx.is_connected(self._graph)):
                     if i > 100000:
@@ -6298,7 +7030,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
                         raise MuMoTValueError(errorMsg)
                     #print("Graph was not connected; Resampling!")
                     i = i+1
-                    self._graph = nx.erdos_renyi_graph(numNodes, self._netParam, np.random.randint(MAX_RANDOM_SEED))
+                    self._graph = nx.erdos_renyi_graph(numNodes, self._netParam, self._rng.randint(MAX_RANDOM_SEED))
             else:
                 errorMsg = "ERROR! Invalid network parameter (link probability) for E-R networks. It must be between 0 and 1; input is " + str(self._netParam) 
                 print(errorMsg)
@@ -6307,7 +7039,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
             #print("Generating Barabasi-Albert graph")
             netParam = int(self._netParam)
             if netParam is not None and netParam > 0 and netParam <= numNodes: 
-                self._graph = nx.barabasi_albert_graph(numNodes, netParam, np.random.randint(MAX_RANDOM_SEED))
+                self._graph = nx.barabasi_albert_graph(numNodes, netParam, self._rng.randint(MAX_RANDOM_SEED))
             else:
                 errorMsg = "ERROR! Invalid network parameter (number of edges per new node) for B-A networks. It must be an integer between 1 and " + str(numNodes) + "; input is " + str(self._netParam)
                 print(errorMsg)
@@ -6320,9 +7052,9 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         elif (self._netType == NetworkType.DYNAMIC):
             self._positions = []
             for _ in range(numNodes):
-                x = np.random.rand() * self._arena_width
-                y = np.random.rand() * self._arena_height
-                o = np.random.rand() * np.pi * 2.0
+                x = self._rng.rand() * self._arena_width
+                y = self._rng.rand() * self._arena_height
+                o = self._rng.rand() * np.pi * 2.0
                 self._positions.append((x, y, o))
             return
 
@@ -6331,7 +7063,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         self._agents = []
         for state, pop in self._currentState.items():
             self._agents.extend([state]*pop)
-        self._agents = np.random.permutation(self._agents).tolist()  # random shuffling of elements (useful to avoid initial clusters in networks)
+        self._agents = self._rng.permutation(self._agents).tolist()  # random shuffling of elements (useful to avoid initial clusters in networks)
         
         # init the positionHistory lists
         dynamicNetwork = self._netType == NetworkType.DYNAMIC
@@ -6356,7 +7088,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
         #for idx, a in enumerate(self._agents):
         # to execute in random order the agents I just create a shuffled list of idx and I follow that
         indexes = np.arange(0, len(self._agents))
-        indexes = np.random.permutation(indexes).tolist()  # shuffle the indexes
+        indexes = self._rng.permutation(indexes).tolist()  # shuffle the indexes
         for idx in indexes:
             a = self._agents[idx]
             # if moving-particles the agent moves
@@ -6373,7 +7105,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
                 neighNodes = self._getNeighbours(idx, tmp_positions, communication_range)
             else:
                 neighNodes = list(nx.all_neighbors(self._graph, idx))            
-            neighNodes = np.random.permutation(neighNodes).tolist()  # random shuffling of neighNodes (to randomise interactions)
+            neighNodes = self._rng.permutation(neighNodes).tolist()  # random shuffling of neighNodes (to randomise interactions)
             neighAgents = [tmp_agents[x] for x in neighNodes]  # creating the list of neighbours' states 
             neighActive = [activeAgents[x] for x in neighNodes]  # creating the list of neighbour' activity-status
 
@@ -6397,8 +7129,8 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
             self._positionHistory.append([])
             idx = len(self._positions)-1
             self._positionHistory[idx].append(self._positions[idx])
-            self._positions[idx] = (self._positions[idx][0], self._positions[idx][1], np.random.rand() * np.pi * 2.0)  # set random orientation 
-#             self._positions[idx][2] = np.random.rand() * np.pi * 2.0 # set random orientation 
+            self._positions[idx] = (self._positions[idx][0], self._positions[idx][1], self._rng.rand() * np.pi * 2.0)  # set random orientation 
+#             self._positions[idx][2] = self._rng.rand() * np.pi * 2.0 # set random orientation 
             self._positions[idx] = self._updatePosition(self._positions[idx][0], self._positions[idx][1], self._positions[idx][2], self._particleSpeed, self._motionCorrelatedness)
 
         # compute self birth (possible only for moving-particles view)
@@ -6406,13 +7138,13 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
             birthRate = self._ratesDict[str(birth[1])] * self._timestepSize  # scale the rate
             decimal = birthRate % 1
             birthsNum = int(birthRate - decimal)
-            np.random.rand()
-            if (np.random.rand() < decimal): birthsNum += 1
+            self._rng.rand()
+            if (self._rng.rand() < decimal): birthsNum += 1
             #print ( "Birth rate " + str(birth[1]) + " triggers " + str(birthsNum) + " newborns")
             for _ in range(birthsNum):
                 for newborn in birth[2]:
                     self._agents.append(newborn)
-                    self._positions.append((np.random.rand() * self._arena_width, np.random.rand() * self._arena_height, np.random.rand() * np.pi * 2.0))
+                    self._positions.append((self._rng.rand() * self._arena_width, self._rng.rand() * self._arena_height, self._rng.rand() * np.pi * 2.0))
                     self._positionHistory.append([])
                     self._positionHistory[len(self._positions)-1].append(self._positions[len(self._positions)-1])
         
@@ -6429,7 +7161,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
 
     def _stepOneAgent(self, agent, neighs, activeNeighs):
         """One timestep for one agent."""
-        rnd = np.random.rand()
+        rnd = self._rng.rand()
         lastVal = 0
         neighChanges = [None]*len(neighs)
         # counting how many neighbours for each state (to be uses for the interaction probabilities)
@@ -6472,7 +7204,7 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
     
     def _updatePosition(self, x, y, o, speed, correlatedness):
         # random component
-        rand_o = np.random.rand() * np.pi * 2.0
+        rand_o = self._rng.rand() * np.pi * 2.0
         rand_x = speed * np.cos(rand_o) * (1-correlatedness)
         rand_y = speed * np.sin(rand_o) * (1-correlatedness)
         # persistance component 
@@ -6623,19 +7355,489 @@ class MuMoTmultiagentView(MuMoTstochasticSimulationView):
 class MuMoTSSAView(MuMoTstochasticSimulationView): 
     """View for computational simulations of the Gillespie algorithm to approximate the Master Equation solution.""" 
 
-    ## a matrix form of the left-handside of the rules
-    _reactantsMatrix = None 
-    ## the effect of each rule
-    _ruleChanges = None
+    ## array form of the rules (reactant orders, effect of each rule and rates), compiled once per parameter set
+    _network = None
+    ## simulation engine running on _network
+    _engine = None
+    ## simulation algorithm (a key of SSA_ENGINES)
+    _engineType = None
+    ## error tolerance of the tau-leaping engine
+    _tauEpsilon = None
+    ## integration step of the Langevin engines
+    _langevinStep = None
+    ## pairs (forward, backward) of the identifiers of the reactions treated as fast by the 'slowScale' engine in the last simulations (None with other engines)
+    _fastPairs = None
+    ## flag to overlay the stationary distribution of the master equation on the 'final' and 'barplot' visualisations
+    _showStationary = False
+    ## last stationary distribution computed, as (key, (states, probabilities, leak)) (see :meth:`_stationaryDistribution`)
+    _stationaryResult = None
 
-    def _constructorSpecificParams(self, _):
+    def __init__(self, model, controller, SSParams, figure=None, params=None, **kwargs):
+        self._showStationary = kwargs.get('showStationary', False)
+        super().__init__(model, controller, SSParams, figure=figure, params=params, **kwargs)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_engine'] = None
+        return state
+
+    def _constructorSpecificParams(self, SSParams):
         if self._controller is not None:
             self._generatingCommand = "SSA"  
+        else:
+            self._engineType = SSParams.get('engine', 'direct')
+            self._tauEpsilon = SSParams.get('tauEpsilon', 0.03)
+            self._langevinStep = SSParams.get('langevinStep', 0.01)
     
-    def _build_bookmark(self, includeParams=True):
-        logStr = "bookmark = " if not self._silent else ""
-        logStr += "<modelName>." + self._generatingCommand + "("
-        if includeParams:
+    def _update_view_specific_params(self, freeParamDict=None):
+        super()._update_view_specific_params(freeParamDict)
+        if self._controller is not None:
+            self._engineType = self._fixedParams['engine'] if self._fixedParams.get('engine') is not None else self._controller._widgetsExtraParams['engine'].value
+            self._tauEpsilon = self._fixedParams['tauEpsilon'] if self._fixedParams.get('tauEpsilon') is not None else self._controller._widgetsExtraParams['tauEpsilon'].value
+            self._langevinStep = self._fixedParams['langevinStep'] if self._fixedParams.get('langevinStep') is not None else self._controller._widgetsExtraParams['langevinStep'].value
+        self._network = _ReactionNetwork(self._mumotModel._stoichiometry, self._ratesDict, sorted(self._initialState.keys(), key=str))
+
+    def _engineClass(self):
+        """Return the class of the engine ``_engineType`` (a key of ``SSA_ENGINES``)."""
+        return {'direct': _DirectMethod, 'nextReaction': _NextReactionMethod, 'compositionRejection': _CompositionRejectionMethod,
+                'tauLeaping': _TauLeapingMethod, 'hybrid': _HybridMethod, 'slowScale': _SlowScaleMethod, 'batch': _BatchDirectMethod,
+                'langevin': _LangevinMethod, 'langevinMilstein': _LangevinMethod}[self._engineType]
+
+    def _batchEngine(self):
+        """Return True if the engine advances all the runs together (and cannot simulate them one by one)."""
+        return self._engineClass().batched
+    
+    def _runSimulations(self):
+        self._fastPairs = None
+        if self._engineType == 'slowScale':
+            self._fastPairs = [(self._network.reactionIds[forward], self._network.reactionIds[backward]) for forward, backward in _SlowScaleMethod.partition(self._network, _SlowScaleMethod._timescaleSeparation)]
+            if len(self._fastPairs) > 0:
+                print("Reactions treated as fast: " + ", ".join(str(forward) + " <-> " + str(backward) for forward, backward in self._fastPairs))
+            else:
+                print("No reactions treated as fast: all reactions are simulated exactly.")
+        if not self._batchEngine():
+            super()._runSimulations()
+            return
+        if self._steadyStateTolerance is not None:
+            errorMsg = "Runs cannot be stopped on reaching a steady state with engine = '" + self._engineType + "'. \n" \
+                        "Please use another engine or remove steadyStateTolerance and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        if self._checkpointFile is not None:
+            errorMsg = "Checkpoints cannot be used with engine = '" + self._engineType + "'. Please use another engine or remove checkpointFile and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        self._runningStats = None
+        # initial states are drawn with the seed of each run, as for individual runs
+        initialStates = []
+        for r in range(self._runs):
+            self._rng = _RandomStream(self._randomSeed, r)
+            self._initSingleSimulation()
+            initialStates.append(self._network.initState(self._currentState))
+        self._progressBar.max = self._maxTime
+        lastProgress = [None]
+        
+        def updateProgress(t, completedRuns):
+            # update progress bar (only when the displayed percentage changes)
+            progress = round(t/self._maxTime*100)
+            if progress != lastProgress[0]:
+                lastProgress[0] = progress
+                self._progressBar.value = t
+                self._progressBar.description = "Loading [" + str(completedRuns) + "/" + str(self._runs) + "] " + str(progress) + "%:"
+        
+        if self._engineClass() is _BatchDirectMethod:
+            engine = _BatchDirectMethod(self._network, _RandomStream(self._randomSeed))
+        else:
+            engine = _LangevinMethod(self._network, _RandomStream(self._randomSeed), timestep=self._langevinStep, milstein=self._engineType == 'langevinMilstein')
+        runs = engine.run(initialStates, self._maxTime, updateProgress, self._recording, self._getRecordingTimes())
+        recordedIdx = [idx for idx, state in enumerate(self._network.species) if state not in self._mumotModel._constantReactants]
+        constantIdx = [idx for idx, state in enumerate(self._network.species) if state in self._mumotModel._constantReactants]
+        for initialState, (times, populations) in zip(initialStates, runs):
+            constants = {self._network.species[idx]: int(round(initialState[idx])) for idx in constantIdx}
+            # the populations of the Langevin engines are continuous
+            counts = populations[:, recordedIdx] if self._engineClass() is not _BatchDirectMethod else np.round(populations[:, recordedIdx]).astype(np.int64)
+            self._collectRun(_Trajectory.fromArrays([self._network.species[idx] for idx in recordedIdx], times, counts, constants))
+        self._progressBar.value = self._progressBar.max
+        self._progressBar.description = "Completed 100%:"
+    
+    def _runtimePlotEnabled(self):
+        return super()._runtimePlotEnabled() and not self._batchEngine()
+    
+    def _checkpointKey(self):
+        key = super()._checkpointKey()
+        key['engine'] = self._engineType
+        key['tauEpsilon'] = self._tauEpsilon
+        key['langevinStep'] = self._langevinStep
+        return key
+    
+    def _checkpointAttributes(self):
+        return super()._checkpointAttributes() + ['_engine']
+    
+    def _firstPassageTimes(self, conditions):
+        """Run ``_runs`` simulations, each until one of ``conditions`` holds or ``_maxTime`` is reached, without recording them.
+        
+        Each condition is a list of ``(species, comparison, proportion)``
+        triples that must all hold, with ``comparison`` a key of
+        ``COMPARISON_OPERATORS``.  Returns the array of the first times at
+        which a condition holds (``inf`` for runs reaching ``_maxTime``
+        first) and the array of the indices of the conditions hit (-1 if
+        none; if several hold, the first one).  Runs use the same random
+        streams as :meth:`_runSimulations`, also when run on ``_workers``
+        processes.
+        """
+        if self._batchEngine():
+            errorMsg = "First-passage times cannot be computed with engine = '" + self._engineType + "'. Please use another engine and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        thresholds = self._passageThresholds(conditions)
+        times = np.full(self._runs, np.inf)
+        hits = np.full(self._runs, -1, dtype=np.int64)
+        if self._workers > 1 and self._runs > 1:
+            # one chunk of runs per worker (see :func:`_run_chunks`), so that the view is sent once to each worker
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers) as executor:
+                futures = {executor.submit(_firstPassageInWorker, self, chunk, thresholds): chunk for chunk in _run_chunks(self._runs, self._workers)}
+                for future in concurrent.futures.as_completed(futures):
+                    for r, (hitTime, hit) in zip(futures[future], future.result()):
+                        times[r], hits[r] = hitTime, hit
+        else:
+            for r in range(self._runs):
+                times[r], hits[r] = self._runFirstPassage(r, thresholds)
+        return times, hits
+    
+    def _projectionInitialState(self):
+        """Return the initial state of the finite state projections (populations in the order of the network species).
+
+        The populations are rounded as for a simulation with ``_randomSeed``,
+        leaving the random stream and the engine of the view untouched.
+        """
+        populations = self._initialPopulations(_RandomStream(self._randomSeed))
+        return np.round(self._network.initState(populations)[:-1]).astype(np.int64)
+
+    def _passageThresholds(self, conditions):
+        """Convert the proportions of ``conditions`` to populations, and their species and comparisons to network indices and operators."""
+        return [[(self._network.species.index(state), COMPARISON_OPERATORS[comparison], proportion*self._systemSize) for state, comparison, proportion in condition] for condition in conditions]
+
+    def _firstPassageMoments(self, conditions, tolerance, maxStates):
+        """Compute the mean and variance of the time until one of ``conditions`` holds from each state reachable from the initial state.
+        
+        ``conditions`` are as for :meth:`_firstPassageTimes`.  Returns the
+        states of a :class:`_FiniteStateProjection` whose states satisfying
+        a condition are absorbing (one row per state, the initial state
+        first) and the mean and variance of the first-passage time from
+        each of them (:meth:`_FiniteStateProjection.firstPassage`).
+        """
+        thresholds = self._passageThresholds(conditions)
+
+        def absorbing(states):
+            hit = np.zeros(len(states), dtype=bool)
+            for condition in thresholds:
+                hit |= np.all([comparison(states[:, species], threshold) for species, comparison, threshold in condition], axis=0)
+            return hit
+
+        initialState = self._projectionInitialState()
+        projection = _FiniteStateProjection(self._network, initialState, tolerance=tolerance, maxStates=maxStates, absorbing=absorbing)
+        means, variances = projection.firstPassage()
+        return projection.states, means, variances
+
+    def _runFirstPassage(self, run, thresholds):
+        """Simulate run ``run`` until one of ``thresholds`` holds; return the hitting time and the index of the condition (``inf`` and -1 if none holds before ``_maxTime``)."""
+        self._rng = _RandomStream(self._randomSeed, run)
+        self._initSingleSimulation()
+        t = 0
+        while True:
+            state = self._engine.state
+            for idx, condition in enumerate(thresholds):
+                if all(comparison(state[species], threshold) for species, comparison, threshold in condition):
+                    return t, idx
+            timeInterval, _ = self._engine.step(t, self._maxTime)
+            t += timeInterval
+            if t >= self._maxTime:
+                return np.inf, -1
+    
+    def _sweep(self, paramGrid, observables, cacheFile=None):
+        """Run ``_runs`` simulations at each point of ``paramGrid`` and return the final proportions of ``observables``.
+        
+        ``paramGrid`` is a list of ``(parameter, values)`` pairs, with
+        ``parameter`` a SymPy symbol; the other parameters keep their current
+        values.  Only the rates of the compiled network change between
+        points, and run ``r`` uses the same random stream at every point.
+        Simulations of all points are distributed over ``_workers``
+        processes, one task per point.  Returns an array of shape (points of
+        each parameter..., runs, observables).  If ``cacheFile`` is
+        specified, the results of each completed point are saved to it under
+        the rates of the point, and points saved with the same settings are
+        not simulated again, also when the grid changes.
+        """
+        if self._batchEngine():
+            errorMsg = "Parameter sweeps cannot be run with engine = '" + self._engineType + "'. Please use another engine and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        freeParamDict = self._get_argDict()
+        gridShape = tuple(len(values) for _, values in paramGrid)
+        points = list(itertools.product(*[range(size) for size in gridShape]))
+        pointRates = []
+        for point in points:
+            pointParams = dict(freeParamDict)
+            pointParams.update({Symbol(str(param)): values[idx] for (param, values), idx in zip(paramGrid, point)})
+            pointRates.append({str(rule.rate): float(rule.rate.subs(pointParams)) for rule in self._mumotModel._rules})
+        observableIdx = [self._network.species.index(state) for state in observables]
+        
+        cache = None
+        if cacheFile is not None:
+            key = self._checkpointKey()
+            key['maxTime'] = self._maxTime
+            key['runs'] = self._runs
+            key['observables'] = [str(state) for state in observables]
+            if os.path.isfile(cacheFile):
+                with open(cacheFile, 'rb') as cacheStream:
+                    cache = pickle.load(cacheStream)
+            if cache is None or cache.get('key') != key:
+                cache = {'key': key, 'points': {}}
+        # cached points are identified by their rates
+        pointKeys = [tuple(sorted(rates.items())) for rates in pointRates]
+        
+        samples = np.full((len(points), self._runs, len(observables)), np.nan)
+        pending = []
+        for idx in range(len(points)):
+            if cache is not None and pointKeys[idx] in cache['points']:
+                samples[idx] = cache['points'][pointKeys[idx]]
+            else:
+                pending.append(idx)
+        progressBar = self._progressBar
+        if progressBar is not None:
+            progressBar.max = len(points)
+            progressBar.value = len(points) - len(pending)
+        
+        def completePoint(idx, finalStates):
+            samples[idx] = finalStates
+            if cache is not None:
+                cache['points'][pointKeys[idx]] = samples[idx].copy()
+                temporaryFile = cacheFile + '.tmp'
+                with open(temporaryFile, 'wb') as cacheStream:
+                    pickle.dump(cache, cacheStream)
+                os.replace(temporaryFile, cacheFile)
+            if progressBar is not None:
+                progressBar.value += 1
+                progressBar.description = "Sweep " + str(int(progressBar.value)) + "/" + str(len(points)) + ":"
+        
+        # the progress of the single runs is not shown
+        self._progressBar = None
+        try:
+            if self._workers > 1 and len(pending) > 1:
+                # one task per point, so that the view is sent once for all its runs
+                with concurrent.futures.ProcessPoolExecutor(max_workers=self._workers) as executor:
+                    futures = {executor.submit(_sweepInWorker, self, pointRates[idx], observableIdx): idx for idx in pending}
+                    for future in concurrent.futures.as_completed(futures):
+                        completePoint(futures[future], future.result())
+            else:
+                for idx in pending:
+                    completePoint(idx, self._runSweepPoint(pointRates[idx], observableIdx))
+        finally:
+            self._progressBar = progressBar
+        return samples.reshape(gridShape + (self._runs, len(observables)))
+    
+    def _runSweepPoint(self, ratesDict, observableIdx):
+        """Simulate the ``_runs`` runs with the rates ``ratesDict``; return the final proportions of the species ``observableIdx`` (one row per run).
+        
+        The rates of the view and of its network are restored afterwards.
+        """
+        savedRates = self._ratesDict
+        self._ratesDict = ratesDict
+        self._network.setRates(ratesDict)
+        try:
+            finalStates = []
+            for run in range(self._runs):
+                self._runSingleSimulation(run)
+                finalStates.append(self._engine.state[observableIdx] / self._systemSize)
+            return np.array(finalStates)
+        finally:
+            self._ratesDict = savedRates
+            self._network.setRates(savedRates)
+    
+    def _weightedEnsemble(self, coefficients, edges, target, walkersPerBin, resamplingTime, iterations):
+        """Estimate the rate of reaching ``target`` with a weighted ensemble of SSA trajectories.
+        
+        The progress coordinate is the sum of the populations weighted by
+        ``coefficients`` (array over ``_network.species``), divided by the
+        system size; ``edges`` delimit its bins.  Starting from the initial
+        state, ``walkersPerBin`` weighted walkers are simulated for
+        ``resamplingTime`` at each of the ``iterations``; then, in each bin,
+        the heaviest walkers are split and the lightest merged (keeping one
+        of them with probability proportional to its weight) until each
+        occupied bin has ``walkersPerBin`` walkers.  Walkers reaching
+        ``target`` are recycled to the initial state, adding their weight to
+        the flux of the iteration.  Returns the flux per unit time of each
+        iteration, the average probability of each bin, and the reactive
+        paths (weight, and times and progress at the ends of the
+        iterations).
+        """
+        if self._batchEngine():
+            errorMsg = "Weighted ensembles cannot be run with engine = '" + self._engineType + "'. Please use another engine and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        self._rng = _RandomStream(self._randomSeed)
+        self._initSingleSimulation()
+        engine = self._engine
+        initialState = engine.state.copy()
+        
+        def progress(state):
+            return coefficients.dot(state[:-1]) / self._systemSize
+        
+        initialProgress = progress(initialState)
+        if initialProgress >= target:
+            errorMsg = "The initial state has already reached the target (progress " + str(initialProgress) + "). Please correct it and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        # each walker is [weight, state, history of (time, progress)]
+        walkers = [[1/walkersPerBin, initialState.copy(), [(0, initialProgress)]] for _ in range(walkersPerBin)]
+        fluxes = np.zeros(iterations)
+        binProbabilities = np.zeros(len(edges) + 1)
+        paths = []
+        if self._progressBar is not None:
+            self._progressBar.max = iterations
+        for iteration in range(iterations):
+            endTime = (iteration + 1) * resamplingTime
+            for walker in walkers:
+                # the engine advances a copy, so that the state of the walker is kept
+                engine.reset(walker[1].copy())
+                t = 0
+                arrived = False
+                endState = None
+                while True:
+                    previousState = engine.state.copy()
+                    timeInterval, _ = engine.step(t, resamplingTime)
+                    if t + timeInterval > resamplingTime:
+                        # reactions are memoryless, the event beyond the iteration is discarded
+                        endState = previousState
+                        break
+                    t += timeInterval
+                    if progress(engine.state) >= target:
+                        arrived = True
+                        break
+                    if t >= resamplingTime:
+                        break
+                if endState is None:
+                    endState = engine.state.copy()
+                if arrived:
+                    fluxes[iteration] += walker[0]
+                    history = walker[2] + [(iteration * resamplingTime + t, progress(endState))]
+                    paths.append({'weight': walker[0], 'times': np.array([point[0] for point in history]), 'progress': np.array([point[1] for point in history])})
+                    walker[1] = initialState.copy()
+                    walker[2] = [(endTime, initialProgress)]
+                else:
+                    walker[1] = endState
+                    walker[2] = walker[2] + [(endTime, progress(endState))]
+            fluxes[iteration] /= resamplingTime
+            
+            # resample the walkers of each bin
+            bins = {}
+            for walker in walkers:
+                bins.setdefault(int(np.searchsorted(edges, progress(walker[1]), side='right')), []).append(walker)
+            walkers = []
+            for binIdx, binWalkers in sorted(bins.items()):
+                binProbabilities[binIdx] += sum(walker[0] for walker in binWalkers)
+                while len(binWalkers) < walkersPerBin:
+                    heaviest = max(range(len(binWalkers)), key=lambda idx: binWalkers[idx][0])
+                    weight, state, history = binWalkers[heaviest]
+                    binWalkers[heaviest] = [weight/2, state, history]
+                    binWalkers.append([weight/2, state.copy(), list(history)])
+                while len(binWalkers) > walkersPerBin:
+                    binWalkers.sort(key=lambda walker: walker[0])
+                    first, second = binWalkers[0], binWalkers[1]
+                    weight = first[0] + second[0]
+                    survivor = first if self._rng.random_sample() * weight < first[0] else second
+                    binWalkers[:2] = [[weight, survivor[1], survivor[2]]]
+                walkers.extend(binWalkers)
+            if self._progressBar is not None:
+                self._progressBar.value = iteration + 1
+        return fluxes, binProbabilities / iterations, paths
+    
+    def _multilevelEstimate(self, rmse, tauLevels, coarsestSteps, refinement, pilotSamples):
+        """Estimate the expected populations at ``_maxTime`` with a :class:`_MultilevelMonteCarlo` estimator (see :meth:`_MultilevelMonteCarlo.estimate`)."""
+        self._rng = _RandomStream(self._randomSeed)
+        self._initSingleSimulation()
+        estimator = _MultilevelMonteCarlo(self._network, self._network.initState(self._currentState), self._maxTime, self._rng,
+                                          coarsestSteps=coarsestSteps, refinement=refinement, tauLevels=tauLevels)
+        mean, variance, levels, ssaCost = estimator.estimate(rmse, pilotSamples)
+        return [self._network.species[idx] for idx in estimator.observables], mean, variance, levels, ssaCost
+    
+    def _finiteStateProjection(self, times, tolerance, maxStates):
+        """Solve the master equation from the initial state with a :class:`_FiniteStateProjection`.
+        
+        Returns the marginal distribution of each non-constant reactant at
+        each of ``times`` (one row per time), the probability lost by the
+        projection at each time, and the number of states of the projection.
+        """
+        initialState = self._projectionInitialState()
+        projection = _FiniteStateProjection(self._network, initialState, tolerance=tolerance, maxStates=maxStates)
+        distributions = projection.solve(times)
+        marginals = {state: projection.marginals(distributions, idx) for idx, state in enumerate(self._network.species) if state not in self._mumotModel._constantReactants}
+        return marginals, projection.leaks, len(projection.states)
+    
+    def _stationaryDistribution(self, tolerance=1e-6, maxStates=100000):
+        """Return the stationary distribution of the master equation at the current parameters.
+
+        The states reachable from the initial state (one row per state,
+        populations in the order of the network species) and their
+        stationary probabilities are computed by
+        :meth:`_FiniteStateProjection.stationary`, warm started from the
+        last distribution computed for the model, which is then replaced.
+        The result is kept in ``_stationaryResult`` and reused while the
+        rates, the initial state and the settings of the projection do not
+        change.
+        """
+        initialState = self._projectionInitialState()
+        key = (tuple(self._network.rates), tuple(initialState), tolerance, maxStates)
+        if self._stationaryResult is not None and self._stationaryResult[0] == key:
+            return self._stationaryResult[1]
+        projection = _FiniteStateProjection(self._network, initialState, tolerance=tolerance, maxStates=maxStates)
+        speciesNames = tuple(str(state) for state in self._network.species)
+        warmStart = self._mumotModel._stationaryWarmStart
+        probabilities = projection.stationary(warmStart[1] if warmStart is not None and warmStart[0] == speciesNames else None)
+        self._mumotModel._stationaryWarmStart = (speciesNames, dict(zip(map(tuple, projection.states.tolist()), probabilities)))
+        self._stationaryResult = (key, (projection.states, probabilities, projection.leaks[0]))
+        return self._stationaryResult[1]
+
+    def _plotSimulationOverlay(self):
+        if not self._showStationary or self._visualisationType not in ['final', 'barplot']:
+            return
+        try:
+            states, probabilities, _ = self._stationaryDistribution()
+        except MuMoTValueError as error:
+            self._showErrorMessage(str(error) + '<br>')
+            return
+        scale = self._systemSize if self._plotProportions else 1
+        speciesNames = [str(state) for state in self._network.species]
+        if self._visualisationType == 'barplot':
+            plotted = [idx for idx, state in enumerate(self._network.species) if state not in self._mumotModel._constantReactants]
+            means = probabilities.dot(states[:, plotted])
+            stdev = np.sqrt(np.maximum(probabilities.dot(states[:, plotted]**2) - means**2, 0))
+            plt.errorbar(np.arange(len(plotted)), means / scale, yerr=stdev / scale, fmt='D', color='black', capsize=6, label='stationary distribution')
+            plt.legend(loc='upper right', numpoints=1)
+        else:
+            xIdx = speciesNames.index(self._finalViewAxes[0])
+            yIdx = speciesNames.index(self._finalViewAxes[1])
+            joint = np.zeros((states[:, xIdx].max() + 1, states[:, yIdx].max() + 1))
+            np.add.at(joint, (states[:, xIdx], states[:, yIdx]), probabilities)
+            if min(joint.shape) < 2:
+                # degenerate joint distribution: mark its mean
+                plt.plot(probabilities.dot(states[:, xIdx]) / scale, probabilities.dot(states[:, yIdx]) / scale, 'kD', label='stationary distribution')
+            else:
+                plt.contour(np.arange(joint.shape[0]) / scale, np.arange(joint.shape[1]) / scale, joint.T, levels=joint.max() * np.array([0.05, 0.25, 0.5, 0.75, 0.95]), colors='black')
+
+    def _initSingleSimulation(self):
+        super()._initSingleSimulation()
+        engineClass = self._engineClass()
+        if engineClass is _TauLeapingMethod:
+            self._engine = _TauLeapingMethod(self._network, self._rng, epsilon=self._tauEpsilon)
+        else:
+            self._engine = engineClass(self._network, self._rng)
+        self._engine.reset(self._network.initState(self._currentState))
+    
+    def _build_bookmark(self, includeParams=True):
+        logStr = "bookmark = " if not self._silent else ""
+        logStr += "<modelName>." + self._generatingCommand + "("
+        if includeParams:
             logStr += self._get_bookmarks_params()
             logStr += ", "
         logStr = logStr.replace('\\', '\\\\')
@@ -6659,6 +7861,25 @@ class MuMoTSSAView(MuMoTstochasticSimulationView):
         logStr += ", realtimePlot = " + str(self._realtimePlot)
         logStr += ", runs = " + str(self._runs)
         logStr += ", aggregateResults = " + str(self._aggregateResults)
+        if self._workers > 1:
+            logStr += ", workers = " + str(self._workers)
+        if self._recording != 'event':
+            logStr += ", recording = '" + str(self._recording) + "'"
+        if self._recording == 'grid':
+            logStr += ", recordingTimes = " + str(self._recordingTimes)
+        if self._aggregation != 'stored':
+            logStr += ", aggregation = '" + str(self._aggregation) + "', aggregationTimes = " + str(self._aggregationTimes)
+        if self._steadyStateTolerance is not None:
+            logStr += ", steadyStateTolerance = " + str(self._steadyStateTolerance) + ", steadyStateWindow = " + str(self._steadyStateWindow)
+        if self._checkpointFile is not None:
+            logStr += ", checkpointFile = " + repr(self._checkpointFile) + ", checkpointInterval = " + str(self._checkpointInterval)
+        logStr += ", engine = '" + str(self._engineType) + "'"
+        if self._engineType == 'tauLeaping':
+            logStr += ", tauEpsilon = " + str(self._tauEpsilon)
+        if self._engineClass() is _LangevinMethod:
+            logStr += ", langevinStep = " + str(self._langevinStep)
+        if self._showStationary:
+            logStr += ", showStationary = True"
         logStr += ", silent = " + str(self._silent)
         logStr += ", bookmark = False"
 #         if len(self._generatingKwargs) > 0:
@@ -6688,84 +7909,1955 @@ class MuMoTSSAView(MuMoTstochasticSimulationView):
         ssaParams['realtimePlot'] = self._realtimePlot
         ssaParams['runs'] = self._runs
         ssaParams['aggregateResults'] = self._aggregateResults
+        ssaParams['recording'] = self._recording
+        ssaParams['engine'] = self._engineType
+        if self._engineType == 'tauLeaping':
+            ssaParams['tauEpsilon'] = self._tauEpsilon
+        if self._engineClass() is _LangevinMethod:
+            ssaParams['langevinStep'] = self._langevinStep
         #str( list(self._ratesDict.items()) )
-        print("mumot.MuMoTSSAView(<modelName>, None, " + str(self._get_bookmarks_params().replace('\\', '\\\\')) + ", SSParams = " + str(ssaParams) + " )")
+        # keyword arguments of the view, the optional ones only if they differ from their defaults
+        keywords = ["SSParams = " + str(ssaParams)]
+        if self._workers > 1:
+            keywords.append("workers = " + str(self._workers))
+        if self._recording == 'grid':
+            keywords.append("recordingTimes = " + str(self._recordingTimes))
+        if self._aggregation != 'stored':
+            keywords.append("aggregation = '" + str(self._aggregation) + "', aggregationTimes = " + str(self._aggregationTimes))
+        if self._steadyStateTolerance is not None:
+            keywords.append("steadyStateTolerance = " + str(self._steadyStateTolerance) + ", steadyStateWindow = " + str(self._steadyStateWindow))
+        if self._checkpointFile is not None:
+            keywords.append("checkpointFile = " + repr(self._checkpointFile) + ", checkpointInterval = " + str(self._checkpointInterval))
+        if self._showStationary:
+            keywords.append("showStationary = True")
+        print("mumot.MuMoTSSAView(<modelName>, None, " + str(self._get_bookmarks_params().replace('\\', '\\\\')) + ", " + ", ".join(keywords) + " )")
             
     def _simulationStep(self): 
-        # update transition probabilities accounting for the current state
-        probabilitiesOfChange = {}
-        for reaction_id, reaction in self._mumotModel._stoichiometry.items():
-            prob = self._ratesDict[str(reaction["rate"])]
-            numReagents = 0  
+        timeInterval, _ = self._engine.step(self._t, self._maxTime)
+        # copy back to the state dictionary only the populations changed in the step
+        state = self._engine.state
+        for idx in self._engine.lastChanged:
+            self._currentState[self._network.species[idx]] = int(round(state[idx]))
+        
+        return (timeInterval, self._currentState)
+    
+
+class _Trajectory:
+    """Time evolution of the populations recorded during a stochastic simulation run.
+
+    Samples are stored column-wise in preallocated NumPy buffers (a float64
+    time column and a count matrix with one column per species, int64 or,
+    for continuous approximations, float64), which double in size when full.  Indexing with ``'time'`` or a species returns a
+    zero-copy view of the recorded values, so a trajectory can be read like a
+    dictionary of sequences keyed by ``'time'`` and by the (SymPy) species.
+    Constant reactants are stored once, as their population never changes.
+
+    """
+    ## ordered list of (SymPy) species with a recorded population
+    species = None
+    ## position of each species in the columns of the count matrix
+    index = None
+    ## population of each constant reactant
+    constants = None
+    ## time at which the run was stopped on reaching a steady state (None if it was not stopped early)
+    stoppingTime = None
+
+    def __init__(self, species, constants=None, capacity=1024, dtype=np.int64):
+        self.species = list(species)
+        self.index = {state: idx for idx, state in enumerate(self.species)}
+        self.constants = dict(constants) if constants is not None else {}
+        self._times = np.empty(max(1, capacity))
+        self._counts = np.empty((max(1, capacity), len(self.species)), dtype=dtype)
+        self._length = 0
+
+    @classmethod
+    def fromArrays(cls, species, times, counts, constants=None):
+        """Build a trajectory holding the samples ``times`` and ``counts`` (one row per sample, one column per species), with the type of ``counts``."""
+        trajectory = cls(species, constants, capacity=len(times), dtype=np.asarray(counts).dtype)
+        trajectory.extend(times, counts)
+        return trajectory
+
+    @property
+    def times(self):
+        """Recorded times (view on the time buffer)."""
+        return self._times[:self._length]
+
+    @property
+    def counts(self):
+        """Recorded populations, one row per sample (view on the count buffer)."""
+        return self._counts[:self._length]
+
+    def append(self, time, populations):
+        """Record the populations (in the order of ``species``) at ``time``."""
+        if self._length == len(self._times):
+            self._reserve(2 * self._length)
+        self._times[self._length] = time
+        self._counts[self._length] = populations
+        self._length += 1
+
+    def extend(self, times, counts):
+        """Record several samples at once."""
+        end = self._length + len(times)
+        if end > len(self._times):
+            self._reserve(max(end, 2 * self._length))
+        self._times[self._length:end] = times
+        self._counts[self._length:end] = counts
+        self._length = end
+
+    def clear(self):
+        """Remove all the samples, keeping the allocated buffers."""
+        self._length = 0
+
+    def compact(self):
+        """Release the unused capacity of the buffers."""
+        self._reserve(self._length)
+
+    def _reserve(self, capacity):
+        capacity = max(1, capacity)
+        times = np.empty(capacity)
+        counts = np.empty((capacity, len(self.species)), dtype=self._counts.dtype)
+        times[:self._length] = self.times
+        counts[:self._length] = self.counts
+        self._times = times
+        self._counts = counts
+
+    def toCSV(self, lineSeparator='\n'):
+        """Return the recorded samples as comma-separated values, with a header row."""
+        lines = [','.join(['time'] + [str(state) for state in self.species])]
+        for time, populations in zip(self.times, self.counts):
+            lines.append(','.join([repr(float(time))] + [str(pop) for pop in populations]))
+        return lineSeparator.join(lines)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if key == 'time':
+            return self.times
+        if key in self.constants:
+            return np.full(1, self.constants[key], dtype=np.int64)
+        return self._counts[:self._length, self.index[key]]
+
+    def __contains__(self, key):
+        return key == 'time' or key in self.index or key in self.constants
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return ['time'] + self.species + list(self.constants.keys())
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __getstate__(self):
+        # only the recorded samples are sent to other processes
+        state = self.__dict__.copy()
+        state['_times'] = self.times.copy()
+        state['_counts'] = self.counts.copy()
+        return state
+
+
+class _QuantileSketch:
+    """Streaming estimate of the ``p``-quantile of each cell of an array, with the P² algorithm (Jain and Chlamtac, 1985).
+
+    Each cell keeps five markers whose heights approximate the minimum, the
+    ``p/2``, ``p`` and ``(1+p)/2`` quantiles and the maximum of the observed
+    values, so memory does not grow with the number of observations.  Until
+    five values have been observed, the quantiles are exact.
+
+    """
+    ## quantile to estimate
+    p = None
+    ## number of observations
+    count = None
+
+    def __init__(self, p, shape):
+        self.p = p
+        self.count = 0
+        self._heights = np.zeros(tuple(shape) + (5,))
+        self._positions = np.tile(np.arange(5.0), tuple(shape) + (1,))
+        self._desired = np.array([0, 2*p, 4*p, 2 + 2*p, 4])
+        self._increments = np.array([0, p/2, p, (1 + p)/2, 1])
+
+    def update(self, values):
+        """Add one observation per cell."""
+        values = np.asarray(values, dtype=float)
+        q = self._heights
+        n = self._positions
+        if self.count < 5:
+            q[..., self.count] = values
+            self.count += 1
+            if self.count == 5:
+                q.sort(axis=-1)
+            return
+        self.count += 1
+        # cell k of the markers such that q[k] <= value < q[k+1]
+        k = np.sum(values[..., None] >= q[..., 1:4], axis=-1)
+        q[..., 0] = np.minimum(q[..., 0], values)
+        q[..., 4] = np.maximum(q[..., 4], values)
+        n += np.arange(5) > k[..., None]
+        self._desired += self._increments
+        for i in range(1, 4):
+            d = self._desired[i] - n[..., i]
+            move = ((d >= 1) & (n[..., i+1] - n[..., i] > 1)) | ((d <= -1) & (n[..., i-1] - n[..., i] < -1))
+            if not move.any():
+                continue
+            s = np.sign(d)
+            parabolic = q[..., i] + s/(n[..., i+1] - n[..., i-1]) * (
+                (n[..., i] - n[..., i-1] + s) * (q[..., i+1] - q[..., i])/(n[..., i+1] - n[..., i])
+                + (n[..., i+1] - n[..., i] - s) * (q[..., i] - q[..., i-1])/(n[..., i] - n[..., i-1]))
+            linear = q[..., i] + s * (np.where(s > 0, q[..., i+1], q[..., i-1]) - q[..., i]) \
+                / (np.where(s > 0, n[..., i+1], n[..., i-1]) - n[..., i])
+            parabolicValid = (q[..., i-1] < parabolic) & (parabolic < q[..., i+1])
+            q[..., i] = np.where(move, np.where(parabolicValid, parabolic, linear), q[..., i])
+            n[..., i] += np.where(move, s, 0)
+
+    def quantile(self):
+        """Estimated ``p``-quantile of each cell."""
+        if self.count < 5:
+            return np.percentile(self._heights[..., :self.count], self.p*100, axis=-1)
+        return self._heights[..., 2].copy()
+
+    def minimum(self):
+        """Smallest observation of each cell."""
+        return self._heights[..., :min(self.count, 5)].min(axis=-1)
+
+    def maximum(self):
+        """Largest observation of each cell."""
+        return self._heights[..., :min(self.count, 5)].max(axis=-1)
+
+
+class _RunningStatistics:
+    """Statistics of the trajectories of multiple runs, updated as each run completes.
+
+    At each time of ``times`` the population of each species (taken from the
+    first sample at or after that time) is summarised by its mean and variance
+    (Welford's algorithm) and by streaming estimates of its quartiles, minimum
+    and maximum; the final states are summarised by their mean and covariance.
+    Memory does not depend on the number of runs.
+
+    """
+    ## ordered list of (SymPy) species
+    species = None
+    ## position of each species in the statistics arrays
+    index = None
+    ## times at which the populations are summarised
+    times = None
+    ## number of runs added
+    count = None
+
+    def __init__(self, species, times):
+        self.species = list(species)
+        self.index = {state: idx for idx, state in enumerate(self.species)}
+        self.times = np.asarray(times, dtype=float)
+        self.count = 0
+        shape = (len(self.times), len(self.species))
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        self._quartiles = [_QuantileSketch(p, shape) for p in [0.25, 0.5, 0.75]]
+        self._finalMean = np.zeros(len(self.species))
+        self._finalComoment = np.zeros((len(self.species), len(self.species)))
+
+    def update(self, evo):
+        """Add the :class:`_Trajectory` ``evo`` of a run (with the same species)."""
+        idxs = np.minimum(np.searchsorted(evo['time'], self.times), len(evo) - 1)
+        columns = [evo.index[state] for state in self.species]
+        samples = evo.counts[idxs][:, columns]
+        final = evo.counts[-1, columns]
+        self.count += 1
+        delta = samples - self._mean
+        self._mean += delta/self.count
+        self._m2 += delta*(samples - self._mean)
+        for sketch in self._quartiles:
+            sketch.update(samples)
+        delta = final - self._finalMean
+        self._finalMean += delta/self.count
+        self._finalComoment += np.outer(delta, final - self._finalMean)
+
+    def mean(self, state):
+        """Mean population of ``state`` at each time."""
+        return self._mean[:, self.index[state]]
+
+    def std(self, state):
+        """Standard deviation of the population of ``state`` at each time."""
+        return np.sqrt(self._m2[:, self.index[state]]/max(1, self.count))
+
+    def finalMean(self, state):
+        """Mean final population of ``state``."""
+        return self._finalMean[self.index[state]]
+
+    def finalStd(self, state):
+        """Standard deviation of the final population of ``state``."""
+        idx = self.index[state]
+        return np.sqrt(self._finalComoment[idx, idx]/max(1, self.count))
+
+    def finalCovariance(self, states):
+        """Sample covariance matrix of the final populations of ``states``."""
+        idxs = [self.index[state] for state in states]
+        return self._finalComoment[np.ix_(idxs, idxs)]/max(1, self.count - 1)
+
+    def boxplotStats(self, state, scale=1):
+        """Box statistics of ``state`` at each time, in the format of :meth:`matplotlib.axes.Axes.bxp`.
+
+        Whiskers extend to the most extreme observation within 1.5 times the
+        interquartile range when that observation is the minimum or maximum,
+        and to the range limit otherwise; outliers are not kept.
+        """
+        idx = self.index[state]
+        q1, med, q3 = [sketch.quantile()[:, idx]/scale for sketch in self._quartiles]
+        low = self._quartiles[1].minimum()[:, idx]/scale
+        high = self._quartiles[1].maximum()[:, idx]/scale
+        iqr = q3 - q1
+        whislo = np.maximum(low, q1 - 1.5*iqr)
+        whishi = np.minimum(high, q3 + 1.5*iqr)
+        mean = self.mean(state)/scale
+        return [{'med': med[t], 'q1': q1[t], 'q3': q3[t], 'whislo': whislo[t], 'whishi': whishi[t], 'mean': mean[t], 'fliers': []}
+                for t in range(len(self.times))]
+
+
+class _SteadyStateMonitor:
+    """Detection of the steady state of a simulation run.
+
+    The time-weighted mean and standard deviation of each observable are
+    computed over consecutive windows of length ``window``; the run is
+    stationary once, for two consecutive windows, the means and the standard
+    deviations of every observable differ by at most ``tolerance``.
+
+    """
+    ## (SymPy) species monitored
+    observables = None
+    ## length of the windows
+    window = None
+    ## maximum change of the windowed statistics of a stationary run
+    tolerance = None
+
+    def __init__(self, observables, window, tolerance, state, startTime=0):
+        self.observables = list(observables)
+        self.window = window
+        self.tolerance = tolerance
+        self._values = [state[obs] for obs in self.observables]
+        self._t = startTime
+        self._windowEnd = startTime + window
+        self._sums = [0.0] * len(self.observables)
+        self._squares = [0.0] * len(self.observables)
+        self._previous = None
+
+    def update(self, t, state):
+        """Add the populations in ``state``, reached at time ``t``; return True if the run is stationary."""
+        while t >= self._windowEnd:
+            self._accumulate(self._windowEnd - self._t)
+            self._t = self._windowEnd
+            self._windowEnd += self.window
+            stats = []
+            for total, squares in zip(self._sums, self._squares):
+                mean = total/self.window
+                stats.append((mean, math.sqrt(max(0.0, squares/self.window - mean**2))))
+            previous = self._previous
+            self._previous = stats
+            self._sums = [0.0] * len(self.observables)
+            self._squares = [0.0] * len(self.observables)
+            if previous is not None and all(abs(mean - prevMean) <= self.tolerance and abs(std - prevStd) <= self.tolerance
+                                            for (mean, std), (prevMean, prevStd) in zip(stats, previous)):
+                return True
+        self._accumulate(t - self._t)
+        self._t = t
+        self._values = [state[obs] for obs in self.observables]
+        return False
+
+    def _accumulate(self, duration):
+        # the current populations are held for ``duration``
+        for idx, value in enumerate(self._values):
+            self._sums[idx] += value*duration
+            self._squares[idx] += value*value*duration
+
+
+class _RandomStream:
+    """Random numbers of one simulation run, drawn in blocks from an independent stream.
+
+    The stream of run ``run`` is a :class:`numpy.random.Generator` seeded with
+    the ``run``-th child of ``SeedSequence(randomSeed)`` (or with
+    ``randomSeed`` itself if ``run`` is None), so the runs are statistically
+    independent and never touch the global NumPy random state.  Single
+    uniform and exponential variates are served from pre-drawn blocks that
+    are refilled when exhausted; other draws are passed to the generator.
+    Methods follow the :mod:`numpy.random` names used by the engines.  With
+    NumPy < 1.17 the stream falls back to a ``RandomState`` seeded with
+    ``randomSeed + run``.
+
+    """
+    ## number of variates drawn at once
+    blockSize = None
+
+    def __init__(self, randomSeed, run=None, blockSize=4096):
+        self.blockSize = blockSize
+        if hasattr(np.random, 'SeedSequence'):
+            seedSequence = np.random.SeedSequence(randomSeed, spawn_key=() if run is None else (run,))
+            self._generator = np.random.default_rng(seedSequence)
+            self._uniform = self._generator.random
+            self._integers = self._generator.integers
+        else:
+            self._generator = np.random.RandomState((randomSeed + (run or 0)) % 2**32)
+            self._uniform = self._generator.random_sample
+            self._integers = self._generator.randint
+        self._uniforms = []
+        self._uniformIdx = 0
+        self._exponentials = []
+        self._exponentialIdx = 0
+
+    def random_sample(self, size=None):
+        """Uniform variate(s) in [0, 1)."""
+        if size is not None:
+            return self._uniform(size)
+        if self._uniformIdx == len(self._uniforms):
+            self._uniforms = self._uniform(self.blockSize).tolist()
+            self._uniformIdx = 0
+        self._uniformIdx += 1
+        return self._uniforms[self._uniformIdx - 1]
+
+    def rand(self):
+        """Uniform variate in [0, 1)."""
+        return self.random_sample()
+
+    def exponential(self, scale=1.0, size=None):
+        """Exponential variate(s) with mean ``scale``."""
+        if size is not None:
+            return self._generator.exponential(scale, size)
+        if self._exponentialIdx == len(self._exponentials):
+            self._exponentials = self._generator.standard_exponential(self.blockSize).tolist()
+            self._exponentialIdx = 0
+        self._exponentialIdx += 1
+        return scale * self._exponentials[self._exponentialIdx - 1]
+
+    def poisson(self, lam=1.0, size=None):
+        """Poisson variate(s) with mean ``lam``."""
+        return self._generator.poisson(lam, size)
+
+    def standard_normal(self, size=None):
+        """Standard normal variate(s)."""
+        return self._generator.standard_normal(size)
+
+    def randint(self, high):
+        """Integer uniformly drawn in [0, ``high``)."""
+        return int(self._integers(high))
+
+    def permutation(self, x):
+        """Randomly permuted copy of the sequence ``x`` (or of ``range(x)``)."""
+        return self._generator.permutation(x)
+
+
+class _ReactionNetwork:
+    """Array form of a model's reactions, compiled once per parameter set.
+
+    Species are indexed in the order given by ``species`` (which must include
+    constant reactants); propensities follow the same mass-action convention
+    used by :class:`MuMoTSSAView`: each reactant contributes its population
+    multiplied by its occurrences, and reactions with more than one reagent
+    are scaled by the total population to the power of (reagents - 1).
+
+    """
+    ## ordered list of (SymPy) species
+    species = None
+    ## ordered list of reaction identifiers (keys of the model stoichiometry)
+    reactionIds = None
+    ## reactant occurrences per reaction, shape (reactions, species); constant reactants count as 1
+    orders = None
+    ## change of population per reaction, shape (reactions, species); zero for constant reactants
+    changes = None
+    ## numerical value of each reaction rate
+    rates = None
+    ## number of reagents of each reaction
+    numReagents = None
+    ## for each reaction, the indices of the reactions whose propensity must be updated after it fires
+    dependents = None
+    ## for each reaction, the indices of the species changed when it fires
+    changedSpecies = None
+
+    def __init__(self, stoichiometry, ratesDict, species):
+        self.species = list(species)
+        speciesIndex = {state: idx for idx, state in enumerate(self.species)}
+        self.reactionIds = list(stoichiometry.keys())
+        self._rateNames = [str(stoichiometry[reaction_id]['rate']) for reaction_id in self.reactionIds]
+        numReactions = len(self.reactionIds)
+        numSpecies = len(self.species)
+        self.orders = np.zeros((numReactions, numSpecies), dtype=np.int64)
+        self.changes = np.zeros((numReactions, numSpecies), dtype=np.int64)
+        self.rates = np.zeros(numReactions)
+        for j, reaction_id in enumerate(self.reactionIds):
+            reaction = stoichiometry[reaction_id]
+            rate = float(ratesDict[str(reaction['rate'])])
+            self.rates[j] = rate
             for reactant, re_stoch in reaction.items():
                 if reactant == 'rate': continue
+                idx = speciesIndex[reactant]
                 if re_stoch == 'const':
-                    reactantOccurencies = 1
+                    self.orders[j, idx] = 1
                 else:
-                    reactantOccurencies = re_stoch[0]
-                if reactantOccurencies > 0:
-                    prob *= self._currentState[reactant] * reactantOccurencies
-                numReagents += reactantOccurencies
-            if prob > 0 and numReagents > 1:
-                prob /= sum(self._currentState.values())**(numReagents - 1) 
-            probabilitiesOfChange[reaction_id] = prob
-#         for rule in self._reactantsMatrix:
-#             prob = sum([a*b for a,b in zip(rule,currentState)])
-#             numReagents = sum(x > 0 for x in rule)
-#             if numReagents > 1:
-#                 prob /= sum(currentState)**( numReagents -1 ) 
-#             probabilitiesOfChange.append(prob)
-        probSum = sum(probabilitiesOfChange.values())
-        if probSum == 0:  # no reaction are possible (the execution terminates with this population)
-            infiniteTime = self._maxTime-self._t
-            return (infiniteTime, self._currentState)
-        # computing when is happening next reaction
-        timeInterval = np.random.exponential(1/probSum)
-        
-        # Selecting the occurred reaction at random, with probability proportional to each reaction probabilities
-        bottom = 0.0
+                    self.orders[j, idx] = re_stoch[0]
+                    self.changes[j, idx] = re_stoch[1] - re_stoch[0]
+        self.numReagents = self.orders.sum(axis=1)
+        self.totalChanges = self.changes.sum(axis=1)
+
+        # constant part of the propensity (rate times the occurrences of each reactant)
+        self._prefactors = self.rates * np.prod(np.where(self.orders > 0, self.orders, 1), axis=1)
+        # reactant indices padded with a pointer to an extra slot of the state holding 1.0
+        reactants = [np.flatnonzero(self.orders[j]) for j in range(numReactions)]
+        width = max([1] + [len(r) for r in reactants])
+        self._reactantIndex = np.full((numReactions, width), numSpecies, dtype=np.int64)
+        for j, r in enumerate(reactants):
+            self._reactantIndex[j, :len(r)] = r
+        self._scaled = self.numReagents > 1
+        self._exponents = np.maximum(self.numReagents - 1, 0).astype(float)
+
+        # dependency graph: a reaction must be updated if one of its reactants is changed or,
+        # when it has more than one reagent, if the total population is changed
+        self.changedSpecies = [np.flatnonzero(self.changes[j]) for j in range(numReactions)]
+        self.dependents = []
+        for j in range(numReactions):
+            touched = self.changes[j] != 0
+            affected = (self.orders[:, touched] > 0).any(axis=1)
+            if self.totalChanges[j] != 0:
+                affected |= self._scaled
+            self.dependents.append(np.flatnonzero(affected))
+
+    def setRates(self, ratesDict):
+        """Replace the numerical rates with those in ``ratesDict``, keeping the compiled reactions."""
+        self.rates = np.array([float(ratesDict[rateName]) for rateName in self._rateNames])
+        self._prefactors = self.rates * np.prod(np.where(self.orders > 0, self.orders, 1), axis=1)
+
+    def initState(self, currentState):
+        """Return the state array for a dictionary of populations.
+
+        The returned array has one extra trailing entry fixed to 1.0, used for
+        padding by :meth:`propensities`.
+        """
+        state = np.ones(len(self.species) + 1)
+        for idx, species in enumerate(self.species):
+            state[idx] = currentState[species]
+        return state
+
+    def propensities(self, state, total=None, reactions=None):
+        """Compute the propensities of ``reactions`` (all if None) in ``state``."""
+        if total is None:
+            total = state[:-1].sum()
+        if reactions is None:
+            reactions = slice(None)
+        props = self._prefactors[reactions] * state[self._reactantIndex[reactions]].prod(axis=1)
+        scaled = self._scaled[reactions] & (props > 0)
+        if scaled.any():
+            props[scaled] /= total ** self._exponents[reactions][scaled]
+        return props
+
+    def batchPropensities(self, states, totals):
+        """Compute the propensities of all reactions for each row of ``states`` (with totals ``totals``)."""
+        props = self._prefactors * states[:, self._reactantIndex].prod(axis=2)
+        scale = np.where(self._scaled & (props > 0), totals[:, None] ** self._exponents, 1.0)
+        return props / scale
+
+    def reactionPropensities(self, states, totals):
+        """Compute the propensity of each reaction ``j`` for the rows of ``states[:, j]`` only (with totals ``totals[:, j]``)."""
+        reactions = np.arange(len(self.rates))
+        props = self._prefactors * states[:, reactions[:, None], self._reactantIndex].prod(axis=2)
+        scale = np.where(self._scaled & (props > 0), totals ** self._exponents, 1.0)
+        return props / scale
+
+
+class _DirectMethod:
+    """Gillespie's direct method on a :class:`_ReactionNetwork`.
+
+    Only the propensities affected by the last fired reaction are recomputed;
+    the next reaction is selected by a search on the cumulative propensities.
+
+    """
+    ## whether the engine advances all the runs together (see :meth:`MuMoTSSAView._batchEngine`)
+    batched = False
+    ## compiled reaction network
+    _network = None
+    ## source of random numbers (NumPy's global random state by default, the :class:`_RandomStream` of the run in the views)
+    _rng = None
+    ## current state, see :meth:`_ReactionNetwork.initState`
+    state = None
+    ## current total population (including constant reactants)
+    total = None
+    ## current propensities
+    propensities = None
+    ## indices of the species changed by the last step
+    lastChanged = None
+
+    def __init__(self, network, rng=None):
+        self._network = network
+        self._rng = rng if rng is not None else np.random
+
+    def reset(self, state):
+        self.state = state
+        self.total = state[:-1].sum()
+        self.propensities = self._network.propensities(self.state, self.total)
+        self.lastChanged = []
+
+    def _fire(self, reaction):
+        network = self._network
+        self.state[:-1] += network.changes[reaction]
+        changed = network.changedSpecies[reaction]
+        self.lastChanged = changed
+        if (self.state[changed] < 0).any():
+            errorMsg = "ERROR! Population size became negative: " + str({network.species[idx]: self.state[idx] for idx in changed}) + "; Error in the algorithm execution."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        self.total += network.totalChanges[reaction]
+        dependents = network.dependents[reaction]
+        if len(dependents) > 0:
+            self.propensities[dependents] = network.propensities(self.state, self.total, dependents)
+
+    def step(self, t, maxTime):
+        """Fire the next reaction.
+
+        Returns
+        -------
+        (float, int)
+            The time interval to the reaction and its index, or ``(maxTime-t, None)``
+            if no reaction can occur.  The species changed are listed in
+            ``lastChanged``.
+
+        """
+        cumulative = np.cumsum(self.propensities)
+        probSum = cumulative[-1] if len(cumulative) > 0 else 0
+        if probSum <= 0:  # no reaction are possible (the execution terminates with this population)
+            return (maxTime - t, None)
+        timeInterval = self._rng.exponential(1/probSum)
         # Get a random between [0,1) (but we don't want 0!)
-        reaction = 0.0
-        while (reaction == 0.0):
-            reaction = np.random.random_sample()
-        # Normalising probOfChange in the range [0,1]
-#         probabilitiesOfChange = [pc/probSum for pc in probabilitiesOfChange]
-        probabilitiesOfChange = {r_id: pc/probSum for r_id, pc in probabilitiesOfChange.items()}
-#         print("Prob of Change: " + str(probabilitiesOfChange))
-#         index = -1
-#         for i, prob in enumerate(probabilitiesOfChange):
-#             if ( reaction >= bottom and reaction < (bottom + prob)):
-#                 index = i
-#                 break
-#             bottom += prob
-#         
-#         if (index == -1):
-#             print("ERROR! Transition not found. Error in the algorithm execution.")
-#             sys.exit()
-        reaction_id = -1
-        for r_id, prob in probabilitiesOfChange.items():
-            if reaction >= bottom and reaction < (bottom + prob):
-                reaction_id = r_id
+        rnd = 0.0
+        while rnd == 0.0:
+            rnd = self._rng.random_sample()
+        reaction = int(np.searchsorted(cumulative, rnd*probSum, side='right'))
+        if reaction >= len(cumulative):  # rounding errors in the cumulative sum
+            reaction = int(np.flatnonzero(self.propensities)[-1])
+        self._fire(reaction)
+        return (timeInterval, reaction)
+
+
+class _IndexedPriorityQueue:
+    """Binary min-heap of reaction times, indexed by reaction.
+
+    Allows the time of any reaction to be changed in logarithmic time, as
+    required by :class:`_NextReactionMethod`.
+
+    """
+    ## putative time of each reaction
+    times = None
+    ## heap of reaction indices
+    _heap = None
+    ## position of each reaction in the heap
+    _position = None
+
+    def __init__(self, times):
+        self.times = list(times)
+        self._heap = sorted(range(len(self.times)), key=lambda j: self.times[j])
+        self._position = [0] * len(self.times)
+        for pos, j in enumerate(self._heap):
+            self._position[j] = pos
+
+    def top(self):
+        """Return the index of the reaction with minimum time."""
+        return self._heap[0]
+
+    def update(self, j, time):
+        """Change the time of reaction ``j`` and restore the heap property."""
+        oldTime = self.times[j]
+        self.times[j] = time
+        if time < oldTime:
+            self._siftUp(self._position[j])
+        elif time > oldTime:
+            self._siftDown(self._position[j])
+
+    def _swap(self, pos1, pos2):
+        heap = self._heap
+        heap[pos1], heap[pos2] = heap[pos2], heap[pos1]
+        self._position[heap[pos1]] = pos1
+        self._position[heap[pos2]] = pos2
+
+    def _siftUp(self, pos):
+        times = self.times
+        heap = self._heap
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if times[heap[pos]] < times[heap[parent]]:
+                self._swap(pos, parent)
+                pos = parent
+            else:
+                break
+
+    def _siftDown(self, pos):
+        times = self.times
+        heap = self._heap
+        size = len(heap)
+        while True:
+            child = 2*pos + 1
+            if child >= size:
                 break
-            bottom += prob
-        
-        if (reaction_id == -1):
-            print("ERROR! Transition not found. Error in the algorithm execution.")
-            sys.exit()
-#         print("current state: " + str(self._currentState))
-#         print("triggered change: " + str(self._mumotModel._stoichiometry[reaction_id]))
-        # apply the change
-#         currentState = list(np.array(self._currentState) + np.array(self._ruleChanges[index]) )
-        for reactant, re_stoch in self._mumotModel._stoichiometry[reaction_id].items():
-            if reactant == 'rate' or re_stoch == 'const': continue
-            self._currentState[reactant] += re_stoch[1] - re_stoch[0]
-            if (self._currentState[reactant] < 0):
-                print("ERROR! Population size became negative: " + str(self._currentState) + "; Error in the algorithm execution.")
-                sys.exit()
-        #print(self._currentState)
+            if child + 1 < size and times[heap[child + 1]] < times[heap[child]]:
+                child += 1
+            if times[heap[child]] < times[heap[pos]]:
+                self._swap(pos, child)
+                pos = child
+            else:
+                break
+
+
+class _NextReactionMethod(_DirectMethod):
+    """Gibson-Bruck Next Reaction Method on a :class:`_ReactionNetwork`.
+
+    Absolute putative firing times are kept in an indexed priority queue; after
+    each event only the reactions in the dependency graph are updated and their
+    times rescaled, so that a new exponential number is drawn only for the
+    fired reaction (or for reactions never enabled before).
+
+    """
+    ## priority queue of the putative (absolute) firing times
+    _queue = None
+    ## absolute time of the last event
+    time = None
+    ## for reactions disabled (zero propensity), the residual integrated propensity to their firing; NaN if none
+    _residuals = None
+
+    def reset(self, state, t=0):
+        super().reset(state)
+        self.time = t
+        self._residuals = np.full(len(self.propensities), np.nan)
+        times = [t + self._rng.exponential()/prop if prop > 0 else float('inf') for prop in self.propensities]
+        self._queue = _IndexedPriorityQueue(times)
+
+    def step(self, t, maxTime):
+        queue = self._queue
+        reaction = queue.top()
+        nextTime = queue.times[reaction]
+        if nextTime == float('inf'):  # no reaction are possible (the execution terminates with this population)
+            return (maxTime - t, None)
+        updates = self._network.dependents[reaction]
+        if reaction not in updates:
+            updates = np.append(updates, reaction)
+        oldPropensities = self.propensities[updates].tolist()
+        self.time = nextTime
+        self._fire(reaction)
+        newPropensities = self.propensities[updates].tolist()
+        residuals = self._residuals
+        for j, oldProp, newProp in zip(updates.tolist(), oldPropensities, newPropensities):
+            if j == reaction:
+                newTime = nextTime + self._rng.exponential()/newProp if newProp > 0 else float('inf')
+            elif oldProp > 0 and newProp > 0:
+                newTime = nextTime + (oldProp/newProp)*(queue.times[j] - nextTime)
+            elif oldProp > 0:
+                # store what was left to the firing, to reuse it if the reaction is enabled again
+                residuals[j] = oldProp*(queue.times[j] - nextTime)
+                newTime = float('inf')
+            elif newProp > 0:
+                if np.isnan(residuals[j]):
+                    newTime = nextTime + self._rng.exponential()/newProp
+                else:
+                    newTime = nextTime + residuals[j]/newProp
+                    residuals[j] = np.nan
+            else:
+                continue
+            queue.update(j, newTime)
+        return (nextTime - t, reaction)
+
+
+class _CompositionRejectionMethod(_DirectMethod):
+    """Composition-rejection SSA on a :class:`_ReactionNetwork`.
+
+    Reactions are grouped in bins of propensities within a power of two
+    (``2**k <= a < 2**(k+1)``); a bin is selected with probability proportional
+    to its total propensity and a reaction within it by rejection sampling,
+    so the cost per event does not grow with the number of reactions.
+    The total propensities of the bins are updated with the changes of the
+    propensities, and recomputed every ``_refreshInterval`` steps to remove
+    the accumulated rounding errors.
+
+    """
+    ## number of steps between recomputations of ``_binSums``
+    _refreshInterval = 1000
+    ## members of each bin, keyed by the bin exponent
+    _bins = None
+    ## total propensity of each bin, keyed by the bin exponent
+    _binSums = None
+    ## number of steps since ``_binSums`` was last recomputed
+    _stepsSinceRefresh = 0
+    ## bin exponent of each reaction (None if propensity is zero)
+    _binOf = None
+    ## position of each reaction in its bin
+    _positionInBin = None
+
+    def reset(self, state):
+        super().reset(state)
+        self._bins = {}
+        self._binSums = {}
+        self._binOf = [None] * len(self.propensities)
+        self._positionInBin = [0] * len(self.propensities)
+        for j, prop in enumerate(self.propensities.tolist()):
+            self._insert(j, prop)
+        self._refreshBinSums()
+
+    def _refreshBinSums(self):
+        """Recompute the total propensity of each bin from the propensities of its members."""
+        self._binSums = {exponent: float(self.propensities[members].sum()) for exponent, members in self._bins.items()}
+        self._stepsSinceRefresh = 0
+
+    def _addToBinSum(self, exponent, change):
+        """Add ``change`` to the total propensity of the (non-empty) bin ``exponent``, recomputing it if rounding errors make it non-positive."""
+        self._binSums[exponent] += change
+        if self._binSums[exponent] <= 0:
+            self._binSums[exponent] = float(self.propensities[self._bins[exponent]].sum())
+
+    def _insert(self, j, prop):
+        if prop <= 0:
+            return
+        exponent = math.frexp(prop)[1]  # prop in [2**(exponent-1), 2**exponent)
+        members = self._bins.setdefault(exponent, [])
+        self._binOf[j] = exponent
+        self._positionInBin[j] = len(members)
+        members.append(j)
+        self._binSums[exponent] = self._binSums.get(exponent, 0.0) + prop
+
+    def _remove(self, j, prop):
+        exponent = self._binOf[j]
+        if exponent is None:
+            return
+        members = self._bins[exponent]
+        # move the last member in place of the removed one
+        last = members.pop()
+        if last != j:
+            pos = self._positionInBin[j]
+            members[pos] = last
+            self._positionInBin[last] = pos
+        self._binOf[j] = None
+        if members:
+            self._addToBinSum(exponent, -prop)
+        else:
+            # empty bins are dropped, with their total propensity
+            del self._bins[exponent]
+            del self._binSums[exponent]
+
+    def step(self, t, maxTime):
+        probSum = sum(self._binSums.values())
+        if probSum <= 0:  # no reaction are possible (the execution terminates with this population)
+            return (maxTime - t, None)
+        timeInterval = self._rng.exponential(1/probSum)
+        # composition: select a bin with probability proportional to its total propensity
+        rnd = self._rng.random_sample() * probSum
+        bottom = 0.0
+        for exponent, binSum in self._binSums.items():
+            bottom += binSum
+            if rnd < bottom:
+                break
+        # rejection: select a reaction uniformly in the bin, accept it with probability a/2**exponent
+        members = self._bins[exponent]
+        upperBound = 2.0 ** exponent
+        propensities = self.propensities
+        while True:
+            reaction = members[int(self._rng.random_sample() * len(members))]
+            if self._rng.random_sample() * upperBound < propensities[reaction]:
+                break
+        dependents = self._network.dependents[reaction]
+        oldPropensities = propensities[dependents].tolist()
+        self._fire(reaction)
+        for j, oldProp, newProp in zip(dependents.tolist(), oldPropensities, propensities[dependents].tolist()):
+            if newProp == oldProp:
+                continue
+            if newProp > 0 and self._binOf[j] == math.frexp(newProp)[1]:
+                self._addToBinSum(self._binOf[j], newProp - oldProp)
+            else:
+                self._remove(j, oldProp)
+                self._insert(j, newProp)
+        self._stepsSinceRefresh += 1
+        if self._stepsSinceRefresh >= self._refreshInterval:
+            self._refreshBinSums()
+        return (timeInterval, reaction)
+
+
+class _TauLeapingMethod(_DirectMethod):
+    """Explicit tau-leaping with the adaptive step selection of Cao, Gillespie and Petzold (2006).
+
+    Reactions that could exhaust one of their reactants within a few firings
+    (critical reactions) fire at most once per leap; the others fire a Poisson
+    number of times, drawn in one vectorised call.  The leap is chosen so that
+    the expected relative change of each propensity is bounded by ``epsilon``;
+    when the leap would be shorter than a few exact steps, exact SSA steps of
+    the direct method are executed instead.
+
+    """
+    ## bound on the relative change of the propensities in a leap
+    _epsilon = None
+    ## reactions are critical if they can fire less than this number of times before exhausting a reactant
+    _criticalThreshold = 10
+    ## a leap is rejected in favour of exact steps if shorter than this number of expected SSA steps
+    _minLeap = 10
+    ## number of exact steps executed every time a leap is rejected
+    _exactStepsPerRejection = 100
+    ## exact steps still to execute before trying to leap again
+    _exactSteps = 0
+    ## highest order (number of varying reactants) of the reactions each species is a reactant of; zero if none
+    _g = None
+    ## consumption of each species per reaction (positive), shape (reactions, species)
+    _consumption = None
+
+    def __init__(self, network, rng=None, epsilon=0.03):
+        super().__init__(network, rng)
+        self._epsilon = epsilon
+        # propensities are linear in the population of each (distinct) reactant, hence
+        # the order is the number of reactants whose population can change
+        varying = (network.changes != 0).any(axis=0)
+        reactantOf = (network.orders > 0) & varying
+        reactionOrders = reactantOf.sum(axis=1)
+        self._g = np.where(reactantOf, reactionOrders[:, None], 0).max(axis=0) if len(reactionOrders) > 0 else np.zeros(len(varying))
+        self._consumption = np.maximum(-network.changes, 0)
+
+    def reset(self, state):
+        super().reset(state)
+        self._exactSteps = 0
+
+    def _leapBound(self, x, nonCritical):
+        """Return the largest leap allowed by the error tolerance."""
+        weights = np.where(nonCritical, self.propensities, 0)
+        mu = weights.dot(self._network.changes)
+        sigma2 = weights.dot(self._network.changes ** 2)
+        species = self._g > 0
+        bound = np.maximum(self._epsilon * x[species] / self._g[species], 1)
+        mu = np.abs(mu[species])
+        sigma2 = sigma2[species]
+        with np.errstate(divide='ignore'):
+            tau = min(np.min(np.where(mu > 0, bound / mu, np.inf), initial=np.inf),
+                      np.min(np.where(sigma2 > 0, bound**2 / sigma2, np.inf), initial=np.inf))
+        return tau
+
+    def step(self, t, maxTime):
+        if self._exactSteps > 0:
+            self._exactSteps -= 1
+            return super().step(t, maxTime)
+        propensities = self.propensities
+        probSum = propensities.sum()
+        if probSum <= 0:  # no reaction are possible (the execution terminates with this population)
+            return (maxTime - t, None)
+        x = self.state[:-1]
+        # critical reactions are those that can exhaust one of their reactants in a few firings
+        with np.errstate(divide='ignore', invalid='ignore'):
+            firingsLeft = np.where(self._consumption > 0, np.floor(x / self._consumption), np.inf).min(axis=1)
+        critical = (propensities > 0) & (firingsLeft < self._criticalThreshold)
+        nonCritical = (propensities > 0) & ~critical
+        tau1 = self._leapBound(x, nonCritical)
+        if tau1 < self._minLeap / probSum:
+            self._exactSteps = self._exactStepsPerRejection - 1
+            return super().step(t, maxTime)
+        criticalSum = propensities[critical].sum()
+        while True:
+            tau2 = self._rng.exponential(1/criticalSum) if criticalSum > 0 else np.inf
+            tau = min(tau1, tau2, maxTime - t)
+            firings = self._rng.poisson(np.where(nonCritical, propensities, 0) * tau)
+            if tau == tau2:
+                # one critical reaction fires, with probability proportional to its propensity
+                cumulative = np.cumsum(np.where(critical, propensities, 0))
+                reaction = min(int(np.searchsorted(cumulative, self._rng.random_sample() * cumulative[-1], side='right')), len(cumulative) - 1)
+                firings[reaction] += 1
+            newX = x + firings.dot(self._network.changes)
+            if (newX >= 0).all():
+                break
+            tau1 /= 2
+        self.state[:-1] = newX
+        self.total = self.state[:-1].sum()
+        self.propensities = self._network.propensities(self.state, self.total)
+        self.lastChanged = np.flatnonzero(firings.dot(self._network.changes))
+        return (tau, None)
+
+
+class _HybridMethod(_DirectMethod):
+    """Hybrid SSA/ODE simulation on a :class:`_ReactionNetwork`.
+
+    Reactions are split dynamically into fast and slow ones: a reaction is fast
+    if its propensity is above ``_propensityThreshold`` and all the (varying)
+    species it involves have at least ``_copyThreshold`` individuals.  Fast
+    reactions are integrated deterministically (their terms of the mean-field
+    equations, with the same propensities as the SSA) with a fourth-order
+    Runge-Kutta scheme; slow reactions fire exactly, when their integrated
+    propensity reaches an exponentially distributed threshold.  The partition
+    is re-evaluated at every step; if no reaction is fast the direct method is
+    used.
+
+    """
+    ## minimum population of all species involved in a fast reaction
+    _copyThreshold = 100
+    ## minimum propensity of a fast reaction
+    _propensityThreshold = 10.0
+    ## maximum relative change of the populations in an integration step
+    _maxRelativeChange = 0.05
+    ## integrated propensity of the slow reactions still to elapse before the next one fires (None if not drawn)
+    _hazardLeft = None
+    ## species whose population can change
+    _varying = None
+    ## fast reactions in the current partition
+    fast = None
+
+    def __init__(self, network, rng=None):
+        super().__init__(network, rng)
+        self._varying = (network.changes != 0).any(axis=0)
+        self._involved = ((network.orders > 0) | (network.changes != 0)) & self._varying
+
+    def reset(self, state):
+        super().reset(state)
+        self._hazardLeft = None
+        self.fast = np.zeros(len(self.propensities), dtype=bool)
+
+    def _partition(self):
+        scarce = self.state[:-1] < self._copyThreshold
+        return ~(self._involved & scarce).any(axis=1) & (self.propensities >= self._propensityThreshold)
+
+    def _derivative(self, x, fast):
+        """Return the rate of change of the populations due to fast reactions and the total slow propensity."""
+        props = self._network.propensities(np.append(x, 1.0))
+        return props[fast].dot(self._network.changes[fast]), props[~fast].sum()
+
+    def _integrate(self, x, h, fast):
+        """Runge-Kutta step of length ``h``; returns the new populations and the integrated slow propensity."""
+        k1, s1 = self._derivative(x, fast)
+        k2, s2 = self._derivative(x + h/2*k1, fast)
+        k3, s3 = self._derivative(x + h/2*k2, fast)
+        k4, s4 = self._derivative(x + h*k3, fast)
+        return np.maximum(x + h/6*(k1 + 2*k2 + 2*k3 + k4), 0), h/6*(s1 + 2*s2 + 2*s3 + s4)
+
+    def step(self, t, maxTime):
+        network = self._network
+        fast = self._partition()
+        # species not changed by fast reactions are discrete
+        discrete = ~(network.changes[fast] != 0).any(axis=0)
+        x = self.state[:-1]
+        if not np.array_equal(x[discrete], np.round(x[discrete])):
+            x[discrete] = np.round(x[discrete])
+            self.reset(self.state)
+            fast = self._partition()
+        self.fast = fast
+        if not fast.any():
+            self._hazardLeft = None
+            return super().step(t, maxTime)
+        if self._hazardLeft is None:
+            self._hazardLeft = self._rng.exponential()
+        x = x.copy()
+        drift, _ = self._derivative(x, fast)
+        # step length bounded by the relative change of the populations and by the stability of the integration
+        h = maxTime - t
+        moving = drift != 0
+        if moving.any():
+            h = min(h, self._maxRelativeChange * np.min(np.maximum(x[moving], 1) / np.abs(drift[moving])))
+        outflow = np.where(fast, self.propensities, 0).dot(np.maximum(-network.changes, 0)) / np.maximum(x, 1)
+        if outflow.max() > 0:
+            h = min(h, 1 / outflow.max())
+        newX, hazard = self._integrate(x, h, fast)
+        slowFires = hazard >= self._hazardLeft
+        if slowFires:
+            # shorten the step to the time when the integrated propensity reaches the threshold
+            h *= self._hazardLeft / hazard
+            newX, hazard = self._integrate(x, h, fast)
+        self._hazardLeft -= hazard
+        self.state[:-1] = newX
+        self.total = newX.sum()
+        self.propensities = network.propensities(self.state, self.total)
+        changed = set(np.flatnonzero(newX != x).tolist())
+        if slowFires:
+            slow = np.where(fast, 0, self.propensities)
+            cumulative = np.cumsum(slow)
+            if cumulative[-1] > 0:
+                reaction = min(int(np.searchsorted(cumulative, self._rng.random_sample() * cumulative[-1], side='right')), len(cumulative) - 1)
+                self._fire(reaction)
+                changed.update(network.changedSpecies[reaction].tolist())
+            self._hazardLeft = None
+        self.lastChanged = sorted(changed)
+        return (h, None)
+
+
+class _SlowScaleMethod(_DirectMethod):
+    """Slow-scale SSA on a :class:`_ReactionNetwork`.
+
+    Pairs of reactions with opposite effects (e.g., recruitment and
+    abandonment) that conserve the total population and whose rates exceed
+    those of all the other reactions by at least ``_timescaleSeparation``
+    are fast (see :meth:`partition`).  Fast reactions are not simulated:
+    each fast pair is a birth-death process on the line of the states it
+    can reach, whose quasi-equilibrium distribution is computed exactly
+    from the propensities.  Slow reactions fire with their expected
+    propensities under this distribution, and the fast species are drawn
+    from it, conditioned on the slow reaction firing.  If the fast pair can
+    leave the states communicating with the current one (e.g., towards an
+    absorbing state), the distribution conditioned on staying in them is
+    used when the rate of leaving is below ``_escapeTolerance`` times the
+    total propensity of the slow reactions; otherwise the pair is simulated
+    exactly in that step.
+
+    """
+    ## minimum ratio between the rates of a fast pair and the rates of the slow reactions
+    _timescaleSeparation = 100.0
+    ## maximum rate at which a fast pair leaves its quasi-equilibrium, relative to the total propensity of the slow reactions
+    _escapeTolerance = 0.01
+    ## pairs of fast reactions (forward, backward)
+    fastPairs = None
+    ## indices of the fast reactions
+    fastReactions = None
+
+    def __init__(self, network, rng=None):
+        super().__init__(network, rng)
+        self.fastPairs = _SlowScaleMethod.partition(network, self._timescaleSeparation)
+        self.fastReactions = sorted(reaction for pair in self.fastPairs for reaction in pair)
+        self._pairSpecies = [np.flatnonzero(network.changes[forward]) for forward, _ in self.fastPairs]
+
+    @staticmethod
+    def partition(network, separation):
+        """Return the pairs of reactions of ``network`` treated as fast with the given timescale ``separation``.
         
-        return (timeInterval, self._currentState)
-    
+        Candidate pairs, on disjoint species, are ordered by their slowest
+        rate; the largest number of candidates whose rates are all at least
+        ``separation`` times the rates of the remaining reactions is fast.
+        """
+        rates = network.rates
+        candidates = []
+        for j in range(len(rates)):
+            if not network.changes[j].any() or network.totalChanges[j] != 0:
+                continue
+            for k in range(j + 1, len(rates)):
+                if np.array_equal(network.changes[j], -network.changes[k]) and min(rates[j], rates[k]) > 0:
+                    candidates.append((j, k))
+        candidates.sort(key=lambda pair: -min(rates[pair[0]], rates[pair[1]]))
+        pairs = []
+        usedSpecies = set()
+        usedReactions = set()
+        for pair in candidates:
+            species = set(np.flatnonzero(network.changes[pair[0]]).tolist())
+            if species & usedSpecies or set(pair) & usedReactions:
+                continue
+            pairs.append(pair)
+            usedSpecies |= species
+            usedReactions |= set(pair)
+        for numFast in range(len(pairs), 0, -1):
+            fastReactions = set(reaction for pair in pairs[:numFast] for reaction in pair)
+            slowRates = [rates[j] for j in range(len(rates)) if j not in fastReactions]
+            if min(rates[pairs[numFast - 1][0]], rates[pairs[numFast - 1][1]]) >= separation * max(slowRates + [0]):
+                return pairs[:numFast]
+        return []
+
+    def _quasiEquilibrium(self, pair, species, maxEscapeRate):
+        """Return the states reachable by the fast ``pair`` from the current state and their quasi-equilibrium probabilities.
+        
+        None is returned if the pair leaves these states at a rate above ``maxEscapeRate``.
+        """
+        network = self._network
+        forward, backward = pair
+        direction = network.changes[forward]
+        x = self.state[:-1]
+        # the line of the states x + n*direction with non-negative populations
+        lowest = -int(np.min(x[species][direction[species] > 0] // direction[species][direction[species] > 0]))
+        highest = int(np.min(x[species][direction[species] < 0] // -direction[species][direction[species] < 0]))
+        steps = np.arange(lowest, highest + 1)
+        states = np.tile(self.state, (len(steps), 1))
+        states[:, :-1] += steps[:, None] * direction
+        totals = np.full(len(steps), self.total)
+        props = network.batchPropensities(states, totals)
+        up = props[:, forward]
+        down = props[:, backward]
+        # states communicating with the current one
+        blocked = np.flatnonzero((up[:-1] <= 0) | (down[1:] <= 0))
+        current = -lowest
+        low = blocked[blocked < current].max() + 1 if (blocked < current).any() else 0
+        high = blocked[blocked >= current].min() if (blocked >= current).any() else len(steps) - 1
+        logRatios = np.log(up[low:high]) - np.log(down[low + 1:high + 1])
+        logProbs = np.concatenate(([0.0], np.cumsum(logRatios)))
+        probs = np.exp(logProbs - logProbs.max())
+        probs /= probs.sum()
+        escapeRate = (probs[0] * down[low] if low > 0 else 0) + (probs[-1] * up[high] if high < len(steps) - 1 else 0)
+        if escapeRate > maxEscapeRate:
+            return None, None
+        return states[low:high + 1], probs
+
+    def step(self, t, maxTime):
+        network = self._network
+        slow = np.ones(len(self.propensities), dtype=bool)
+        baseState = self.state.copy()
+        equilibria = []
+        slowTotal = np.delete(self.propensities, self.fastReactions).sum()
+        for pair, species in zip(self.fastPairs, self._pairSpecies):
+            states, probs = self._quasiEquilibrium(pair, species, self._escapeTolerance * slowTotal)
+            if states is None:
+                continue
+            slow[list(pair)] = False
+            baseState[species] = 1.0
+            # reactant part of each propensity depending on the fast species, in each reachable state
+            factors = np.where(network.orders[:, species] > 0, states[:, None, species], 1.0).prod(axis=2)
+            equilibria.append((species, states, probs, factors))
+        effective = np.where(slow, network.propensities(baseState, self.total), 0)
+        for _, _, probs, factors in equilibria:
+            effective *= probs.dot(factors)
+        cumulative = np.cumsum(effective)
+        probSum = cumulative[-1] if len(cumulative) > 0 else 0
+        if probSum <= 0:  # no slow reaction are possible (the execution terminates with this population)
+            return (maxTime - t, None)
+        timeInterval = self._rng.exponential(1/probSum)
+        rnd = 0.0
+        while rnd == 0.0:
+            rnd = self._rng.random_sample()
+        reaction = int(np.searchsorted(cumulative, rnd*probSum, side='right'))
+        if reaction >= len(cumulative):  # rounding errors in the cumulative sum
+            reaction = int(np.flatnonzero(effective)[-1])
+        previous = self.state[:-1].copy()
+        # fast species drawn from their quasi-equilibrium, given that the reaction fires
+        for species, states, probs, factors in equilibria:
+            weights = np.cumsum(probs * factors[:, reaction])
+            sample = min(int(np.searchsorted(weights, self._rng.random_sample() * weights[-1], side='right')), len(weights) - 1)
+            self.state[species] = states[sample, species]
+        self.state[:-1] += network.changes[reaction]
+        self.total += network.totalChanges[reaction]
+        self.propensities = network.propensities(self.state, self.total)
+        self.lastChanged = np.flatnonzero(self.state[:-1] != previous)
+        return (timeInterval, reaction)
+
+
+class _BatchDirectMethod:
+    """Gillespie's direct method advancing many independent runs together.
+
+    The states of all runs are kept in a (runs, species) array and each
+    iteration fires one reaction in every run that has not yet reached
+    ``maxTime``; runs have their own clocks and finished runs are masked out.
+
+    """
+    ## whether the engine advances all the runs together (see :meth:`MuMoTSSAView._batchEngine`)
+    batched = True
+    ## compiled reaction network
+    _network = None
+    ## source of random numbers (NumPy's global random state by default, the :class:`_RandomStream` of the run in the views)
+    _rng = None
+
+    def __init__(self, network, rng=None):
+        self._network = network
+        self._rng = rng if rng is not None else np.random
+
+    def run(self, states, maxTime, progressCallback=None, recording='event', recordingTimes=None):
+        """Simulate all runs from ``states`` (one row per run, as returned by :meth:`_ReactionNetwork.initState`) up to ``maxTime``.
+
+        With ``recording='grid'`` the populations are stored only at the
+        (sorted) ``recordingTimes``, with ``recording='final'`` only at the end.
+
+        Returns
+        -------
+        list
+            For each run, a pair ``(times, populations)`` with the recorded
+            times (for the 'event' policy the time of every event, starting
+            from 0) and the population of each species at them.
+
+        """
+        network = self._network
+        states = np.array(states, dtype=float)
+        numRuns = states.shape[0]
+        t = np.zeros(numRuns)
+        totals = states[:, :-1].sum(axis=1)
+        if recording == 'event':
+            recordedRuns = [np.arange(numRuns)]
+            recordedTimes = [t.copy()]
+            recordedStates = [states[:, :-1].copy()]
+        elif recording == 'grid':
+            recordingTimes = np.asarray(recordingTimes, dtype=float)
+            samples = np.zeros((numRuns, len(recordingTimes), states.shape[1] - 1))
+            nextRecording = np.zeros(numRuns, dtype=np.int64)
+        active = np.arange(numRuns)
+        while len(active) > 0:
+            if recording == 'grid':
+                previousStates = states[active, :-1].copy()
+            props = network.batchPropensities(states[active], totals[active])
+            cumulative = np.cumsum(props, axis=1)
+            probSum = cumulative[:, -1]
+            blocked = probSum <= 0
+            with np.errstate(divide='ignore'):
+                timeIntervals = np.where(blocked, maxTime - t[active], self._rng.exponential(size=len(active)) / probSum)
+            rnd = self._rng.random_sample(len(active)) * probSum
+            reactions = np.minimum((cumulative <= rnd[:, None]).sum(axis=1), props.shape[1] - 1)
+            changes = np.where(blocked[:, None], 0, network.changes[reactions])
+            states[active, :-1] += changes
+            totals[active] += changes.sum(axis=1)
+            t[active] += timeIntervals
+            if (states[active, :-1] < 0).any():
+                errorMsg = "ERROR! Population size became negative; Error in the algorithm execution."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            if recording == 'event':
+                recordedRuns.append(active)
+                recordedTimes.append(t[active])
+                recordedStates.append(states[active, :-1])
+            elif recording == 'grid':
+                # each grid time passed by the event takes the state preceding it
+                while True:
+                    pending = nextRecording[active] < len(recordingTimes)
+                    pending[pending] = recordingTimes[nextRecording[active][pending]] < t[active][pending]
+                    if not pending.any():
+                        break
+                    runs = active[pending]
+                    samples[runs, nextRecording[runs]] = previousStates[pending]
+                    nextRecording[runs] += 1
+            active = active[t[active] < maxTime]
+            if progressCallback is not None:
+                progressCallback(min(t[active]) if len(active) > 0 else maxTime, numRuns - len(active))
+        if recording == 'final':
+            return [(t[run:run+1].copy(), states[run:run+1, :-1].copy()) for run in range(numRuns)]
+        if recording == 'grid':
+            # grid times not preceding the end of a run take its final state
+            for run in range(numRuns):
+                samples[run, nextRecording[run]:] = states[run, :-1]
+            return [(recordingTimes.copy(), samples[run]) for run in range(numRuns)]
+        # split the records by run, preserving the order of the events
+        recordedRuns = np.concatenate(recordedRuns)
+        order = np.argsort(recordedRuns, kind='stable')
+        splits = np.cumsum(np.bincount(recordedRuns, minlength=numRuns))[:-1]
+        times = np.split(np.concatenate(recordedTimes)[order], splits)
+        populations = np.split(np.concatenate(recordedStates)[order], splits)
+        return list(zip(times, populations))
+
+
+class _LangevinMethod:
+    """Chemical Langevin equation integrated for many runs together.
+
+    Each reaction contributes its change times its propensity to the drift,
+    and its change times the square root of its propensity times an
+    independent Wiener increment to the noise, with the propensities of
+    :class:`_ReactionNetwork` (the diffusion approximation of the master
+    equation).  The states of all runs are kept in a (runs, species) array
+    and advanced together with fixed steps of length ``timestep`` by the
+    Euler-Maruyama scheme or, with ``milstein``, by the Milstein scheme
+    with the correction of each reaction on its own noise (the terms
+    coupling different reactions, which require Levy areas, are neglected).
+    Propensities are computed with negative populations set to zero, and
+    populations becoming negative are set to zero after each step.
+
+    """
+    ## whether the engine advances all the runs together (see :meth:`MuMoTSSAView._batchEngine`)
+    batched = True
+    ## compiled reaction network
+    _network = None
+    ## source of random numbers (NumPy's global random state by default, the :class:`_RandomStream` of the view)
+    _rng = None
+    ## length of the integration steps
+    _timestep = None
+    ## whether the Milstein correction is applied
+    _milstein = None
+
+    def __init__(self, network, rng=None, timestep=0.01, milstein=False):
+        self._network = network
+        self._rng = rng if rng is not None else np.random
+        self._timestep = timestep
+        self._milstein = milstein
+        # for each reaction, the state change padded with a zero for the trailing entry of the state
+        self._paddedChanges = np.hstack([network.changes, np.zeros((len(network.rates), 1))])
+
+    def _propensities(self, states):
+        clipped = np.maximum(states, 0)
+        return self._network.batchPropensities(clipped, clipped[:, :-1].sum(axis=1))
+
+    def _selfDerivatives(self, states):
+        """Derivative of the propensity of each reaction along its own change, by central differences (exact for mass-action propensities without scaling)."""
+        forward = np.maximum(states[:, None, :] + self._paddedChanges, 0)
+        backward = np.maximum(states[:, None, :] - self._paddedChanges, 0)
+        forwardProps = self._network.reactionPropensities(forward, forward[:, :, :-1].sum(axis=2))
+        backwardProps = self._network.reactionPropensities(backward, backward[:, :, :-1].sum(axis=2))
+        return (forwardProps - backwardProps) / 2
+
+    def run(self, states, maxTime, progressCallback=None, recording='event', recordingTimes=None):
+        """Integrate all runs from ``states`` (one row per run, as returned by :meth:`_ReactionNetwork.initState`) up to ``maxTime``.
+
+        The recording policies are as for :meth:`_BatchDirectMethod.run`,
+        with an event for each integration step; populations are not
+        rounded.
+
+        Returns
+        -------
+        list
+            For each run, a pair ``(times, populations)``.
+
+        """
+        changes = self._network.changes
+        states = np.array(states, dtype=float)
+        numRuns = states.shape[0]
+        numReactions = len(self._network.rates)
+        numSteps = max(1, int(np.ceil(maxTime / self._timestep - 1e-9)))
+        if recording == 'event':
+            recordedTimes = [0.0]
+            recordedStates = [states[:, :-1].copy()]
+        elif recording == 'grid':
+            recordingTimes = np.asarray(recordingTimes, dtype=float)
+            samples = np.zeros((numRuns, len(recordingTimes), states.shape[1] - 1))
+            nextRecording = 0
+        t = 0.0
+        for step in range(numSteps):
+            newTime = min(maxTime, (step + 1) * self._timestep)
+            h = newTime - t
+            props = self._propensities(states)
+            noise = np.sqrt(h) * self._rng.standard_normal((numRuns, numReactions))
+            increments = props * h + np.sqrt(props) * noise
+            if self._milstein:
+                increments += self._selfDerivatives(states) * (noise**2 - h) / 4
+            previousStates = states[:, :-1].copy()
+            states[:, :-1] += increments.dot(changes)
+            np.maximum(states[:, :-1], 0, out=states[:, :-1])
+            if recording == 'event':
+                recordedTimes.append(newTime)
+                recordedStates.append(states[:, :-1].copy())
+            elif recording == 'grid':
+                # each grid time passed by the step takes the state preceding it
+                while nextRecording < len(recordingTimes) and recordingTimes[nextRecording] < newTime:
+                    samples[:, nextRecording] = previousStates
+                    nextRecording += 1
+            t = newTime
+            if progressCallback is not None:
+                progressCallback(t, numRuns if step == numSteps - 1 else 0)
+        if recording == 'final':
+            return [(np.array([t]), states[run:run+1, :-1].copy()) for run in range(numRuns)]
+        if recording == 'grid':
+            samples[:, nextRecording:] = states[:, None, :-1]
+            return [(recordingTimes.copy(), samples[run]) for run in range(numRuns)]
+        times = np.array(recordedTimes)
+        recordedStates = np.stack(recordedStates, axis=1)
+        return [(times.copy(), recordedStates[run]) for run in range(numRuns)]
+
+
+class _MultilevelMonteCarlo:
+    """Multilevel Monte Carlo estimator of the expected populations of a :class:`_ReactionNetwork` at ``maxTime``.
+
+    Level 0 is tau-leaping with ``coarsestSteps`` steps of fixed length;
+    each of the next ``tauLevels - 1`` levels refines the step by
+    ``refinement`` and is coupled to the previous one by splitting each
+    reaction into a Poisson process common to both (with the minimum of
+    the two propensities) and two processes for the remainders; the last
+    level couples the exact SSA to the finest tau-leaping in the same way,
+    with the modified next reaction method (Anderson and Higham, 2012).  The
+    sum of the level means is an unbiased estimate of the exact expectation,
+    and the coupled differences have small variance, so most samples are
+    cheap.  Propensities of tau-leaping states with negative populations
+    are computed as if those populations were zero.  The cost of a sample
+    is the number of tau-leaping steps and SSA events it takes.
+
+    """
+    ## number of tau-leaping steps of each tau-leaping level
+    steps = None
+    ## indices of the non-constant species, whose expectations are estimated
+    observables = None
+
+    def __init__(self, network, initialState, maxTime, rng, coarsestSteps=8, refinement=2, tauLevels=3):
+        self._network = network
+        self._initialState = initialState
+        self._maxTime = maxTime
+        self._rng = rng
+        self.steps = [coarsestSteps * refinement**level for level in range(tauLevels)]
+        self._refinement = refinement
+        self.observables = np.flatnonzero((network.changes != 0).any(axis=0))
+
+    def _propensities(self, states):
+        clipped = np.maximum(states, 0)
+        return self._network.batchPropensities(clipped, clipped[:, :-1].sum(axis=1))
+
+    def _tauLeap(self, states, propensities, h):
+        fires = self._rng.poisson(propensities * h)
+        states[:, :-1] += fires.dot(self._network.changes)
+
+    def _sampleTauLevel(self, level, samples):
+        """Return the fine populations and their differences from the coarser level (the populations themselves for level 0)."""
+        fine = np.tile(self._initialState, (samples, 1))
+        h = self._maxTime / self.steps[level]
+        if level == 0:
+            for _ in range(self.steps[0]):
+                self._tauLeap(fine, self._propensities(fine), h)
+            return fine[:, self.observables], fine[:, self.observables], self.steps[0]
+        coarse = fine.copy()
+        changes = self._network.changes
+        for _ in range(self.steps[level - 1]):
+            coarseProps = self._propensities(coarse)
+            for _ in range(self._refinement):
+                fineProps = self._propensities(fine)
+                common = np.minimum(fineProps, coarseProps)
+                commonFires = self._rng.poisson(common * h)
+                fine[:, :-1] += (commonFires + self._rng.poisson((fineProps - common) * h)).dot(changes)
+                coarse[:, :-1] += (commonFires + self._rng.poisson((coarseProps - common) * h)).dot(changes)
+        return fine[:, self.observables], fine[:, self.observables] - coarse[:, self.observables], self.steps[level] + self.steps[level - 1]
+
+    def _sampleExactLevel(self, samples):
+        """Return the exact populations and their differences from the finest tau-leaping, and the mean cost of a sample."""
+        network = self._network
+        numReactions = len(network.rates)
+        changes = np.concatenate([network.changes] * 3)
+        exactChannels = np.arange(3 * numReactions) < 2 * numReactions
+        tauChannels = (np.arange(3 * numReactions) < numReactions) | (np.arange(3 * numReactions) >= 2 * numReactions)
+        steps = self.steps[-1]
+        h = self._maxTime / steps
+        exact = np.empty((samples, len(self.observables)))
+        tau = np.empty((samples, len(self.observables)))
+        cost = 0
+        for sample in range(samples):
+            x = self._initialState.copy()
+            z = self._initialState.copy()
+            internalTimes = np.zeros(3 * numReactions)
+            nextFirings = self._rng.exponential(size=3 * numReactions)
+            t = 0
+            step = 0
+            tauProps = self._propensities(z[None, :])[0]
+            while True:
+                exactProps = network.propensities(x)
+                common = np.minimum(exactProps, tauProps)
+                rates = np.concatenate([common, exactProps - common, tauProps - common])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    waits = np.where(rates > 0, (nextFirings - internalTimes) / rates, np.inf)
+                channel = int(np.argmin(waits))
+                gridTime = (step + 1) * h
+                if t + waits[channel] >= gridTime:
+                    # end of the tau-leaping step: the propensities of the tau-leaping are updated
+                    internalTimes += rates * (gridTime - t)
+                    t = gridTime
+                    step += 1
+                    if step == steps:
+                        break
+                    tauProps = self._propensities(z[None, :])[0]
+                    continue
+                t += waits[channel]
+                internalTimes += rates * waits[channel]
+                if exactChannels[channel]:
+                    x[:-1] += changes[channel]
+                if tauChannels[channel]:
+                    z[:-1] += changes[channel]
+                nextFirings[channel] += self._rng.exponential()
+                cost += 1
+            exact[sample] = x[self.observables]
+            tau[sample] = z[self.observables]
+        return exact, exact - tau, cost / samples + steps
+
+    def _sampleLevel(self, level, samples):
+        if level < len(self.steps):
+            return self._sampleTauLevel(level, samples)
+        return self._sampleExactLevel(samples)
+
+    def estimate(self, rmse, pilotSamples=100):
+        """Estimate the expected populations with root-mean-square error ``rmse``.
+
+        After ``pilotSamples`` samples of each level, the number of samples
+        of each level is set to minimise the total cost for a variance of
+        the estimate of ``rmse**2`` (for the observable with the largest
+        variance), and more samples are drawn until it is reached.  Returns
+        the estimate, its variance, and the diagnostics of each level
+        (number of tau-leaping steps, None for the exact level; samples;
+        mean and variance of the differences; mean cost of a sample).
+        """
+        numLevels = len(self.steps) + 1
+        values = [[] for _ in range(numLevels)]
+        differences = [[] for _ in range(numLevels)]
+        costs = np.zeros(numLevels)
+        samples = np.zeros(numLevels, dtype=np.int64)
+        required = np.full(numLevels, pilotSamples)
+        while True:
+            for level in range(numLevels):
+                extra = required[level] - samples[level]
+                if extra <= 0:
+                    continue
+                levelValues, levelDifferences, cost = self._sampleLevel(level, int(extra))
+                values[level].append(levelValues)
+                differences[level].append(levelDifferences)
+                costs[level] = (costs[level] * samples[level] + cost * extra) / (samples[level] + extra)
+                samples[level] += extra
+            variances = np.array([np.concatenate(differences[level]).var(axis=0, ddof=1).max() for level in range(numLevels)])
+            variances = np.maximum(variances, 1e-12)
+            optimal = np.ceil(np.sqrt(variances / costs) * np.sum(np.sqrt(variances * costs)) / rmse**2).astype(np.int64)
+            required = np.maximum(optimal, samples)
+            if np.all(required == samples):
+                break
+        levels = []
+        mean = 0
+        variance = 0
+        for level in range(numLevels):
+            levelDifferences = np.concatenate(differences[level])
+            mean = mean + levelDifferences.mean(axis=0)
+            variance = variance + levelDifferences.var(axis=0, ddof=1) / samples[level]
+            levels.append({'steps': self.steps[level] if level < len(self.steps) else None, 'samples': int(samples[level]),
+                           'mean': levelDifferences.mean(axis=0), 'variance': levelDifferences.var(axis=0, ddof=1), 'cost': costs[level]})
+        exactValues = np.concatenate(values[-1])
+        # cost of plain SSA runs for the same error: variance of the exact populations times the events per run
+        ssaCost = exactValues.var(axis=0, ddof=1).max() * (costs[-1] - self.steps[-1]) / rmse**2
+        return mean, variance, levels, ssaCost
+
+
+class _FiniteStateProjection:
+    """Numerical solution of the master equation of a :class:`_ReactionNetwork` on a finite projection of its state space.
+
+    The states reachable from the initial state are enumerated by firing
+    the reactions with positive propensity, layer after layer; the
+    probability flowing out of the enumerated states is lost, and bounds
+    the error of the solution (Munsky and Khammash, 2006).  The distribution
+    is propagated between output times with the action of the exponential
+    of the sparse generator matrix; whenever the lost probability exceeds
+    its share of ``tolerance`` (proportional to the time elapsed), the
+    projection is extended with twice as many layers and the step repeated.
+    The stationary distribution is the null vector of the generator in
+    which the reactions leaving the projection are ignored, and the
+    first-passage times to ``absorbing`` states (whose reactions are not
+    followed) solve the backward equations of the same generator.
+
+    """
+    ## enumerated states, one row per state (populations in the order of the network species)
+    states = None
+    ## probability lost by the projection at each output time
+    leaks = None
+
+    def __init__(self, network, initialState, tolerance=1e-4, maxStates=100000, layers=16, absorbing=None):
+        self._network = network
+        self._absorbing = absorbing
+        self._tolerance = tolerance
+        self._maxStates = maxStates
+        self._layers = layers
+        self.states = np.array([initialState], dtype=np.int64)
+        self._index = {tuple(self.states[0].tolist()): 0}
+        self._frontier = np.array([0])
+        self._expand(layers)
+
+    def _successors(self, states):
+        """Return the propensities of the reactions in ``states`` and the states they lead to."""
+        padded = np.hstack([states, np.ones((len(states), 1))])
+        props = self._network.batchPropensities(padded, states.sum(axis=1).astype(float))
+        targets = states[:, None, :] + self._network.changes[None, :, :]
+        props[(targets < 0).any(axis=2)] = 0
+        return props, targets
+
+    def _expand(self, layers):
+        """Add ``layers`` layers of states reachable from the frontier of the projection."""
+        for _ in range(layers):
+            if self._absorbing is not None and len(self._frontier) > 0:
+                # absorbing states are never left, and not expanded
+                self._frontier = self._frontier[~self._absorbing(self.states[self._frontier])]
+            if len(self._frontier) == 0:
+                return
+            props, targets = self._successors(self.states[self._frontier])
+            candidates = np.unique(targets[props > 0], axis=0) if (props > 0).any() else np.zeros((0, self.states.shape[1]), dtype=np.int64)
+            newStates = [state for state in map(tuple, candidates.tolist()) if state not in self._index]
+            if len(self.states) + len(newStates) > self._maxStates:
+                errorMsg = "The finite state projection needs more than maxStates = " + str(self._maxStates) + " states to reach the tolerance. \n" \
+                            "Please increase maxStates or the tolerance, or reduce the system size or maxTime, and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            for state in newStates:
+                self._index[state] = len(self._index)
+            self._frontier = np.arange(len(self.states), len(self.states) + len(newStates))
+            if len(newStates) > 0:
+                self.states = np.vstack([self.states, np.array(newStates, dtype=np.int64)])
+
+    def _generator(self, conservative=False):
+        """Return the sparse generator of the projected master equation.
+
+        The probability leaving the projection is lost, unless
+        ``conservative`` is set, in which case the reactions leaving the
+        projection are ignored (and the generator conserves probability).
+        """
+        numStates = len(self.states)
+        props, targets = self._successors(self.states)
+        rows = []
+        cols = []
+        values = []
+        outflow = np.zeros(numStates) if conservative else props.sum(axis=1)
+        for source, reaction in zip(*np.nonzero(props)):
+            target = self._index.get(tuple(targets[source, reaction].tolist()))
+            if target is not None:
+                rows.append(target)
+                cols.append(source)
+                values.append(props[source, reaction])
+                if conservative:
+                    outflow[source] += props[source, reaction]
+        rows.extend(range(numStates))
+        cols.extend(range(numStates))
+        values.extend((-outflow).tolist())
+        return csc_matrix((values, (rows, cols)), shape=(numStates, numStates))
+
+    def solve(self, times):
+        """Return the distribution over ``states`` at each of the (non-negative, increasing) ``times``, one row per time."""
+        maxTime = times[-1]
+        probabilities = np.zeros(len(self.states))
+        probabilities[0] = 1
+        distributions = []
+        layers = self._layers
+        generator = self._generator()
+        previousTime = 0
+        for time in times:
+            while time > previousTime:
+                newProbabilities = expm_multiply(generator * (time - previousTime), probabilities)
+                if 1 - newProbabilities.sum() <= self._tolerance * time / maxTime or len(self._frontier) == 0:
+                    probabilities = np.maximum(newProbabilities, 0)
+                    previousTime = time
+                    break
+                # extend the projection and repeat the step
+                self._expand(layers)
+                layers *= 2
+                probabilities = np.concatenate([probabilities, np.zeros(len(self.states) - len(probabilities))])
+                generator = self._generator()
+            distributions.append(probabilities)
+        self.leaks = np.array([1 - distribution.sum() for distribution in distributions])
+        return np.array([np.concatenate([distribution, np.zeros(len(self.states) - len(distribution))]) for distribution in distributions])
+
+    def stationary(self, warmStart=None):
+        """Return the stationary distribution over ``states``.
+
+        The null vector of the conservative generator, normalised to sum to
+        one, is found with GMRES (falling back to a sparse direct solve if it
+        does not converge); ``warmStart``, an optional dictionary of
+        probabilities keyed by state tuples (such as the distribution for
+        a previous parameter set), is used as the initial guess.  While the
+        stationary probability of the frontier of the projection exceeds
+        ``tolerance``, the projection is extended with twice as many layers
+        and the solution repeated, warm started from the previous one.
+        """
+        layers = self._layers
+        while True:
+            initialGuess = None
+            if warmStart is not None:
+                initialGuess = np.array([warmStart.get(state, 0.0) for state in map(tuple, self.states.tolist())])
+                initialGuess = initialGuess / initialGuess.sum() if initialGuess.sum() > 0 else None
+            probabilities = self._nullVector(self._generator(conservative=True), initialGuess)
+            self.leaks = np.array([probabilities[self._frontier].sum()])
+            if self.leaks[0] <= self._tolerance or len(self._frontier) == 0:
+                return probabilities
+            warmStart = dict(zip(map(tuple, self.states.tolist()), probabilities))
+            self._expand(layers)
+            layers *= 2
+
+    @staticmethod
+    def _nullVector(generator, initialGuess=None, refinements=5):
+        """Return the normalised non-negative null vector of ``generator``.
+
+        The last balance equation is replaced by the normalisation, and the
+        resulting linear system solved by GMRES with iterative refinement.
+        Raises a :class:`MuMoTValueError` if the stationary distribution is
+        not unique (more than one closed class of states, e.g. several
+        absorbing states) or the solution is not accurate.
+        """
+        numStates = generator.shape[0]
+        system = generator.tocoo()
+        # closed classes: strongly connected components with no transition to another component (column = source)
+        numClasses, labels = connected_components(generator, directed=True, connection='strong')
+        transitions = (system.data != 0) & (labels[system.row] != labels[system.col])
+        if numClasses - len(np.unique(labels[system.col[transitions]])) > 1:
+            errorMsg = "The stationary distribution is not unique: the states reachable from the initial state form more than one closed class (e.g. several absorbing states)."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        keep = system.row != numStates - 1
+        system = csc_matrix((np.concatenate([system.data[keep], np.ones(numStates)]),
+                             (np.concatenate([system.row[keep], np.full(numStates, numStates - 1)]),
+                              np.concatenate([system.col[keep], np.arange(numStates)]))), shape=(numStates, numStates))
+        rhs = np.zeros(numStates)
+        rhs[-1] = 1
+        solution = initialGuess if initialGuess is not None else np.full(numStates, 1.0 / numStates)
+        for _ in range(refinements):
+            residual = rhs - system.dot(solution)
+            if np.abs(residual).max() <= 1e-12:
+                break
+            correction, info = gmres(system, residual, restart=min(numStates, 50), maxiter=100)
+            if info != 0:
+                solution = spsolve(system, rhs)
+                break
+            solution = solution + correction
+        else:
+            if np.abs(rhs - system.dot(solution)).max() > 1e-8:
+                solution = spsolve(system, rhs)
+        if not np.all(np.isfinite(solution)) or np.abs(rhs - system.dot(solution)).max() > 1e-8:
+            errorMsg = "The stationary distribution could not be computed accurately: it may not be unique."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+        solution = np.maximum(solution, 0)
+        return solution / solution.sum()
+
+    def firstPassage(self):
+        """Return the mean and variance of the time to absorption from each of ``states``.
+
+        The backward equations restricted to the transient states are solved
+        with a sparse LU factorisation (the reactions leaving the projection
+        are ignored).  The times are infinite from the states that may never
+        be absorbed.  While the projection is incomplete, it is extended
+        with twice as many layers until the mean time from the initial state
+        changes by less than ``tolerance`` (relative).
+        """
+        layers = self._layers
+        previousMean = None
+        while True:
+            means, variances = self._passageMoments()
+            if len(self._frontier) == 0 or (previousMean is not None and np.isclose(means[0], previousMean, rtol=self._tolerance, atol=0)):
+                return means, variances
+            previousMean = means[0]
+            self._expand(layers)
+            layers *= 2
+
+    def _passageMoments(self):
+        """Return the mean and variance of the time to absorption from each of ``states`` in the current projection."""
+        transitions = self._generator(conservative=True).transpose().tocsr()
+        offDiagonal = transitions - diags(transitions.diagonal())
+        absorbed = self._absorbing(self.states)
+        # states from which absorption is certain: all their paths reach the absorbing states
+        reaching = absorbed.copy()
+        while True:
+            updated = reaching | (offDiagonal.dot(reaching.astype(float)) > 0)
+            if (updated == reaching).all():
+                break
+            reaching = updated
+        trapped = ~reaching
+        while True:
+            updated = trapped | ((offDiagonal.dot(trapped.astype(float)) > 0) & ~absorbed)
+            if (updated == trapped).all():
+                break
+            trapped = updated
+        transient = np.nonzero(~absorbed & ~trapped)[0]
+        means = np.where(trapped, np.inf, 0.0)
+        variances = np.where(trapped, np.inf, 0.0)
+        if len(transient) > 0:
+            solve = factorized(transitions[transient][:, transient].tocsc())
+            means[transient] = solve(-np.ones(len(transient)))
+            variances[transient] = solve(-2 * means[transient]) - means[transient]**2
+        return means, np.maximum(variances, 0)
+
+    def marginals(self, distributions, species):
+        """Return the marginal distribution of the population of ``species`` (an index of the network species) at each time, one row per time."""
+        counts = self.states[:, species]
+        marginals = np.zeros((len(distributions), counts.max() + 1))
+        for time, distribution in enumerate(distributions):
+            marginals[time] = np.bincount(counts, weights=distribution, minlength=counts.max() + 1)
+        return marginals
+
+
+class _LinearNoiseApproximation:
+    """Linear noise approximation of the rate equations of a model, in matrix form.
+
+    The macroscopic propensity of each reaction is its rate times the
+    product of the concentrations of its reactants (with multiplicity), as
+    in the rate equations of the model.  With ``S`` the stoichiometry matrix
+    of the time-dependent reactants and ``a`` the vector of propensities,
+    the drift is ``S a``, its Jacobian ``S da/dPhi`` and the diffusion matrix
+    ``S diag(a) S^T``.  Reactants eliminated by :meth:`MuMoTmodel.substitute`
+    are affine functions of the others, and constant reactants take their
+    parameter values.  The noise variables are the fluctuations scaled by
+    the square root of the system size; their stationary covariance solves
+    the Lyapunov equation ``J C + C J^T + D = 0``.  The model is compiled
+    once, and only :meth:`setParameters` is needed when parameters change.
+
+    """
+    ## time-dependent reactants, in the order of the state vectors and of the rows and columns of the matrices
+    reactants = None
+
+    def __init__(self, stoichiometry, reactants):
+        self.reactants = sorted(reactants, key=str)
+        reactions = list(stoichiometry.values())
+        self._species = list(self.reactants)
+        for reaction in reactions:
+            for reactant in reaction:
+                if reactant != 'rate' and reactant not in self._species:
+                    self._species.append(reactant)
+        speciesIndex = {state: idx for idx, state in enumerate(self._species)}
+        self._rates = [reaction['rate'] for reaction in reactions]
+        self._orders = np.zeros((len(reactions), len(self._species)))
+        self._changes = np.zeros((len(reactions), len(self.reactants)))
+        # expressions of the reactants eliminated by substitutions, keyed by species index
+        self._substitutions = {}
+        for j, reaction in enumerate(reactions):
+            for reactant, re_stoch in reaction.items():
+                if reactant == 'rate': continue
+                idx = speciesIndex[reactant]
+                if re_stoch == 'const':
+                    self._orders[j, idx] = 1
+                    continue
+                self._orders[j, idx] = re_stoch[0]
+                if idx < len(self.reactants):
+                    self._changes[j, idx] = re_stoch[1] - re_stoch[0]
+                if len(re_stoch) > 2:
+                    self._substitutions[idx] = re_stoch[2][reactant]
+
+    def setParameters(self, argDict):
+        """Evaluate the rates, the constant reactants and the substitutions with the parameter values of ``argDict`` (keyed by symbol)."""
+        numReactants = len(self.reactants)
+        self._projection = np.zeros((len(self._species), numReactants))
+        self._projection[:numReactants] = np.eye(numReactants)
+        self._offset = np.zeros(len(self._species))
+        try:
+            self._rateValues = np.array([float(rate.subs(argDict)) for rate in self._rates])
+            for idx in range(numReactants, len(self._species)):
+                if idx in self._substitutions:
+                    expression = self._substitutions[idx]
+                    self._offset[idx] = float(expression.subs({reactant: 0 for reactant in self.reactants}).subs(argDict))
+                    self._projection[idx] = [float(sympy.diff(expression, reactant).subs(argDict)) for reactant in self.reactants]
+                else:
+                    self._offset[idx] = float(self._species[idx].subs(argDict))
+        except TypeError:
+            errorMsg = "The linear noise approximation needs the values of all the rates and constant reactants. Please set them with params and retry."
+            print(errorMsg)
+            raise MuMoTValueError(errorMsg)
+
+    def _concentrations(self, state):
+        """Return the concentrations of all the species in the reactions for ``state`` (concentrations of ``reactants``)."""
+        return self._offset + self._projection.dot(state)
+
+    def propensities(self, state):
+        """Return the macroscopic propensity of each reaction in ``state``."""
+        return self._rateValues * np.prod(self._concentrations(state)**self._orders, axis=1)
+
+    def drift(self, state):
+        """Return the right-hand side of the rate equations in ``state``."""
+        return self._changes.T.dot(self.propensities(state))
+
+    def jacobian(self, state):
+        """Return the Jacobian of the drift in ``state``."""
+        concentrations = self._concentrations(state)
+        powers = concentrations**self._orders
+        derivatives = np.zeros(self._orders.shape)
+        for idx in range(len(self._species)):
+            orders = self._orders[:, idx]
+            derivatives[:, idx] = self._rateValues * orders * concentrations[idx]**np.maximum(orders - 1, 0) * np.prod(np.delete(powers, idx, axis=1), axis=1)
+        return self._changes.T.dot(derivatives).dot(self._projection)
+
+    def diffusion(self, state):
+        """Return the diffusion matrix of the noise in ``state``."""
+        return (self._changes.T * self.propensities(state)).dot(self._changes)
+
+    def stationaryCovariance(self, state):
+        """Return the stationary covariance matrix of the noise around the (stable) fixed point ``state``."""
+        return solve_continuous_lyapunov(self.jacobian(state), -self.diffusion(state))
+
+    def correlations(self, state, times):
+        """Return the stationary correlations of the noise around ``state`` at lags ``times``.
+
+        Entry ``[t, i, j]`` is the correlation of the noise of reactant ``i``
+        at time ``times[t]`` with that of reactant ``j`` at time 0, which
+        evolves with the Jacobian from the stationary covariance.
+        """
+        jacobian = self.jacobian(state)
+        numReactants = len(self.reactants)
+        correlations = odeint(lambda y, _: jacobian.dot(y.reshape(numReactants, numReactants)).ravel(), self.stationaryCovariance(state).ravel(), times)
+        return correlations.reshape(len(times), numReactants, numReactants)
+
+
+def _run_chunks(runs, workers):
+    """Split the indices of ``runs`` runs in at most ``workers`` ranges of consecutive runs of similar length."""
+    size = -(-runs // workers)
+    return [range(start, min(start + size, runs)) for start in range(0, runs, size)]
+
+
+def _runSimulationInWorker(view, runs, resumeStates):
+    """Run the simulations ``runs`` of a stochastic view in a worker process.
+
+    Returns, for each run, the time evolution and the final state of the
+    simulation, and its pickled state for the checkpoint (None if
+    checkpoints are not used); ``resumeStates`` are the saved states the
+    runs resume from (None to start from scratch).
+    """
+    results = []
+    for run, resumeState in zip(runs, resumeStates):
+        evo = view._runSingleSimulation(run, resumeState=resumeState)
+        results.append((evo, view._finalSimulationState(), view._endState))
+    return results
+
+
+def _firstPassageInWorker(view, runs, thresholds):
+    """Run the first-passage simulations ``runs`` of a :class:`MuMoTSSAView` in a worker process."""
+    return [view._runFirstPassage(run, thresholds) for run in runs]
+
+
+def _sweepInWorker(view, ratesDict, observableIdx):
+    """Run the simulations of a point of a parameter sweep of a :class:`MuMoTSSAView` in a worker process."""
+    return view._runSweepPoint(ratesDict, observableIdx)
+
 
 def parseModel(modelDescription):
     """Create model from text description."""
@@ -7010,6 +10102,170 @@ def _getStoichiometry(rules, const_reactants):
     return stoich
 
 
+## memoised results of the symbolic derivations (see :func:`_memoise_derivation`)
+_derivationCache = {}
+
+## folder of the disk cache of symbolic derivations, None if disabled (see :func:`setDerivationCache`)
+_derivationCacheDir = None
+
+
+def setDerivationCache(onDisk=True):
+    """Set whether the symbolic derivations of models are cached on disk.
+
+    The derivations (Master equation, van Kampen expansion, Fokker-Planck
+    and noise equations, ODEs and the sources of the lambdified equations)
+    are always memoised for the session; with the disk cache they are also
+    stored in the ``derivations`` folder of ``MuMoTmodel._tmpdirpath``, and
+    loaded when the same model is derived in a later session with the same
+    versions of MuMoT and SymPy.  The folder is resolved against the
+    current working directory when the cache is enabled.
+
+    Entries are pickles, and the sources of the lambdified equations are
+    evaluated when loaded: only enable the cache on folders whose content
+    is trusted.
+
+    Parameters
+    ----------
+    onDisk : boolean, optional
+        Whether to cache the derivations on disk.  Defaults to True.
+
+    """
+    global _derivationCacheDir
+    if onDisk:
+        _derivationCacheDir = os.path.abspath(os.path.join(MuMoTmodel._tmpdirpath, 'derivations'))
+    else:
+        _derivationCacheDir = None
+
+
+def _stoichiometry_fingerprint(stoichiometry):
+    """Return a canonical fingerprint of a model stoichiometry (equal for equal stoichiometries, whatever the order of their dictionaries)."""
+    def canonical(value):
+        if isinstance(value, dict):
+            return '{' + ', '.join(sorted(canonical(key) + ': ' + canonical(item) for key, item in value.items())) + '}'
+        if isinstance(value, (list, tuple)):
+            return '[' + ', '.join(canonical(item) for item in value) + ']'
+        if isinstance(value, sympy.Basic):
+            return sympy.srepr(value)
+        return repr(value)
+    return hashlib.sha1(canonical(stoichiometry).encode('utf-8')).hexdigest()
+
+
+def _derivation_file(key):
+    """Return the file caching the derivation ``key`` on disk (named after the key and the versions of MuMoT and SymPy)."""
+    digest = hashlib.sha1(repr((key, __version__, sympy.__version__)).encode('utf-8')).hexdigest()
+    return os.path.join(_derivationCacheDir, digest + '.pickle')
+
+
+def _load_derivation(key):
+    """Return the derivation ``key`` cached on disk, or None if there is no valid entry."""
+    try:
+        with open(_derivation_file(key), 'rb') as derivationFile:
+            entry = pickle.load(derivationFile)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # missing or truncated entries are derived again (and overwritten)
+        return None
+    if not isinstance(entry, dict) or entry.get('key') != key or entry.get('versions') != (__version__, sympy.__version__):
+        return None
+    return entry.get('result')
+
+
+def _save_derivation(key, result):
+    """Write the derivation ``key`` to the disk cache (results that cannot be pickled are only memoised in memory)."""
+    fileName = _derivation_file(key)
+    temporaryFile = fileName + '.tmp'
+    try:
+        os.makedirs(_derivationCacheDir, exist_ok=True)
+        with open(temporaryFile, 'wb') as derivationFile:
+            pickle.dump({'key': key, 'versions': (__version__, sympy.__version__), 'result': result}, derivationFile)
+        os.replace(temporaryFile, fileName)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError):
+        if os.path.isfile(temporaryFile):
+            os.remove(temporaryFile)
+
+
+def _derivation_unavailable(result):
+    """Return True if ``result`` reports a derivation not available for the model (None, or a tuple of Nones)."""
+    return result is None or (isinstance(result, tuple) and all(item is None for item in result))
+
+
+def _copy_derivation(result):
+    """Return a copy of the containers (dictionaries, lists, tuples and matrices) of the derivation ``result``.
+
+    SymPy expressions are immutable, so they are shared with the cached result.
+    """
+    if isinstance(result, dict):
+        return {key: _copy_derivation(value) for key, value in result.items()}
+    if isinstance(result, (list, tuple, set)):
+        return type(result)(_copy_derivation(item) for item in result)
+    if isinstance(result, sympy.MatrixBase):
+        return result.copy()
+    return result
+
+
+def _cached_derivation(key, derive):
+    """Return a copy of the derivation ``key``, computed by ``derive()`` if it is not cached.
+
+    Derivations are looked up in the session cache, then (if enabled by
+    :func:`setDerivationCache`) in the disk cache, which is only read when
+    an entry is first requested.  Derivations not available for the model
+    (see :func:`_derivation_unavailable`) are not cached, so that their
+    message is shown on every call.
+    """
+    if key not in _derivationCache:
+        result = _load_derivation(key) if _derivationCacheDir is not None else None
+        if result is None:
+            result = derive()
+            if _derivation_unavailable(result):
+                return result
+            if _derivationCacheDir is not None:
+                _save_derivation(key, result)
+        _derivationCache[key] = result
+    return _copy_derivation(_derivationCache[key])
+
+
+def _memoise_derivation(derivation):
+    """Memoise a symbolic derivation whose last argument is a model stoichiometry.
+
+    Results are keyed by the name of the derivation, the names of the
+    derivations passed to it and the fingerprint of the stoichiometry, so
+    the derivations of a model are carried out once (also when called by
+    later stages of the chain), and models created by
+    :meth:`MuMoTmodel.substitute` get their own entries.  Copies of the
+    containers are returned (see :func:`_copy_derivation`), so that callers
+    cannot alter the memoised results.
+    """
+    @functools.wraps(derivation)
+    def memoised(*args):
+        key = (derivation.__name__, tuple(arg.__name__ for arg in args[:-1]), _stoichiometry_fingerprint(args[-1]))
+        return _cached_derivation(key, lambda: derivation(*args))
+    return memoised
+
+
+def _lambdified_functions(args, equations):
+    """Return the functions of ``args`` evaluating ``equations`` with the "math" module.
+
+    The sources of the functions are cached as the symbolic derivations (see
+    :func:`_cached_derivation`); equations whose source uses names missing
+    from the "math" module are lambdified directly.
+    """
+    key = ('_lambdified_functions', (), _stoichiometry_fingerprint([list(args), equations]))
+    sources = _cached_derivation(key, lambda: {equation: lambdastr(args, equations[equation], dummify=True) for equation in equations})
+    namespace = dict(vars(math))
+
+    def names(code):
+        return set(code.co_names).union(*[names(const) for const in code.co_consts if hasattr(const, 'co_names')])
+
+    funcs = {}
+    for equation in equations:
+        code = compile(sources[equation], '<lambdified>', 'eval')
+        if all(name in namespace or hasattr(builtins, name) for name in names(code)):
+            funcs[equation] = eval(code, namespace)
+        else:
+            funcs[equation] = lambdify(args, equations[equation], "math")
+    return funcs
+
+
+@_memoise_derivation
 def _deriveMasterEquation(stoichiometry):
     """Derive the Master equation
     
@@ -7063,6 +10319,7 @@ def _deriveMasterEquation(stoichiometry):
     return sol_dict_rhs, substring
 
 
+@_memoise_derivation
 def _doVanKampenExpansion(rhs, stoich):
     """Return the left-hand side and right-hand side of van Kampen expansion."""
     P, E_op, x, y, v, w, t, m = symbols('P E_op x y v w t m')
@@ -7213,6 +10470,7 @@ def _doVanKampenExpansion(rhs, stoich):
 
 
 # def _get_orderedLists_vKE( _getStoichiometry,rules):
+@_memoise_derivation
 def _get_orderedLists_vKE(stoich):
     """Create list of dictionaries where the key is the system size order."""
     V = Symbol('\overline{V}', real=True, constant=True)
@@ -7244,6 +10502,7 @@ def _get_orderedLists_vKE(stoich):
     return Vlist_lhs, Vlist_rhs, substring
 
 
+@_memoise_derivation
 def _getFokkerPlanckEquation(_get_orderedLists_vKE, stoich):
     """Return the Fokker-Planck equation."""
     P, t = symbols('P t')
@@ -7293,6 +10552,7 @@ def _getFokkerPlanckEquation(_get_orderedLists_vKE, stoich):
     return SOL_FPE, substring
 
 
+@_memoise_derivation
 def _getNoiseEOM(_getFokkerPlanckEquation, _get_orderedLists_vKE, stoich):
     """Calculates noise in the system.
 
@@ -7471,6 +10731,7 @@ def _getNoiseEOM(_getFokkerPlanckEquation, _get_orderedLists_vKE, stoich):
     return EQsys1stOrdMom, EOM_1stOrderMom, NoiseSubs1stOrder, EQsys2ndOrdMom, EOM_2ndOrderMom, NoiseSubs2ndOrder 
 
 
+@_memoise_derivation
 def _getNoiseStationarySol(_getNoiseEOM, _getFokkerPlanckEquation, _get_orderedLists_vKE, stoich):
     """Calculate noise in the system.
 
@@ -7785,6 +11046,7 @@ def _getNoiseStationarySol(_getNoiseEOM, _getFokkerPlanckEquation, _get_orderedL
 #     return EOM_1stOrderMom, SOL_1stOrderMom[0], NoiseSubs1stOrder, EOM_2ndOrderMom, SOL_2ndOrdMomDict, NoiseSubs2ndOrder 
     
 
+@_memoise_derivation
 def _getODEs_vKE(_get_orderedLists_vKE, stoich):
     """Return the ODE system derived from Master equation."""
     P, t = symbols('P t')
@@ -8977,6 +12239,80 @@ def _get_item_from_params_list(params, targetName):
     return None
 
 
+def _parse_time_grid(optionName, inputValue, maxTime=None):
+    """Check that ``inputValue`` is a number of equally spaced times (at least 2) or a list of non-negative times.
+
+    If ``maxTime`` is given, a list must also include times not greater
+    than ``maxTime`` (see :func:`_time_grid`).
+    """
+    if isinstance(inputValue, numbers.Integral):
+        validTimes = inputValue >= 2
+    else:
+        try:
+            inputValue = [float(t) for t in inputValue]
+            validTimes = len(inputValue) > 0 and min(inputValue) >= 0
+        except (TypeError, ValueError):
+            validTimes = False
+    if not validTimes:
+        errorMsg = "The specified value for " + optionName + " = " + str(inputValue) + " is not valid. \n" \
+                    "It must be an integer greater than 1 or a list of non-negative times. Please correct it and retry."
+        print(errorMsg)
+        raise MuMoTValueError(errorMsg)
+    if maxTime is not None and not isinstance(inputValue, numbers.Integral) and min(inputValue) > maxTime:
+        errorMsg = "The specified value for " + optionName + " = " + str(inputValue) + " is not valid. \n" \
+                    "All the times are greater than maxTime = " + str(maxTime) + ". Please correct them (or maxTime) and retry."
+        print(errorMsg)
+        raise MuMoTValueError(errorMsg)
+    return inputValue
+
+
+def _check_projection_settings(tolerance, maxStates):
+    """Raise a :class:`MuMoTValueError` if ``tolerance`` and ``maxStates`` are not valid settings of a :class:`_FiniteStateProjection`."""
+    if not isinstance(tolerance, numbers.Real) or not 0 < tolerance < 1 or not isinstance(maxStates, numbers.Integral) or maxStates < 1:
+        errorMsg = "The specified values of tolerance = " + str(tolerance) + " or maxStates = " + str(maxStates) + " are not valid. \n" \
+                    "tolerance must be in the range (0, 1) and maxStates a positive integer. Please correct them and retry."
+        print(errorMsg)
+        raise MuMoTValueError(errorMsg)
+
+
+def _parse_passage_conditions(conditions, reactants):
+    """Check the absorbing ``conditions`` of a first-passage computation (a dictionary keyed by label) on ``reactants``.
+
+    Returns the list of labels and the list of conditions, each a list of
+    ``(reactant, comparison, proportion)`` triples that must all hold.
+    """
+    labels = list(conditions.keys())
+    parsedConditions = []
+    for label in labels:
+        condition = conditions[label]
+        if isinstance(condition, tuple):
+            condition = [condition]
+        parsedCondition = []
+        for clause in condition:
+            try:
+                reactant, comparison, proportion = clause
+                reactant = process_sympy(reactant) if isinstance(reactant, str) else reactant
+                valid = reactant in reactants and comparison in COMPARISON_OPERATORS and isinstance(proportion, numbers.Real)
+            except (TypeError, ValueError):
+                valid = False
+            if not valid:
+                errorMsg = "The specified condition " + str(clause) + " for '" + str(label) + "' is not valid. \n" \
+                            "It must be a tuple (reactant, comparison, proportion) with comparison in " + str(list(COMPARISON_OPERATORS.keys())) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            parsedCondition.append((reactant, comparison, proportion))
+        parsedConditions.append(parsedCondition)
+    return labels, parsedConditions
+
+
+def _time_grid(times, maxTime):
+    """Return the sorted array of ``times`` not greater than ``maxTime`` (or ``times`` equally spaced times in [0, ``maxTime``] if it is an integer)."""
+    if isinstance(times, numbers.Integral):
+        return np.linspace(0, maxTime, times)
+    times = np.sort(np.array(times, dtype=float))
+    return times[times <= maxTime]
+
+
 def _format_advanced_option(optionName, inputValue, initValues, extraParam=None, extraParam2=None):
     """Check if the user-specified values are within valid range (appropriate subfunctions are called depending on the parameter).
 
@@ -9215,6 +12551,48 @@ def _format_advanced_option(optionName, inputValue, initValues, extraParam=None,
                                                            initValue=initValues,
                                                            paramNameForErrorMsg=optionName)  
         
+    if (optionName == 'engine'):
+        validEngines = list(SSA_ENGINES)
+        if inputValue is not None:
+            if inputValue not in validEngines:  # terminating the process if the input argument is wrong
+                errorMsg = "The specified value for engine = " + str(inputValue) + " is not valid. \n" \
+                            "Valid values are: " + str(validEngines) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            return [inputValue, True]
+        else:
+            if initValues in validEngines:
+                return [initValues, False]
+            else: 
+                return ['direct', False]  # as default engine is set to 'direct'
+
+    if (optionName == 'recording'):
+        validPolicies = ['event', 'grid', 'final']
+        if inputValue is not None:
+            if inputValue not in validPolicies:  # terminating the process if the input argument is wrong
+                errorMsg = "The specified value for recording = " + str(inputValue) + " is not valid. \n" \
+                            "Valid values are: " + str(validPolicies) + ". Please correct it and retry."
+                print(errorMsg)
+                raise MuMoTValueError(errorMsg)
+            return [inputValue, True]
+        else:
+            if initValues in validPolicies:
+                return [initValues, False]
+            else: 
+                return ['event', False]  # as default every event is recorded
+
+    if (optionName == 'tauEpsilon'):
+        return _parse_input_keyword_for_numeric_widgets(inputValue=inputValue,
+                                defaultValueRangeStep=[0.03, 0.01, 0.2, 0.01], 
+                                initValueRangeStep=initValues, 
+                                validRange=(0, 1)) 
+
+    if (optionName == 'langevinStep'):
+        return _parse_input_keyword_for_numeric_widgets(inputValue=inputValue,
+                                defaultValueRangeStep=[0.01, 0.001, 0.1, 0.001], 
+                                initValueRangeStep=initValues, 
+                                validRange=(0, float("inf"))) 
+
     if (optionName == 'initBifParam'):
         return _parse_input_keyword_for_numeric_widgets(inputValue=inputValue,
                                     defaultValueRangeStep=[MuMoTdefault._initialRateValue, MuMoTdefault._rateLimits[0], MuMoTdefault._rateLimits[1], MuMoTdefault._rateStep], 
@@ -1,4 +1,50 @@
-from mumot import MuMoTmodel
+import math
+import pickle
+
+import matplotlib.patches as mpatch
+import numpy as np
+import pytest
+import sympy
+from matplotlib import pyplot as plt
+from sympy import Symbol
+
+from mumot import MuMoTmodel, MuMoTValueError, parseModel
+from mumot import _ReactionNetwork, _DirectMethod, _NextReactionMethod, _CompositionRejectionMethod
+from mumot import _TauLeapingMethod, _HybridMethod, _SlowScaleMethod, _BatchDirectMethod, _LangevinMethod, _Trajectory
+from mumot import _QuantileSketch, _RandomStream, _LinearNoiseApproximation
+from mumot import _derivationCache, _deriveMasterEquation, _getFokkerPlanckEquation, _get_orderedLists_vKE, _stoichiometry_fingerprint
+from mumot import setDerivationCache
+
+
+def _testModel():
+    return parseModel(r"U -> A : g_1 \n U -> B : g_2 \n A -> U : a_1 \n B -> U : a_2 \n A + U -> A + A : r_1 \n B + U -> B + B : r_2 \n A + B -> A + U : s")
+
+
+def _testRates(model, value=1.0):
+    return {str(rule.rate): value for rule in model._rules}
+
+
+def _twoStateNetwork():
+    """Reaction network of A <-> B with rates k_1 = 1 and k_2 = 3, and its sorted species."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    rates = {str(rule.rate): (1.0 if str(rule.rate) == 'k_{1}' else 3.0) for rule in model._rules}
+    species = sorted(model._getAllReactants()[0], key=str)
+    return _ReactionNetwork(model._stoichiometry, rates, species), species
+
+
+def _ssaView(model, **kwargs):
+    """Silent SSA barplot view of ``model`` with its parameters read."""
+    view = model.SSA(visualisationType='barplot', silent=True, **kwargs)._view
+    view._update_params()
+    return view
+
+
+def _runSSAView(model, **kwargs):
+    """Silent SSA barplot view of ``model`` after running its simulations."""
+    view = _ssaView(model, **kwargs)
+    view._latestResults = []
+    view._runSimulations()
+    return view
 
 
 def test_dummy_1():
@@ -15,3 +61,464 @@ def test_dummy_2():
     More information about this test.
     """
     assert 2 == 2
+
+
+def test_reaction_network_propensities():
+    """Compiled propensities match the SSA mass-action convention.
+
+    Each reactant contributes population times occurrences; reactions with
+    more than one reagent are divided by the total population.
+    """
+    model = _testModel()
+    rates = {str(rule.rate): float(idx + 1) for idx, rule in enumerate(model._rules)}
+    species = sorted(model._getAllReactants()[0], key=str)
+    network = _ReactionNetwork(model._stoichiometry, rates, species)
+    currentState = dict(zip(species, [3, 5, 7]))
+    state = network.initState(currentState)
+    expected = []
+    for reaction in model._stoichiometry.values():
+        prob = rates[str(reaction['rate'])]
+        numReagents = 0
+        for reactant, re_stoch in reaction.items():
+            if reactant == 'rate': continue
+            if re_stoch[0] > 0:
+                prob *= currentState[reactant] * re_stoch[0]
+            numReagents += re_stoch[0]
+        if prob > 0 and numReagents > 1:
+            prob /= sum(currentState.values())**(numReagents - 1)
+        expected.append(prob)
+    assert np.allclose(network.propensities(state), expected)
+
+
+def test_direct_method_dependencies():
+    """Incremental propensity updates agree with a full recomputation."""
+    model = _testModel()
+    species = sorted(model._getAllReactants()[0], key=str)
+    network = _ReactionNetwork(model._stoichiometry, _testRates(model), species)
+    engine = _DirectMethod(network)
+    np.random.seed(1)
+    engine.reset(network.initState(dict(zip(species, [20, 20, 20]))))
+    t = 0
+    for _ in range(500):
+        timeInterval, reaction = engine.step(t, 1000)
+        t += timeInterval
+        assert np.allclose(engine.propensities, network.propensities(engine.state))
+    assert engine.state[:-1].sum() == 60
+
+
+def _timeAverage(engine, network, species, maxTime):
+    """Time-averaged population of ``species`` in a run of ``engine``."""
+    idx = network.species.index(species)
+    t = 0
+    area = 0
+    while t < maxTime:
+        population = engine.state[idx]
+        timeInterval, _ = engine.step(t, maxTime)
+        area += population * min(timeInterval, maxTime - t)
+        t += timeInterval
+    return area / maxTime
+
+
+def test_engines_stationary_mean():
+    """Exact engines reproduce the binomial stationary mean of A <-> B."""
+    network, species = _twoStateNetwork()
+    for engineClass in [_DirectMethod, _NextReactionMethod, _CompositionRejectionMethod]:
+        np.random.seed(7)
+        engine = engineClass(network)
+        engine.reset(network.initState(dict(zip(species, [20, 0]))))
+        mean = _timeAverage(engine, network, species[0], 2000)
+        assert abs(mean - 15) < 0.3, engineClass.__name__
+
+
+def test_tau_leaping_stationary_mean():
+    """Tau-leaping reproduces the stationary mean of A <-> B with many agents."""
+    network, species = _twoStateNetwork()
+    np.random.seed(7)
+    engine = _TauLeapingMethod(network, epsilon=0.03)
+    engine.reset(network.initState(dict(zip(species, [20000, 0]))))
+    mean = _timeAverage(engine, network, species[0], 200)
+    assert abs(mean - 15000) < 150
+    assert engine.state[:-1].sum() == 20000
+
+
+def test_hybrid_rare_species():
+    """Hybrid engine integrates abundant species and keeps rare ones discrete."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2 \n A -> C : k_3 \n C -> A : k_4")
+    values = {'k_{1}': 1.0, 'k_{2}': 1.0, 'k_{3}': 0.002, 'k_{4}': 0.5}
+    rates = {str(rule.rate): values[str(rule.rate)] for rule in model._rules}
+    species = sorted(model._getAllReactants()[0], key=str)
+    network = _ReactionNetwork(model._stoichiometry, rates, species)
+    np.random.seed(3)
+    finals = []
+    for _ in range(40):
+        engine = _HybridMethod(network)
+        engine.reset(network.initState(dict(zip(species, [2000, 0, 0]))))
+        t = 0
+        while t < 10:
+            timeInterval, _ = engine.step(t, 10)
+            t += timeInterval
+        assert engine.fast[:2].all() and not engine.fast[2:].any()
+        finals.append(engine.state[2])
+    assert all(count == round(count) for count in finals)
+    assert abs(np.mean(finals) - 4) < 1.2
+
+
+def test_slow_scale_fast_pair():
+    """Slow-scale SSA detects a fast reversible pair and reproduces the decay through the slow reaction."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2 \n B -> C : k_3")
+    values = {'k_{1}': 500.0, 'k_{2}': 500.0, 'k_{3}': 1.0}
+    rates = {str(rule.rate): values[str(rule.rate)] for rule in model._rules}
+    species = sorted(model._getAllReactants()[0], key=str)
+    network = _ReactionNetwork(model._stoichiometry, rates, species)
+    np.random.seed(1)
+    engine = _SlowScaleMethod(network)
+    assert [network.rates[list(pair)].tolist() for pair in engine.fastPairs] == [[500.0, 500.0]]
+    productIdx = [str(state) for state in species].index('C')
+    finals = []
+    for _ in range(400):
+        engine.reset(network.initState(dict(zip(species, [20, 0, 0]))))
+        t = 0
+        while True:
+            produced = engine.state[productIdx]
+            timeInterval, _ = engine.step(t, 2)
+            t += timeInterval
+            if t >= 2:
+                break
+        finals.append(produced)
+    # the pair keeps half of A + B in B, which decays with rate k_3
+    assert abs(np.mean(finals) - 20 * (1 - np.exp(-1))) < 0.5
+    view = _runSSAView(model, initialState={'A': 1, 'B': 0, 'C': 0}, maxTime=0.1, runs=1, params=[('k_1', 500), ('k_2', 500), ('k_3', 1), ('systemSize', 20)],
+                       engine='slowScale')
+    assert len(view._fastPairs) == 1 and set(view._fastPairs[0]) <= set(model._stoichiometry)
+
+
+def test_batch_direct_method():
+    """Batched runs are consistent and reproduce the stationary mean of A <-> B."""
+    network, species = _twoStateNetwork()
+    np.random.seed(5)
+    initialState = network.initState(dict(zip(species, [20, 0])))
+    runs = _BatchDirectMethod(network).run([initialState] * 200, 5)
+    assert len(runs) == 200
+    for times, populations in runs:
+        assert times[0] == 0 and times[-2] < 5 <= times[-1]
+        assert np.all(np.diff(times) > 0)
+        assert np.all(populations.sum(axis=1) == 20)
+    finals = [populations[-1, 0] for _, populations in runs]
+    assert abs(np.mean(finals) - 15) < 0.6
+
+
+def test_langevin_stationary_moments():
+    """Both Langevin schemes reproduce the binomial stationary mean and variance of A <-> B, with continuous populations."""
+    network, species = _twoStateNetwork()
+    np.random.seed(5)
+    initialState = network.initState(dict(zip(species, [1000, 0])))
+    for milstein in [False, True]:
+        runs = _LangevinMethod(network, timestep=0.01, milstein=milstein).run([initialState] * 1000, 3, recording='final')
+        finals = np.array([populations[-1, 1] for _, populations in runs])
+        assert abs(finals.mean() - 250) < 3
+        assert abs(finals.var() - 187.5) < 30
+        assert np.allclose([populations[-1].sum() for _, populations in runs], 1000)
+    times, populations = _LangevinMethod(network, timestep=0.01).run([initialState], 1, recording='grid', recordingTimes=[0, 0.5, 1])[0]
+    assert times.tolist() == [0, 0.5, 1] and populations[0].tolist() == [1000, 0]
+
+
+def test_parallel_runs_reproducible():
+    """Runs executed on worker processes match sequential runs, in run order."""
+    model = _testModel()
+    results = []
+    for workers in [1, 2]:
+        view = _runSSAView(model, initialState={'U': 0.5, 'A': 0.25, 'B': 0.25}, maxTime=2, runs=3, randomSeed=11, workers=workers)
+        results.append([{str(key): values.tolist() for key, values in evo.items()} for evo in view._latestResults])
+    assert results[0] == results[1]
+
+
+def test_recording_policies():
+    """Grid and final recordings sample the same trajectories recorded event by event."""
+    model = _testModel()
+    for engine in ['direct', 'batch']:
+        results = {}
+        for recording in ['event', 'grid', 'final']:
+            view = _runSSAView(model, initialState={'U': 0.5, 'A': 0.25, 'B': 0.25}, maxTime=3, runs=2, randomSeed=7,
+                               engine=engine, recording=recording, recordingTimes=[0, 0.5, 1.25, 3])
+            results[recording] = view._latestResults
+        for events, grid, final in zip(results['event'], results['grid'], results['final']):
+            assert grid['time'].tolist() == [0, 0.5, 1.25, 3]
+            assert final['time'].tolist() == events['time'][-1:].tolist()
+            for state in events.species:
+                indices = np.searchsorted(events['time'], grid['time'], side='right') - 1
+                assert np.array_equal(grid[state], events[state][indices])
+                assert np.array_equal(final[state], events[state][-1:])
+
+
+def test_trajectory_storage():
+    """Trajectories grow past their initial capacity and expose views on the recorded samples."""
+    model = _testModel()
+    species = sorted(model._getAllReactants()[0], key=str)
+    trajectory = _Trajectory(species, capacity=2)
+    for step in range(5):
+        trajectory.append(step * 0.5, [step, 2 * step, 3 * step])
+    trajectory.extend([2.5, 3], [[5, 10, 15], [6, 12, 18]])
+    assert len(trajectory) == 7
+    assert trajectory['time'].tolist() == [0, 0.5, 1, 1.5, 2, 2.5, 3]
+    assert trajectory[species[1]].tolist() == [2 * step for step in range(7)]
+    assert np.shares_memory(trajectory[species[1]], trajectory.counts)
+    trajectory.compact()
+    assert trajectory.counts.shape == (7, 3) and trajectory.counts.dtype == np.int64
+    assert trajectory.toCSV().splitlines()[-1] == '3.0,6,12,18'
+
+
+def test_streaming_aggregation():
+    """Running statistics match those of the stored runs, and quantile sketches approximate the exact quantiles."""
+    model = _testModel()
+    views = {}
+    for aggregation in ['stored', 'streaming']:
+        views[aggregation] = _runSSAView(model, initialState={'U': 0.5, 'A': 0.25, 'B': 0.25}, maxTime=2, runs=6, randomSeed=3,
+                                         aggregation=aggregation, aggregationTimes=5)
+    stats = views['streaming']._runningStats
+    assert stats.count == 6 and len(views['streaming']._latestResults) == 1
+    stored = views['stored']._latestResults
+    for state in stats.species:
+        samples = np.array([evo[state][np.minimum(np.searchsorted(evo['time'], stats.times), len(evo) - 1)] for evo in stored])
+        assert np.allclose(stats.mean(state), samples.mean(axis=0))
+        assert np.allclose(stats.std(state), samples.std(axis=0))
+        assert np.isclose(stats.finalMean(state), np.mean([evo[state][-1] for evo in stored]))
+    np.random.seed(2)
+    values = np.random.normal(size=(5000, 3))
+    sketch = _QuantileSketch(0.75, (3,))
+    for row in values:
+        sketch.update(row)
+    assert np.allclose(sketch.quantile(), np.percentile(values, 75, axis=0), atol=0.05)
+    assert np.array_equal(sketch.maximum(), values.max(axis=0))
+
+
+def test_random_streams():
+    """Per-run streams are reproducible, independent of the block size and leave the global random state untouched."""
+    blocks = [_RandomStream(42, 3, blockSize=size) for size in [3, 4096]]
+    assert [blocks[0].random_sample() for _ in range(10)] == [blocks[1].random_sample() for _ in range(10)]
+    blocks = [_RandomStream(42, 3, blockSize=size) for size in [3, 4096]]
+    assert [blocks[0].exponential(2.0) for _ in range(10)] == [blocks[1].exponential(2.0) for _ in range(10)]
+    assert _RandomStream(42, 3).rand() != _RandomStream(42, 4).rand()
+    model = _testModel()
+    np.random.seed(0)
+    expected = np.random.random_sample()
+    np.random.seed(0)
+    _runSSAView(model, initialState={'U': 0.5, 'A': 0.25, 'B': 0.25}, maxTime=1, runs=2, randomSeed=5)
+    assert np.random.random_sample() == expected
+
+
+def test_steady_state_early_stop():
+    """Runs that settle are stopped before maxTime and record their stopping time."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    view = _runSSAView(model, initialState={'A': 1, 'B': 0}, maxTime=500, runs=2, randomSeed=9, steadyStateTolerance=0.05, steadyStateWindow=5)
+    for evo in view._latestResults:
+        assert evo.stoppingTime is not None and evo.stoppingTime < 500
+        assert evo['time'][-1] == evo.stoppingTime
+
+
+def test_first_passage_times():
+    """First-passage times are reproducible, independent of the workers, and report the condition hit."""
+    model = _testModel()
+    conditions = {'A': ('A', '>=', 0.6), 'B': [('B', '>=', 0.6), ('A', '<', 0.2)]}
+    results = [model.firstPassage(conditions, initialState={'U': 1, 'A': 0, 'B': 0}, maxTime=50, runs=4, randomSeed=13,
+                                  workers=workers, params=[('systemSize', 20)]) for workers in [1, 2]]
+    assert np.array_equal(results[0]['times'], results[1]['times'])
+    assert results[0]['conditions'] == results[1]['conditions']
+    for time, condition in zip(results[0]['times'], results[0]['conditions']):
+        assert (condition is None) == np.isinf(time)
+        assert condition in ['A', 'B', None]
+
+
+def test_checkpoint_extend(tmpdir):
+    """Extending checkpointed runs simulates only the extra time and matches runs simulated in one go."""
+    model = _testModel()
+    checkpointFile = str(tmpdir.join('runs.ckpt'))
+    options = dict(initialState={'U': 1, 'A': 0, 'B': 0}, runs=2, randomSeed=5, visualisationType='final', recording='event',
+                   silent=True, params=[('systemSize', 20)])
+    controller = model.SSA(maxTime=1, checkpointFile=checkpointFile, **options)
+    controller._view._computeAndPlotSimulation()
+    shortRuns = [evo['time'].tolist() for evo in controller._view._latestResults]
+    controller.extend(2)
+    extended = controller._view._latestResults
+    fresh = model.SSA(maxTime=2, **options)
+    fresh._view._computeAndPlotSimulation()
+    for short, evo, freshEvo in zip(shortRuns, extended, fresh._view._latestResults):
+        assert evo['time'][:len(short)].tolist() == short
+        assert evo['time'].tolist() == freshEvo['time'].tolist()
+        for state in evo.species:
+            assert np.array_equal(evo[state], freshEvo[state])
+
+
+def test_sweep_ssa(tmpdir):
+    """Sweeps are independent of the workers, resume from the cache and follow the stationary proportions."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    cacheFile = str(tmpdir.join('sweep.cache'))
+    options = dict(initialState={'A': 1, 'B': 0}, maxTime=20, runs=20, randomSeed=3, params=[('k_2', 1), ('systemSize', 50)])
+    results = [model.sweepSSA({'k_1': [0.5, 1, 3]}, observables=['B'], statistics=['mean', 'median'], workers=workers, cacheFile=cacheFile, **options)
+               for workers in [1, 2]]
+    assert results[0]['data'].shape == (3, 1, 2)
+    assert results[0]['samples'].shape == (3, 20, 1)
+    assert np.array_equal(results[0]['samples'], results[1]['samples'])
+    uncached = model.sweepSSA({'k_1': [0.5, 1, 3]}, observables=['B'], statistics=['mean', 'median'], workers=2, **options)
+    assert np.array_equal(results[0]['data'], uncached['data'])
+    assert np.allclose(results[0]['data'][:, 0, 0], [1/3, 1/2, 3/4], atol=0.05)
+    extended = model.sweepSSA({'k_1': [0.5, 1, 3, 2]}, observables=['B'], workers=1, cacheFile=cacheFile, **options)
+    assert np.array_equal(extended['samples'][:3], results[0]['samples'])
+    with open(cacheFile, 'rb') as cacheStream:
+        assert len(pickle.load(cacheStream)['points']) == 4
+
+
+def test_weighted_ensemble_switching_time():
+    """The weighted-ensemble switching time matches the exact mean first-passage time of a birth-death process."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    result = model.weightedEnsemble('B', 0.6, (np.arange(1, 12) + 0.5)/20, walkersPerBin=4, resamplingTime=0.05, iterations=400,
+                                    initialState={'A': 1, 'B': 0}, randomSeed=0, params=[('k_1', 1), ('k_2', 3), ('systemSize', 20)])
+    assert np.isclose(result['binProbabilities'].sum(), 1)
+    assert len(result['paths']) > 0 and all(path['progress'][-1] >= 0.6 for path in result['paths'])
+    # mean time to reach 12 B from 0 B, with B -> B+1 at rate 20 - B and B -> B-1 at rate 3B
+    generator = np.diag([-(20.0 - b) - 3.0*b for b in range(12)]) + np.diag([20.0 - b for b in range(11)], 1) + np.diag([3.0*b for b in range(1, 12)], -1)
+    exact = np.linalg.solve(generator, -np.ones(12))[0]
+    assert exact/2 < result['meanSwitchingTime'] < 2*exact
+
+
+def test_multilevel_estimate():
+    """Multilevel Monte Carlo reaches the requested error on the mean of A <-> B."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    result = model.multilevelSSA(0.3, initialState={'A': 1, 'B': 0}, maxTime=1, randomSeed=0, params=[('k_1', 1), ('k_2', 3), ('systemSize', 100)])
+    assert [level['steps'] for level in result['levels']] == [8, 16, 32, None]
+    assert np.all(result['variance'] <= 0.3**2 * 1.01)
+    expected = 25 * (1 - np.exp(-4))
+    assert abs(result['mean'][result['reactants'].index('B')] - expected) < 4 * 0.3
+    assert np.isclose(result['mean'].sum(), 100)
+
+
+def test_master_equation_projection():
+    """The finite state projection reproduces the binomial distribution of A <-> B and the Poisson distribution of a birth-death process."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    result = model.solveMasterEquation(times=5, initialState={'A': 1, 'B': 0}, maxTime=2, params=[('k_1', 1), ('k_2', 3), ('systemSize', 30)])
+    marginal = result['marginals']['B'][-1]
+    p = 0.25 * (1 - np.exp(-8))
+    binomial = [math.factorial(30) / (math.factorial(k) * math.factorial(30 - k)) * p**k * (1 - p)**(30 - k) for k in range(len(marginal))]
+    assert np.allclose(marginal, binomial, atol=1e-6)
+    assert np.all(result['leaks'] <= 1e-4) and np.isclose(result['means']['B'][-1], 30 * p, atol=1e-3)
+    model = parseModel(r"\emptyset -> A : k_1 \n A -> \emptyset : k_2")
+    result = model.solveMasterEquation(times=[0, 5], tolerance=1e-6, initialState={'A': 1}, maxTime=5, params=[('k_1', 20), ('k_2', 1), ('systemSize', 1)])
+    marginal = result['marginals']['A'][-1]
+    # the individuals born are Poisson distributed, the initial one survives with probability exp(-5)
+    mean = 20 * (1 - np.exp(-5))
+    poisson = [np.exp(k*np.log(mean) - mean - math.lgamma(k + 1)) for k in range(len(marginal))]
+    expected = np.convolve(poisson, [1 - np.exp(-5), np.exp(-5)])[:len(marginal)]
+    assert np.allclose(marginal, expected, atol=1e-6)
+    with pytest.raises(MuMoTValueError):
+        model.solveMasterEquation(times=[6, 7], initialState={'A': 1}, maxTime=5, params=[('k_1', 20), ('k_2', 1), ('systemSize', 1)])
+
+
+def test_stationary_distribution():
+    """The stationary solver reproduces the binomial distribution of A <-> B, warm started after a change of rates."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    for k_1 in [1, 2]:
+        result = model.stationaryDistribution(initialState={'A': 1, 'B': 0}, params=[('k_1', k_1), ('k_2', 3), ('systemSize', 40)])
+        marginal = result['marginals']['B']
+        p = k_1 / (k_1 + 3)
+        binomial = [math.factorial(40) / (math.factorial(k) * math.factorial(40 - k)) * p**k * (1 - p)**(40 - k) for k in range(len(marginal))]
+        assert np.allclose(marginal, binomial, atol=1e-8)
+        assert np.isclose(result['probabilities'].sum(), 1) and np.all(result['states'].sum(axis=1) == 40)
+
+
+def test_stationary_distribution_not_unique():
+    """A voter model, with absorbing states all-A and all-B, has no unique stationary distribution."""
+    model = parseModel(r"A + B -> A + A : k_1 \n A + B -> B + B : k_2")
+    with pytest.raises(MuMoTValueError):
+        model.stationaryDistribution(initialState={'A': 0.5, 'B': 0.5}, params=[('k_1', 1), ('k_2', 1), ('systemSize', 20)])
+
+
+def test_stationary_overlay():
+    """The stationary distribution of an SSA view is reused while the parameters do not change, and leaves the simulation state untouched."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    view = _ssaView(model, initialState={'A': 1, 'B': 0}, maxTime=1, runs=1, randomSeed=3, params=[('k_1', 1), ('k_2', 3), ('systemSize', 40)],
+                    showStationary=True)
+    rng, engine = view._rng, view._engine
+    first = view._stationaryDistribution()
+    assert view._stationaryDistribution() is first
+    assert view._rng is rng and view._engine is engine
+
+
+def test_mean_first_passage():
+    """The exact first-passage moments of the decay A -> B match the sums of the exponential waiting times."""
+    model = parseModel(r"A -> B : k")
+    result = model.meanFirstPassage({'extinct': ('A', '<=', 0)}, initialState={'A': 1, 'B': 0}, params=[('k', 2), ('systemSize', 10)])
+    assert np.isclose(result['mean'], sum(1 / (2 * i) for i in range(1, 11)))
+    assert np.isclose(result['variance'], sum(1 / (2 * i)**2 for i in range(1, 11)))
+    for state, mean in zip(result['states'], result['means']):
+        assert np.isclose(mean, sum(1 / (2 * i) for i in range(1, state[0] + 1)))
+
+
+def test_linear_noise_approximation():
+    """The numerical linear noise approximation gives Poisson covariances for a chain of six species, and the rate equations after a substitution."""
+    model = parseModel(r"\emptyset -> A : k_0 \n A -> B : k_1 \n B -> C : k_2 \n C -> D : k_3 \n D -> E : k_4 \n E -> F : k_5 \n F -> \emptyset : k_6")
+    reactants = sorted(model._reactants, key=str)
+    linearNoise = _LinearNoiseApproximation(model._stoichiometry, reactants)
+    rates = [2.0, 1.0, 0.5, 4.0, 0.25, 1.0, 2.0]
+    linearNoise.setParameters({Symbol('k_' + str(idx)): rate for idx, rate in enumerate(rates)})
+    fixedPoint = np.array([2.0 / rate for rate in rates[1:]])
+    assert np.allclose(linearNoise.drift(fixedPoint), 0)
+    assert np.allclose(linearNoise.stationaryCovariance(fixedPoint), np.diag(fixedPoint))
+    assert np.allclose(linearNoise.correlations(fixedPoint, [0, 1])[1, 0, 0], fixedPoint[0] * np.exp(-1))
+
+    model = _testModel().substitute('U = N - A - B')
+    linearNoise = _LinearNoiseApproximation(model._stoichiometry, [reactant for reactant in model._reactants if reactant not in model._constantReactants])
+    argDict = {Symbol('N'): 1}
+    argDict.update({Symbol(rate): value for rate, value in _testRates(model, 0.5).items()})
+    state = {Symbol('A'): 0.3, Symbol('B'): 0.2}
+    expected = [float(model._equations[reactant].subs(argDict).subs(state)) for reactant in linearNoise.reactants]
+    linearNoise.setParameters(argDict)
+    assert np.allclose(linearNoise.drift(np.array([state[reactant] for reactant in linearNoise.reactants])), expected)
+
+
+def test_noise_ellipses():
+    """Noise ellipses from the linear noise approximation are drawn around the stable fixed points only."""
+    model = _testModel().substitute('U = N - A - B')
+    view = model.stream('A', 'B', showNoise=True, silent=True)._view
+    view._plot_field()
+    ellipses = [artist for artist in plt.gca().artists if isinstance(artist, mpatch.Ellipse)]
+    stable = [eigenvalues for eigenvalues in view._FixedPoints[2] if all(sympy.re(value) < 0 for value in eigenvalues)]
+    assert len(ellipses) == len(stable) > 0
+    assert all(ellipse.width > 0 and ellipse.height > 0 for ellipse in ellipses)
+    plt.close('all')
+
+
+def test_memoised_derivations():
+    """Symbolic derivations are memoised by stoichiometry fingerprint, and substituted models get their own entries."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    assert _stoichiometry_fingerprint(model._stoichiometry) == _stoichiometry_fingerprint(parseModel(r"A -> B : k_1 \n B -> A : k_2")._stoichiometry)
+    first = _getFokkerPlanckEquation(_get_orderedLists_vKE, model._stoichiometry)
+    key = ('_getFokkerPlanckEquation', ('_get_orderedLists_vKE',), _stoichiometry_fingerprint(model._stoichiometry))
+    assert key in _derivationCache
+    first[0].clear()
+    assert _getFokkerPlanckEquation(_get_orderedLists_vKE, model._stoichiometry) == _derivationCache[key]
+    substituted = model.substitute('B = N - A')
+    assert _stoichiometry_fingerprint(substituted._stoichiometry) != key[2]
+    unsupported = parseModel(r"A -> B : k_1 \n C -> D : k_2 \n D -> E : k_3")
+    assert _deriveMasterEquation(unsupported._stoichiometry) == (None, None)
+    assert ('_deriveMasterEquation', (), _stoichiometry_fingerprint(unsupported._stoichiometry)) not in _derivationCache
+
+
+def test_derivation_disk_cache(tmpdir):
+    """Derivations cached on disk are reloaded (and used) once the session cache is cleared."""
+    model = parseModel(r"A -> B : k_1 \n B -> A : k_2")
+    tmpdirpath = MuMoTmodel._tmpdirpath
+    MuMoTmodel._tmpdirpath = str(tmpdir)
+    setDerivationCache(True)
+    try:
+        _derivationCache.clear()
+        first = _getFokkerPlanckEquation(_get_orderedLists_vKE, model._stoichiometry)
+        assert len(tmpdir.join('derivations').listdir()) > 0
+        funcs = model._getFuncs()
+        _derivationCache.clear()
+        assert _getFokkerPlanckEquation(_get_orderedLists_vKE, model._stoichiometry) == first
+        assert len(_derivationCache) > 0
+        model._funcs = None
+        for equation, f in model._getFuncs().items():
+            assert f(*range(1, len(model._args) + 1)) == funcs[equation](*range(1, len(model._args) + 1))
+    finally:
+        setDerivationCache(False)
+        MuMoTmodel._tmpdirpath = tmpdirpath